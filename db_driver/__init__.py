@@ -1,21 +1,32 @@
 import os
+import threading
 
 from db_driver.gitdb_driver import GitDBDriver
 from db_driver.mongodb_driver import MongoDBDriver
 from db_driver.utils.consts import DBConsts
+from db_utils.validation_utils import get_mongodb_connection_string
 
 DB_INSTANCES = dict()
+DB_INSTANCES_LOCK = threading.Lock()
 
 
 def get_current_db_driver():
     """
-    Return db driver
+    Return db driver, one shared driver per db (mongodb drivers are shared per connection string)
     :return:
     """
     db_name = os.getenv(key='DB_NAME')
     if db_name == DBConsts.GIT_DB_NAME:
-        if db_name not in DB_INSTANCES.keys():
-            DB_INSTANCES[db_name] = GitDBDriver()
-        return DB_INSTANCES[db_name]
+        instance_key = db_name
+        driver_class = GitDBDriver
     else:
-        return MongoDBDriver()
+        instance_key = get_mongodb_connection_string()
+        driver_class = MongoDBDriver
+
+    db_driver = DB_INSTANCES.get(instance_key)
+    if db_driver is None:
+        with DB_INSTANCES_LOCK:
+            if instance_key not in DB_INSTANCES.keys():
+                DB_INSTANCES[instance_key] = driver_class()
+            db_driver = DB_INSTANCES[instance_key]
+    return db_driver
@@ -0,0 +1,57 @@
+from dataclasses import dataclass, asdict
+from typing import Optional
+
+from bson import ObjectId
+
+from db_driver.utils.consts import BulkOperationConsts
+
+
+@dataclass
+class BulkOperation:
+    """
+    One write operation of `bulk_write`.
+    `data` is the document of insert_one, `new_data` / `push_data` / `inc_data` / `add_to_set_data` / `pull_data` are
+    the fields to set / append to / increment / add to set / remove from of update_one and update_many, `upsert` inserts
+    the filter and the new data if no document matches
+    """
+    operation: str
+    data_filter: Optional[dict] = None
+    data: Optional[dict] = None
+    new_data: Optional[dict] = None
+    upsert: bool = False
+    push_data: Optional[dict] = None
+    inc_data: Optional[dict] = None
+    add_to_set_data: Optional[dict] = None
+    pull_data: Optional[dict] = None
+
+    def __post_init__(self):
+        if self.operation not in BulkOperationConsts.OPERATIONS:
+            raise ValueError(f"Unknown bulk operation: `{self.operation}`")
+        if self.operation == BulkOperationConsts.INSERT_ONE:
+            if self.data is None:
+                raise ValueError(f"Bulk operation `{self.operation}` must have data")
+        elif self.data_filter is None:
+            raise ValueError(f"Bulk operation `{self.operation}` must have a data filter")
+        if self.operation in [BulkOperationConsts.UPDATE_ONE, BulkOperationConsts.UPDATE_MANY] \
+                and not (self.new_data or self.push_data or self.inc_data or self.add_to_set_data or self.pull_data):
+            raise ValueError(f"Bulk operation `{self.operation}` must have new data")
+
+    def convert_to_dict(self) -> dict:
+        return asdict(self)
+
+
+@dataclass
+class BulkOperationResult:
+    """
+    Result of one operation of `bulk_write`, in the order of the operations.
+    An operation of an ordered bulk that was not executed because of a previous error is not succeeded
+    """
+    index: int
+    operation: str
+    succeeded: bool
+    inserted_id: Optional[ObjectId] = None
+    upserted_id: Optional[ObjectId] = None
+    error: Optional[str] = None
+
+    def convert_to_dict(self) -> dict:
+        return asdict(self)
@@ -1,6 +1,6 @@
 import datetime
 from dataclasses import dataclass, asdict, field
-from typing import List, Union
+from typing import List, Optional, Union
 
 from db_driver.db_objects.status_timestamp import StatusTimestamp
 
@@ -14,6 +14,7 @@ class Task:
     type: str
     status_timestamp: List[Union[StatusTimestamp, dict]] = field(default_factory=lambda: [])
     creation_time: datetime.datetime = None
+    failed_count: Optional[int] = None
 
     def __repr__(self) -> str:
         string = ''
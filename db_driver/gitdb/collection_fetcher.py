@@ -0,0 +1,94 @@
+from datetime import datetime
+from http import HTTPStatus
+from typing import Dict, List, Optional
+
+import requests
+
+from db_driver.gitdb.gitdb_collection import GitDBCollection
+from db_driver.gitdb.json_stream import iter_json_array
+from db_driver.utils.consts import DBConsts, DBObjectsConsts
+from logger import get_current_logger
+
+
+class GitDBCollectionFetcher:
+    """
+    Fetching the collections data from the git db.
+    The `ETag` / `Last-Modified` validators of every fetched collection are kept and sent back as a conditional
+    request, so a collection that was not modified since the last fetch is neither downloaded nor parsed again.
+    In streaming mode the documents are decoded one at a time while the body is downloaded, and go straight
+    to the indexes of the collection.
+
+    # example of use:
+    fetcher = GitDBCollectionFetcher()
+    collection = fetcher.fetch(collection="articles")  # None if not modified since the last fetch
+    """
+    VALIDATOR_HEADERS = {"ETag": "If-None-Match", "Last-Modified": "If-Modified-Since"}
+
+    def __init__(self, base_url: str = DBConsts.GIT_DB_URL, timeout: int = DBConsts.REQUEST_TIMEOUT,
+                 stream_parsing: bool = DBConsts.GIT_DB_STREAM_PARSING):
+        self.logger = get_current_logger()
+        self.base_url = base_url
+        self.timeout = timeout
+        self.stream_parsing = stream_parsing
+        self._validators: Dict[str, Dict[str, str]] = dict()
+
+    def fetch(self, collection: str) -> Optional[GitDBCollection]:
+        """
+        Fetch the documents of the collection and build its indexes
+        :param collection:
+        :return: the fetched collection, None if the collection was not modified since the last fetch
+        """
+        url = f"{self.base_url}{collection}.json"
+        self.logger.debug("Requests from -> %s", url)
+        headers = {'Content-type': 'application/json;'}
+        headers.update(self._get_conditional_headers(collection=collection))
+        with requests.get(url=url, headers=headers, timeout=self.timeout, stream=self.stream_parsing) as res:
+            if res.status_code == HTTPStatus.NOT_MODIFIED:
+                self.logger.debug("Git db data for `%s` was not modified", collection)
+                return None
+
+            res.raise_for_status()
+            if self.stream_parsing:
+                documents = iter_json_array(chunks=res.iter_content(chunk_size=DBConsts.GIT_DB_STREAM_CHUNK_SIZE))
+            else:
+                documents = res.json()
+
+            date_time_attributes = DBObjectsConsts.DATETIME_ATTRIBUTES.get(collection, [])
+            gitdb_collection = GitDBCollection(indexed_fields=DBConsts.GIT_DB_INDEXED_FIELDS.get(collection),
+                                               max_fields=DBConsts.GIT_DB_MAX_FIELDS.get(collection))
+            for document in documents:
+                convert_datetime_attributes(document=document, date_time_attributes=date_time_attributes)
+                gitdb_collection.add(document)
+
+            self._validators[collection] = {
+                header: res.headers[header] for header in self.VALIDATOR_HEADERS.keys() if res.headers.get(header)
+            }
+        return gitdb_collection
+
+    def get_validators(self, collection: str) -> Dict[str, str]:
+        return dict(self._validators.get(collection, dict()))
+
+    def set_validators(self, collection: str, validators: Dict[str, str]):
+        self._validators[collection] = dict(validators)
+
+    def reset_validators(self, collection: str = None):
+        if collection:
+            self._validators.pop(collection, None)
+        else:
+            self._validators.clear()
+
+    def _get_conditional_headers(self, collection: str) -> Dict[str, str]:
+        validators = self._validators.get(collection, dict())
+        return {self.VALIDATOR_HEADERS[header]: value for header, value in validators.items()}
+
+
+def convert_datetime_attributes(document: dict, date_time_attributes: List[str]):
+    """
+    Convert the iso format datetime attributes of the document to datetime objects
+    :param document:
+    :param date_time_attributes:
+    :return:
+    """
+    for date_time_attribute in date_time_attributes:
+        if document[date_time_attribute] and isinstance(document[date_time_attribute], str):
+            document[date_time_attribute] = datetime.fromisoformat(document[date_time_attribute])
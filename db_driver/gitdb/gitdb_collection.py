@@ -0,0 +1,172 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from db_driver.gitdb.query_filter import compile_filter
+
+
+class GitDBCollection:
+    """
+    Documents of one git db collection with hash indexes on its hot fields.
+    Equality and `$in` filters on indexed fields are resolved by intersecting the indexes,
+    the rest of the filter is checked only against the remaining candidates.
+    The max value of the `max_fields` is kept while the documents are added, and the distinct values of an indexed
+    field are the keys of its index, so both are answered without scanning the documents.
+
+    # example of use:
+    collection = GitDBCollection.from_documents(documents=articles, indexed_fields=['article_id', 'url'])
+    articles = list(collection.find(data_filter={"url": {"$in": urls}}))
+    """
+
+    def __init__(self, indexed_fields: List[str] = None, max_fields: List[str] = None):
+        self.documents: Union[List[dict], Tuple[dict, ...]] = list()
+        self.indexes: Dict[str, Dict[Any, List[int]]] = {field_name: dict() for field_name in indexed_fields or []}
+        self.max_fields: List[str] = list(max_fields or [])
+        self.max_values: Dict[str, Any] = dict()
+
+    @classmethod
+    def from_documents(cls, documents: Iterable[dict], indexed_fields: List[str] = None,
+                       max_fields: List[str] = None) -> 'GitDBCollection':
+        collection = cls(indexed_fields=indexed_fields, max_fields=max_fields)
+        for document in documents:
+            collection.add(document)
+        return collection
+
+    def __len__(self) -> int:
+        return len(self.documents)
+
+    def freeze(self):
+        """
+        Turn the documents into a tuple, no more documents can be added after it
+        :return:
+        """
+        self.documents = tuple(self.documents)
+
+    def add(self, document: dict):
+        position = len(self.documents)
+        self.documents.append(document)
+        for field_name, index in list(self.indexes.items()):
+            value = document.get(field_name)
+            values = value if isinstance(value, list) else [value]
+            try:
+                for single_value in values:
+                    positions = index.setdefault(single_value, [])
+                    if not positions or positions[-1] != position:
+                        positions.append(position)
+            except TypeError:
+                # Unhashable values cannot be indexed, this field will be filtered by scanning
+                self.indexes.pop(field_name)
+        for field_name in list(self.max_fields):
+            value = document.get(field_name)
+            if value is None:
+                continue
+            try:
+                if field_name not in self.max_values or value > self.max_values[field_name]:
+                    self.max_values[field_name] = value
+            except TypeError:
+                # Values that cannot be compared, the max of this field will be found by scanning
+                self.max_fields.remove(field_name)
+                self.max_values.pop(field_name, None)
+
+    def distinct(self, field_name: str, data_filter: dict = None) -> List[Any]:
+        """
+        Get the distinct not None values of the field, the items of array fields are values (like in mongo)
+        :param field_name:
+        :param data_filter:
+        :return:
+        """
+        index = self.indexes.get(field_name)
+        if index is not None and not data_filter:
+            return [value for value in index.keys() if value is not None]
+
+        values = list()
+        seen_values = set()
+        for document in self.find(data_filter=data_filter):
+            value = document.get(field_name)
+            for single_value in value if isinstance(value, list) else [value]:
+                if single_value is None:
+                    continue
+                try:
+                    if single_value in seen_values:
+                        continue
+                    seen_values.add(single_value)
+                except TypeError:
+                    if single_value in values:
+                        continue
+                values.append(single_value)
+        return values
+
+    def get_max(self, field_name: str, data_filter: dict = None) -> Any:
+        """
+        Get the max not None value of the field
+        :param field_name:
+        :param data_filter:
+        :return: the max value, None if no document has a value
+        """
+        if field_name in self.max_fields and not data_filter:
+            return self.max_values.get(field_name)
+        values = [document.get(field_name) for document in self.find(data_filter=data_filter)]
+        return max((value for value in values if value is not None), default=None)
+
+    def find(self, data_filter: dict) -> Iterator[dict]:
+        """
+        Find the documents matching the data filter, in the collection order
+        :param data_filter:
+        :return: iterator of the matching documents
+        """
+        if not data_filter:
+            return iter(self.documents)
+
+        positions, residual_filter = self.find_positions(data_filter=data_filter)
+        if positions is None:
+            candidates = self.documents
+        else:
+            candidates = [self.documents[position] for position in positions]
+
+        if not residual_filter:
+            return iter(candidates)
+        return filter(compile_filter(data_filter=residual_filter), candidates)
+
+    def find_positions(self, data_filter: dict) -> Tuple[Optional[List[int]], dict]:
+        """
+        Resolve the indexed part of the data filter
+        :param data_filter:
+        :return: sorted positions of the candidates (None if no index was used) and the not indexed part of the filter
+        """
+        positions_per_key = []
+        residual_filter = dict()
+        for key, value in data_filter.items():
+            key_positions = self._get_index_positions(key=key, value=value)
+            if key_positions is None:
+                residual_filter[key] = value
+            elif not key_positions:
+                return [], dict()
+            else:
+                positions_per_key.append(key_positions)
+
+        if not positions_per_key:
+            return None, residual_filter
+        if len(positions_per_key) == 1 and isinstance(positions_per_key[0], list):
+            return positions_per_key[0], residual_filter
+
+        positions_per_key.sort(key=len)
+        positions = set(positions_per_key[0])
+        for key_positions in positions_per_key[1:]:
+            positions.intersection_update(key_positions)
+        return sorted(positions), residual_filter
+
+    def _get_index_positions(self, key: str, value: Any) -> Optional[Iterable[int]]:
+        index = self.indexes.get(key)
+        if index is None:
+            return None
+        try:
+            if isinstance(value, dict):
+                if value.keys() == {"$eq"}:
+                    return index.get(value["$eq"], [])
+                if value.keys() != {"$in"}:
+                    return None
+                positions = set()
+                for single_value in value["$in"]:
+                    positions.update(index.get(single_value, ()))
+                return positions
+            return index.get(value, [])
+        except TypeError:
+            return None
@@ -0,0 +1,32 @@
+from contextvars import ContextVar
+from datetime import datetime
+from types import MappingProxyType
+from typing import Dict, Optional
+
+from db_driver.gitdb.gitdb_collection import GitDBCollection
+
+
+class GitDBSnapshot:
+    """
+    Complete and immutable view of all the git db collections (documents and indexes).
+    A refresh builds a new snapshot and publishes it with a single reference swap, readers that took a reference
+    to a snapshot keep reading the same consistent data until they are done.
+    """
+    __slots__ = ("version", "creation_time", "collections")
+
+    def __init__(self, version: int, collections: Dict[str, GitDBCollection]):
+        for collection in collections.values():
+            collection.freeze()
+        self.version = version
+        self.creation_time = datetime.now()
+        self.collections = MappingProxyType(dict(collections))
+
+    def __repr__(self) -> str:
+        return f"GitDBSnapshot(version: `{self.version}`, collections: `{list(self.collections.keys())}`)"
+
+    def get_collection(self, table_name: str) -> GitDBCollection:
+        return self.collections[table_name]
+
+
+# Snapshot pinned by the current thread / task, see `GitDBDriver.pin_snapshot`
+PINNED_SNAPSHOT: ContextVar[Optional[GitDBSnapshot]] = ContextVar("pinned_gitdb_snapshot", default=None)
@@ -0,0 +1,78 @@
+import codecs
+import json
+import re
+from typing import Any, Iterable, Iterator
+
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+NUMBER_CONTINUATION_CHARS = frozenset(".eE+-0123456789")
+
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    Decode the items of a top level json array one at a time, while the chunks of the body are still arriving.
+    Only the current item is kept as text, instead of the whole body and its fully built list.
+
+    >>> list(iter_json_array([b'[{"a": 1}, {"b"', b': [2, 3]}, 4', b'5, "x"]']))
+    [{'a': 1}, {'b': [2, 3]}, 45, 'x']
+    >>> list(iter_json_array([b' [ ] ']))
+    []
+
+    :param chunks: bytes chunks of the json body
+    :param encoding:
+    :return: iterator of the decoded items
+    """
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder(encoding)()
+    buffer = ""
+    position = 0
+    array_started = False
+    chunks_iterator = iter(chunks)
+    is_last_chunk = False
+
+    while not is_last_chunk:
+        chunk = next(chunks_iterator, None)
+        is_last_chunk = chunk is None
+        buffer = buffer[position:] + text_decoder.decode(chunk or b"", final=is_last_chunk)
+        position = 0
+
+        while True:
+            position = WHITESPACE.match(buffer, position).end()
+            if position >= len(buffer):
+                break
+
+            char = buffer[position]
+            if not array_started:
+                if char != "[":
+                    raise ValueError(f"Expected json array, got: `{char}`")
+                array_started = True
+                position += 1
+                continue
+            if char == "]":
+                return
+            if char == ",":
+                position += 1
+                continue
+
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if is_last_chunk:
+                    raise
+                break  # The item is not complete yet, wait for the next chunk
+
+            if not is_last_chunk and _may_continue(item=item, buffer=buffer, end=end):
+                break  # A number at the end of the buffer may continue in the next chunk
+            position = end
+            yield item
+
+    raise ValueError("Unterminated json array")
+
+
+def _may_continue(item: Any, buffer: str, end: int) -> bool:
+    """
+    Whether a decoded number may be the prefix of a longer one split between chunks: `12` of `12.5` is decoded
+    when the buffer ends with `12` or `12.`
+    """
+    if isinstance(item, (dict, list, str)):
+        return False
+    return end == len(buffer) or buffer[end] in NUMBER_CONTINUATION_CHARS
@@ -0,0 +1,163 @@
+import operator
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Tuple
+
+FilterPredicate = Callable[[dict], bool]
+FilterShape = Tuple[Tuple[str, Tuple[str, ...]], ...]
+EQUAL_OPERATOR = "$eq"
+
+
+def compile_filter(data_filter: dict) -> FilterPredicate:
+    """
+    Compile a mongo style data filter to a predicate function.
+    The structure of the filter (fields and operators) is compiled once and cached, the values are bound per call,
+    so repeated queries don't interpret the filter dict again for every document.
+    Supported operators: `$eq`, `$ne`, `$in`, `$nin`, `$gt`, `$gte`, `$lt`, `$lte` and `$exists`,
+    an array field is matching if one of its items is matching (like in mongo). Top level logical operators (`$or`,
+    `$and`, ...) are not supported.
+
+    >>> predicate = compile_filter({"domains": {"$nin": ["cnn"]}, "categories": {"$in": ["sport", "tech"]}})
+    >>> predicate({"domains": ["bbc", "nbc"], "categories": ["tech"]})
+    True
+    >>> predicate({"domains": ["bbc", "cnn"], "categories": ["tech"]})
+    False
+    >>> compile_filter({"cluster_id": None, "title": {"$exists": True}})({"title": "test"})
+    True
+
+    :param data_filter:
+    :return: predicate getting a document and returning if it is matching the filter
+    """
+    shape, values = get_filter_shape(data_filter=data_filter)
+    return _compile_filter_shape(shape)(values)
+
+
+def get_filter_shape(data_filter: dict) -> Tuple[FilterShape, List[Any]]:
+    """
+    Split the filter into its structure and its values
+
+    >>> get_filter_shape({"url": "cnn.com", "domains": {"$nin": ["cnn"], "$exists": True}})
+    ((('url', ('$eq',)), ('domains', ('$nin', '$exists'))), ['cnn.com', ['cnn'], True])
+    """
+    shape = []
+    values = []
+    for key, value in data_filter.items():
+        if str(key).startswith("$"):
+            # Top level logical operators (`$or`, `$and`, ...) are not supported, not field names to compare
+            raise ValueError(f"Unsupported top level filter operator: `{key}`")
+        if is_operators_dict(value):
+            shape.append((key, tuple(value.keys())))
+            values.extend(value.values())
+        else:
+            shape.append((key, (EQUAL_OPERATOR,)))
+            values.append(value)
+    return tuple(shape), values
+
+
+def is_operators_dict(value: Any) -> bool:
+    return isinstance(value, dict) and len(value) > 0 and all(str(key).startswith("$") for key in value.keys())
+
+
+def is_equal(document_value: Any, value: Any) -> bool:
+    """
+    Mongo equality, an array field is equal to the value if one of its items is equal to it
+
+    >>> is_equal(["cnn", "bbc"], "bbc")
+    True
+    >>> is_equal(["cnn", "bbc"], ["cnn", "bbc"])
+    True
+    >>> is_equal(None, None)
+    True
+    """
+    if isinstance(document_value, list) and not isinstance(value, list):
+        return value in document_value
+    return document_value == value
+
+
+@lru_cache(maxsize=256)
+def _compile_filter_shape(shape: FilterShape) -> Callable[[List[Any]], FilterPredicate]:
+    matcher_factories = []
+    for key, operators in shape:
+        for operator_name in operators:
+            if operator_name not in OPERATORS.keys():
+                raise ValueError(f"Unsupported filter operator: `{operator_name}` for key: `{key}`")
+            matcher_factories.append((key, OPERATORS[operator_name]))
+
+    def bind(values: List[Any]) -> FilterPredicate:
+        matchers = [factory(key, value) for (key, factory), value in zip(matcher_factories, values)]
+
+        def predicate(document: dict) -> bool:
+            for matcher in matchers:
+                if not matcher(document):
+                    return False
+            return True
+
+        return predicate
+
+    return bind
+
+
+def _equal_matcher(key: str, value: Any) -> FilterPredicate:
+    return lambda document: is_equal(document.get(key), value)
+
+
+def _not_equal_matcher(key: str, value: Any) -> FilterPredicate:
+    return lambda document: not is_equal(document.get(key), value)
+
+
+def _in_matcher(key: str, values: List[Any]) -> FilterPredicate:
+    try:
+        values_set = set(values)
+    except TypeError:
+        return lambda document: any(is_equal(document.get(key), value) for value in values)
+
+    def matcher(document: dict) -> bool:
+        document_value = document.get(key)
+        if isinstance(document_value, list):
+            return any(item in values_set for item in document_value if not isinstance(item, (list, dict)))
+        return not isinstance(document_value, dict) and document_value in values_set
+
+    return matcher
+
+
+def _not_in_matcher(key: str, values: List[Any]) -> FilterPredicate:
+    in_matcher = _in_matcher(key, values)
+    return lambda document: not in_matcher(document)
+
+
+def _exists_matcher(key: str, value: Any) -> FilterPredicate:
+    should_exist = bool(value)
+    return lambda document: (key in document) == should_exist
+
+
+def _comparison_matcher_factory(compare: Callable[[Any, Any], bool]) -> Callable[[str, Any], FilterPredicate]:
+    def is_matching(document_value: Any, value: Any) -> bool:
+        if document_value is None:
+            return False
+        try:
+            return compare(document_value, value)
+        except TypeError:
+            return False
+
+    def factory(key: str, value: Any) -> FilterPredicate:
+        def matcher(document: dict) -> bool:
+            document_value = document.get(key)
+            if isinstance(document_value, list):
+                return any(is_matching(item, value) for item in document_value)
+            return is_matching(document_value, value)
+
+        return matcher
+
+    return factory
+
+
+OPERATORS: Dict[str, Callable[[str, Any], FilterPredicate]] = {
+    EQUAL_OPERATOR: _equal_matcher,
+    "$ne": _not_equal_matcher,
+    "$in": _in_matcher,
+    "$nin": _not_in_matcher,
+    "$gt": _comparison_matcher_factory(operator.gt),
+    "$gte": _comparison_matcher_factory(operator.ge),
+    "$lt": _comparison_matcher_factory(operator.lt),
+    "$lte": _comparison_matcher_factory(operator.le),
+    "$exists": _exists_matcher,
+}
@@ -0,0 +1,94 @@
+import random
+from itertools import islice
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+Projection = Union[List[str], dict]
+SortFields = List[Tuple[str, int]]
+ID_FIELD = "_id"
+
+
+def compile_projection(projection: Optional[Projection]) -> Optional[Callable[[dict], dict]]:
+    """
+    Compile a mongo style projection to a function building the projected document.
+    A list of fields (or `{field: 1}`) keeps only these fields and `_id`, `{field: 0}` removes the fields
+
+    >>> compile_projection(["media"])({"_id": 1, "media": "cnn", "src": "cnn.png"})
+    {'_id': 1, 'media': 'cnn'}
+    >>> compile_projection({"content": 0})({"title": "test", "content": "long content"})
+    {'title': 'test'}
+
+    :param projection:
+    :return: function getting a document and returning its projection, None if all the fields are wanted
+    """
+    if not projection:
+        return None
+    if not isinstance(projection, dict):
+        projection = {field_name: 1 for field_name in projection}
+
+    include_id = bool(projection.get(ID_FIELD, 1))
+    fields = {field_name: bool(value) for field_name, value in projection.items() if field_name != ID_FIELD}
+    if fields and len(set(fields.values())) > 1:
+        raise ValueError(f"Cannot mix including and excluding fields in projection: `{projection}`")
+
+    if not fields or not next(iter(fields.values())):
+        excluded_fields = set(fields) if include_id else set(fields) | {ID_FIELD}
+        return lambda document: {key: value for key, value in document.items() if key not in excluded_fields}
+
+    included_fields = [ID_FIELD] + list(fields) if include_id else list(fields)
+    return lambda document: {key: document[key] for key in included_fields if key in document}
+
+
+def sort_documents(documents: Iterable[dict], sort: SortFields) -> List[dict]:
+    """
+    Sort the documents like mongo, missing and None values are the smallest
+
+    >>> sort_documents([{"a": 2, "b": 1}, {"a": None}, {"a": 2, "b": 3}], sort=[("a", -1), ("b", -1)])
+    [{'a': 2, 'b': 3}, {'a': 2, 'b': 1}, {'a': None}]
+    """
+    sorted_documents = list(documents)
+    # Stable sorts from the last sort field to the first
+    for field_name, direction in reversed(sort):
+        sorted_documents.sort(key=lambda document: _get_sort_key(document.get(field_name)), reverse=direction < 0)
+    return sorted_documents
+
+
+def _get_sort_key(value: Any) -> Tuple[bool, Any]:
+    return (False, 0) if value is None else (True, value)
+
+
+def apply_query_options(documents: Iterable[dict], projection: Optional[Projection] = None,
+                        sort: Optional[SortFields] = None, limit: int = 0, skip: int = 0) -> Iterator[dict]:
+    """
+    Apply the sort, skip, limit and projection of a query on the matching documents, lazily when not sorting
+    :param documents: matching documents
+    :param projection:
+    :param sort: list of (field name, 1 or -1)
+    :param limit: max number of documents, 0 for no limit
+    :param skip: number of documents to skip
+    :return: iterator of the wanted documents
+    """
+    if sort:
+        documents = sort_documents(documents=documents, sort=sort)
+    documents = islice(documents, skip, skip + limit if limit else None)
+    project = compile_projection(projection=projection)
+    return documents if project is None else map(project, documents)
+
+
+def reservoir_sample(documents: Iterable[dict], amount: int) -> List[dict]:
+    """
+    Choose `amount` random documents (all the documents if there are less) in one pass, without copying all of them
+    :param documents:
+    :param amount:
+    :return: the chosen documents
+    """
+    sample: List[dict] = list()
+    if amount <= 0:
+        return sample
+    for seen_count, document in enumerate(documents):
+        if seen_count < amount:
+            sample.append(document)
+        else:
+            position = random.randint(0, seen_count)
+            if position < amount:
+                sample[position] = document
+    return sample
@@ -0,0 +1,93 @@
+import random
+import threading
+from typing import Any, Callable
+
+from logger import get_current_logger
+
+
+class GitDBRefresher:
+    """
+    Running a refresh function periodically in a daemon thread.
+    The thread sleeps until the next deadline (no polling), the interval gets a random jitter so many processes
+    don't refresh together, and after failures the next try comes sooner with an exponential backoff.
+
+    # example of use:
+    refresher = GitDBRefresher(refresh_function=driver.refresh_db_data, interval_seconds=600)
+    refresher.start()
+    refresher.trigger()  # refresh now
+    refresher.stop()
+    """
+
+    def __init__(self, refresh_function: Callable[[], Any], interval_seconds: float, jitter: float = 0,
+                 backoff_seconds: float = 1, name: str = "gitdb_refresher"):
+        self.logger = get_current_logger()
+        self.refresh_function = refresh_function
+        self.interval_seconds = interval_seconds
+        self.jitter = jitter
+        self.backoff_seconds = backoff_seconds
+        self.name = name
+        self._failures = 0
+        self._wake_event = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    @property
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    @property
+    def failures(self) -> int:
+        return self._failures
+
+    def start(self, run_now: bool = False):
+        """
+        Start the refresher thread
+        :param run_now: refresh right away instead of waiting for the first interval
+        :return:
+        """
+        if self.is_running:
+            return
+        self._stop_event.clear()
+        if run_now:
+            self._wake_event.set()
+        self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+        self._thread.start()
+
+    def trigger(self):
+        """
+        Wake the refresher thread to refresh now
+        :return:
+        """
+        self._wake_event.set()
+
+    def stop(self, timeout: float = None):
+        """
+        Stop the refresher thread, a running refresh is completed first
+        :param timeout: max seconds to wait for the thread
+        :return:
+        """
+        self._stop_event.set()
+        self._wake_event.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=timeout)
+
+    def get_next_delay(self) -> float:
+        if self._failures:
+            delay = min(self.interval_seconds, self.backoff_seconds * 2 ** (self._failures - 1))
+        else:
+            delay = self.interval_seconds
+        return delay * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            self._wake_event.wait(timeout=self.get_next_delay())
+            if self._stop_event.is_set():
+                break
+            self._wake_event.clear()
+            try:
+                self.refresh_function()
+                self._failures = 0
+            except Exception as e:
+                self._failures += 1
+                self.logger.error("Error in `%s` refresh NO. %s, except: %s", self.name, self._failures, e)
+        self.logger.debug("`%s` stopped", self.name)
@@ -0,0 +1,110 @@
+import json
+import os
+import stat
+import tempfile
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from logger import get_current_logger
+
+
+class GitDBSnapshotCache:
+    """
+    Local cache of the last good data of every git db collection, so a new process can serve immediately
+    without waiting for the network.
+    Every collection is saved to its own file as json behind a format header, the datetime objects are saved as tagged
+    iso strings. The cache dir is private to the user (0700), a dir or file owned by another user, or writable by
+    other users, is never loaded.
+
+    # example of use:
+    cache = GitDBSnapshotCache(cache_dir="/var/cache/my_service/gitdb")
+    cache.save(collection="articles", documents=documents, validators={"ETag": '"1234"'})
+    documents, validators = cache.load(collection="articles")
+    """
+    FILE_HEADER = b"GITDB_CACHE_V2\n"
+    FILE_SUFFIX = ".cache"
+    DIR_MODE = 0o700
+    DATETIME_TAG = "$datetime"
+
+    def __init__(self, cache_dir: str):
+        self.logger = get_current_logger()
+        self.cache_dir = cache_dir
+
+    def get_cache_path(self, collection: str) -> str:
+        return os.path.join(self.cache_dir, f"{collection}{self.FILE_SUFFIX}")
+
+    def save(self, collection: str, documents: List[dict], validators: Dict[str, str] = None) -> bool:
+        """
+        Save the documents of the collection, replacing the cached file atomically
+        :param collection:
+        :param documents:
+        :param validators: http validators (`ETag` / `Last-Modified`) of the saved documents
+        :return: if the collection was saved
+        """
+        temp_path = None
+        try:
+            os.makedirs(self.cache_dir, mode=self.DIR_MODE, exist_ok=True)
+            if not self.__is_private(path=self.cache_dir):
+                self.logger.warning("Not saving git db cache for `%s`, `%s` is not private", collection, self.cache_dir)
+                return False
+            data = {"validators": validators or dict(), "documents": documents}
+            file_descriptor, temp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f".{collection}_")
+            with os.fdopen(file_descriptor, "wb") as cache_file:
+                cache_file.write(self.FILE_HEADER)
+                cache_file.write(json.dumps(data, default=self.__encode_value).encode("utf-8"))
+            os.replace(temp_path, self.get_cache_path(collection=collection))
+            self.logger.debug("Saved git db cache for `%s`, %s documents", collection, len(documents))
+            return True
+        except Exception as e:
+            self.logger.warning("Error saving git db cache for `%s`, except: %s", collection, e)
+            if temp_path and os.path.exists(temp_path):
+                os.remove(temp_path)
+            return False
+
+    def load(self, collection: str) -> Optional[Tuple[List[dict], Dict[str, str]]]:
+        """
+        Load the cached documents of the collection
+        :param collection:
+        :return: the documents and their http validators, None if there is no valid cache for the collection
+        """
+        cache_path = self.get_cache_path(collection=collection)
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            if not self.__is_private(path=self.cache_dir) or not self.__is_private(path=cache_path):
+                self.logger.warning("Ignoring git db cache for `%s`, `%s` is not private", collection, self.cache_dir)
+                return None
+            with open(cache_path, "rb") as cache_file:
+                if cache_file.read(len(self.FILE_HEADER)) != self.FILE_HEADER:
+                    self.logger.warning("Ignoring git db cache for `%s` with unknown format", collection)
+                    return None
+                data = json.loads(cache_file.read(), object_hook=self.__decode_object)
+            self.logger.debug("Loaded git db cache for `%s`, %s documents", collection, len(data['documents']))
+            return data["documents"], data["validators"]
+        except Exception as e:
+            self.logger.warning("Error loading git db cache for `%s`, except: %s", collection, e)
+            return None
+
+    @staticmethod
+    def __is_private(path: str) -> bool:
+        """
+        Whether the path is owned by the current user and cannot be written by other users
+        """
+        path_stat = os.lstat(path)
+        if stat.S_ISLNK(path_stat.st_mode):
+            return False
+        if hasattr(os, "getuid") and path_stat.st_uid != os.getuid():
+            return False
+        return not path_stat.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+    @classmethod
+    def __encode_value(cls, value: Any) -> dict:
+        if isinstance(value, datetime):
+            return {cls.DATETIME_TAG: value.isoformat()}
+        raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+    @classmethod
+    def __decode_object(cls, obj: dict) -> Any:
+        if len(obj) == 1 and cls.DATETIME_TAG in obj:
+            return datetime.fromisoformat(obj[cls.DATETIME_TAG])
+        return obj
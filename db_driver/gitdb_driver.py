@@ -1,14 +1,19 @@
 import os
 import threading
-from datetime import datetime
-from time import sleep
-from typing import List
-
-import requests
-import schedule
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
+from time import sleep, perf_counter
+from typing import Any, Iterator, List, Optional, Tuple, Union
 
+from db_driver.db_objects.bulk_operation import BulkOperation, BulkOperationResult
+from db_driver.gitdb.collection_fetcher import GitDBCollectionFetcher
+from db_driver.gitdb.gitdb_collection import GitDBCollection
+from db_driver.gitdb.gitdb_snapshot import GitDBSnapshot, PINNED_SNAPSHOT
+from db_driver.gitdb.query_options import apply_query_options, reservoir_sample
+from db_driver.gitdb.refresher import GitDBRefresher
+from db_driver.gitdb.snapshot_cache import GitDBSnapshotCache
 from db_driver.insterfaces.interface_db_driver import DBDriverInterface
-from db_driver.utils.consts import DBObjectsConsts, DBConsts
+from db_driver.utils.consts import DBConsts
 from db_driver.utils.exceptions import ErrorConnectDBException, DataNotFoundDBException
 from logger import get_current_logger, log_function
 from singleton_class import Singleton
@@ -21,106 +26,266 @@ class GitDBDriver(DBDriverInterface, Singleton):
 
     def __init__(self):
         self.logger = get_current_logger()
-        self._in_collecting_data_process = False
-        self.__db = dict()
-        initial_collection = threading.Thread(target=self.refresh_db_data)
-        initial_collection.start()
-        schedule.every(self.REFRESH_DB_DATA_TIMEOUT).minutes.do(self.refresh_db_data)
-        self.scheduler = threading.Thread(target=self._run_scheduler_refresh_data)
-        self.scheduler.start()
-        initial_collection.join()
-        self.logger.debug(f"Connected to gitdb")
-
-    @staticmethod
-    def _run_scheduler_refresh_data():
-        while True:
-            schedule.run_pending()
-            sleep(1)
+        self.__snapshot = GitDBSnapshot(version=0, collections=dict())
+        self.__refresh_lock = threading.Lock()
+        self.__fetcher = GitDBCollectionFetcher()
+        self.__collections_timings = dict()
+        self.__cache = GitDBSnapshotCache(cache_dir=DBConsts.GIT_DB_CACHE_DIR) if DBConsts.GIT_DB_CACHE_DIR else None
+        self.refresher = GitDBRefresher(
+            refresh_function=self.refresh_db_data,
+            interval_seconds=self.REFRESH_DB_DATA_TIMEOUT * 60,
+            jitter=DBConsts.GIT_DB_REFRESH_JITTER,
+            backoff_seconds=DBConsts.GIT_DB_REFRESH_BACKOFF_SECONDS
+        )
+        if self.__load_cached_snapshot():
+            self.refresher.start(run_now=True)
+        else:
+            self.refresh_db_data()
+            self.refresher.start()
+        self.logger.debug("Connected to gitdb")
 
-    @log_function
-    def __connect_to_db(self, time_to_try_counter: int = 3):
-        self._in_collecting_data_process = True
+    def __load_cached_snapshot(self) -> bool:
+        """
+        Publish the snapshot saved in the local cache, only if all the collections are cached
+        :return: if the cached snapshot was published
+        """
+        if not self.__cache:
+            return False
+        collections = dict()
+        collections_validators = dict()
         for collection in DBConsts.GIT_DB_COLLECTIONS:
+            cached_data = self.__cache.load(collection=collection)
+            if cached_data is None:
+                self.logger.info("No git db cache for `%s`, getting the db data from the network", collection)
+                return False
+            documents, collections_validators[collection] = cached_data
+            collections[collection] = GitDBCollection.from_documents(
+                documents=documents, indexed_fields=DBConsts.GIT_DB_INDEXED_FIELDS.get(collection),
+                max_fields=DBConsts.GIT_DB_MAX_FIELDS.get(collection)
+            )
+
+        # Only when all the collections are cached, otherwise the network refresh would get `not modified` for them
+        for collection, validators in collections_validators.items():
+            self.__fetcher.set_validators(collection=collection, validators=validators)
+        self.__snapshot = GitDBSnapshot(version=self.__snapshot.version + 1, collections=collections)
+        self.logger.info("Serving git db data from the local cache: `%s`", self.__cache.cache_dir)
+        return True
+
+    def __save_cached_collections(self, collections: List[str]):
+        if not self.__cache:
+            return
+        snapshot = self.__snapshot
+        for collection in collections:
+            self.__cache.save(collection=collection, documents=snapshot.get_collection(table_name=collection).documents,
+                              validators=self.__fetcher.get_validators(collection=collection))
+
+    @log_function
+    def __connect_to_db(self):
+        current_snapshot = self.__snapshot
+        collections = DBConsts.GIT_DB_COLLECTIONS
+        new_collections = dict(current_snapshot.collections)
+        modified_collections = list()
+        failed_collections = dict()
+        max_workers = max(1, min(len(collections), DBConsts.GIT_DB_FETCH_WORKERS))
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="gitdb_fetch") as executor:
+            futures = {executor.submit(self.__fetch_collection, collection): collection for collection in collections}
+            for future in as_completed(futures):
+                collection = futures[future]
+                try:
+                    gitdb_collection = future.result()
+                    if gitdb_collection is not None:
+                        new_collections[collection] = gitdb_collection
+                        modified_collections.append(collection)
+                except Exception as e:
+                    failed_collections[collection] = str(e)
+
+        if failed_collections:
+            # Nothing is published, the next refresh must download again the collections fetched by this refresh
+            self.__fetcher.reset_validators()
+            desc = f"Error getting git db data for collections: {failed_collections}"
+            self.logger.error(desc)
+            raise ErrorConnectDBException(desc)
+
+        self.__snapshot = GitDBSnapshot(version=current_snapshot.version + 1, collections=new_collections)
+        self.logger.info("Done getting collections data of: `%s`, snapshot version: `%s`, timings: %s",
+                         collections, self.__snapshot.version, self.__collections_timings)
+        self.__save_cached_collections(collections=modified_collections)
+
+    def __fetch_collection(self, collection: str) -> Optional[GitDBCollection]:
+        start_time = perf_counter()
+        for try_number in range(1, DBConsts.GIT_DB_FETCH_TRIES + 1):
             try:
-                self.logger.debug(msg=f"Trying to get db data for `{collection}`")
-                url = f"{DBConsts.GIT_DB_URL}{collection}.json"
-                self.logger.debug(msg=f"Requests from -> {url}")
-                headers = {'Content-type': 'application/json;'}
-                res = requests.get(url=url, headers=headers, timeout=DBConsts.REQUEST_TIMEOUT)
-                res_json = res.json()
-                if collection in DBObjectsConsts.DATETIME_ATTRIBUTES.keys():
-                    date_time_attributes = DBObjectsConsts.DATETIME_ATTRIBUTES[collection]
-                    for document in res_json:
-                        for date_time_attribute in date_time_attributes:
-                            if document[date_time_attribute] and isinstance(document[date_time_attribute], str):
-                                document[date_time_attribute] = datetime.fromisoformat(document[date_time_attribute])
-                self.__db[collection] = res_json
-                self.logger.info(f"Done collect data from git db for `{collection}`, Got {len(res_json)}")
-            except ErrorConnectDBException as e:
-                if time_to_try_counter >= 0:
-                    time_to_try_counter -= 1
-                    self.__connect_to_db(time_to_try_counter)
+                self.logger.debug("Trying to get db data for `%s`, try NO. %s", collection, try_number)
+                gitdb_collection = self.__fetcher.fetch(collection=collection)
+                if gitdb_collection is None:
+                    self.logger.info("Git db data for `%s` was not modified, keeping the current data", collection)
                 else:
-                    raise e
+                    self.logger.info(
+                        "Done collect data from git db for `%s`, Got %s", collection, len(gitdb_collection))
+                self.__collections_timings[collection] = {
+                    "seconds": perf_counter() - start_time,
+                    "tries": try_number,
+                    "modified": gitdb_collection is not None
+                }
+                return gitdb_collection
             except Exception as e:
-                desc = f"Error getting git db data for `{collection}`, except: {str(e)}"
-                self.logger.error(desc)
-                self._in_collecting_data_process = False
-                raise ErrorConnectDBException(desc)
-        self.logger.info(f"Done getting collections data of: `{DBConsts.GIT_DB_COLLECTIONS}`")
-        self._in_collecting_data_process = False
+                desc = f"Error getting git db data for `{collection}` " \
+                       f"NO. {try_number}/{DBConsts.GIT_DB_FETCH_TRIES}, except: {str(e)}"
+                self.logger.warning(desc)
+                if try_number == DBConsts.GIT_DB_FETCH_TRIES:
+                    raise ErrorConnectDBException(desc)
+                sleep(DBConsts.GIT_DB_FETCH_RETRY_SLEEP * try_number)
+
+    def get_collections_timings(self) -> dict:
+        """
+        Get the timings of the last fetch of every collection
+        :return: {collection: {"seconds": fetch and parse time, "tries": tries used, "modified": if data changed}}
+        """
+        return dict(self.__collections_timings)
 
     @log_function
     def refresh_db_data(self):
-        self.logger.debug(f"Refreshing db data...")
-        if not self._in_collecting_data_process:
+        self.logger.debug("Refreshing db data...")
+        if not self.__refresh_lock.acquire(blocking=False):
+            self.logger.debug("Skipping refresh, another refresh of the db data is running")
+            return
+        try:
             self.__connect_to_db()
+        finally:
+            self.__refresh_lock.release()
+
+    def trigger_refresh(self):
+        """
+        Refresh the db data now in the background, without waiting for the next refresh time
+        :return:
+        """
+        self.refresher.trigger()
+
+    @log_function
+    def close(self):
+        self.refresher.stop()
+
+    @property
+    def snapshot_version(self) -> int:
+        return self.__get_snapshot().version
+
+    @contextmanager
+    def pin_snapshot(self) -> Iterator[GitDBSnapshot]:
+        """
+        Read all the queries inside the context from the same snapshot, even if a refresh publishes a new one
+
+        # example of use:
+        with db.pin_snapshot():
+            article = db.get_one(table_name="articles", data_filter={"article_id": article_id})
+            cluster = db.get_one(table_name="clusters", data_filter={"cluster_id": article["cluster_id"]})
+
+        :return: the pinned snapshot
+        """
+        pinned_snapshot = PINNED_SNAPSHOT.get()
+        if pinned_snapshot is not None:
+            yield pinned_snapshot
+            return
+        token = PINNED_SNAPSHOT.set(self.__snapshot)
+        try:
+            yield PINNED_SNAPSHOT.get()
+        finally:
+            PINNED_SNAPSHOT.reset(token)
+
+    def __get_snapshot(self) -> GitDBSnapshot:
+        pinned_snapshot = PINNED_SNAPSHOT.get()
+        return pinned_snapshot if pinned_snapshot is not None else self.__snapshot
 
     @log_function
     def get_one(self, table_name: str, data_filter: dict) -> dict:
         try:
-            self.logger.debug(f"Trying to get one data from table: '{table_name}', db: '{self.DB_NAME}'")
-            for document in self.__db[table_name]:
-                for key, value in data_filter.items():
-                    if document[key] and document[key] == value:
-                        self.logger.info(f"Got data from db: '{self.DB_NAME}', table_name: '{table_name}''")
-                        return document
+            self.logger.debug("Trying to get one data from table: '%s', db: '%s'", table_name, self.DB_NAME)
+            collection = self.__get_snapshot().get_collection(table_name=table_name)
+            for document in collection.find(data_filter=data_filter):
+                self.logger.info("Got data from db: '%s', table_name: '%s''", self.DB_NAME, table_name)
+                return document
 
             desc = f"Error find data with filter: {data_filter}, table: '{table_name}', db: '{self.DB_NAME}'"
             self.logger.warning(desc)
             raise DataNotFoundDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error get one from db - {str(e)}")
+            self.logger.error("Error get one from db - %s", e)
             raise e
 
     @log_function
     def get_many(self, table_name: str, data_filter: dict) -> List[dict]:
         try:
-            self.logger.debug(f"Trying to get one data from table: '{table_name}', db: '{self.DB_NAME}'")
-            documents = []
-            data = self.__db[table_name]
-            if not data_filter:
-                return data
-            for document in data:
-                for key, value in data_filter.items():
-                    if value is not None and not document[key]:
-                        continue
-                    if isinstance(value, dict):
-                        if "$in" in value.keys():
-                            if any([document[key] == single_value for single_value in value["$in"]]):
-                                documents.append(document)
-                    elif document[key] == value:
-                        documents.append(document)
-
-            if documents:
-                self.logger.info(f"Got {len(documents)} data from db: '{self.DB_NAME}', table_name: '{table_name}'")
+            self.logger.debug("Trying to get one data from table: '%s', db: '%s'", table_name, self.DB_NAME)
+            collection = self.__get_snapshot().get_collection(table_name=table_name)
+            documents = list(collection.find(data_filter=data_filter))
+            if documents or not data_filter:
+                self.logger.info(
+                    "Got %s data from db: '%s', table_name: '%s'", len(documents), self.DB_NAME, table_name)
                 return documents
             else:
                 desc = f"Error find data with filter: {data_filter}, table: '{table_name}', db: '{self.DB_NAME}'"
                 self.logger.warning(desc)
                 raise DataNotFoundDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error get one from db - {str(e)}")
+            self.logger.error("Error get one from db - %s", e)
+            raise e
+
+    @log_function
+    def iter_many(self, table_name: str, data_filter: dict, projection: Optional[Union[List[str], dict]] = None,
+                  sort: Optional[List[Tuple[str, int]]] = None, limit: int = 0, skip: int = 0,
+                  batch_size: Optional[int] = None) -> Iterator[dict]:
+        try:
+            self.logger.debug("Trying to iterate data from table: '%s', db: '%s'", table_name, self.DB_NAME)
+            collection = self.__get_snapshot().get_collection(table_name=table_name)
+            # The documents are already in memory, batch size has no meaning here
+            return apply_query_options(documents=collection.find(data_filter=data_filter), projection=projection,
+                                       sort=sort, limit=limit, skip=skip)
+        except Exception as e:
+            self.logger.error("Error iterate many from db - %s", e)
+            raise e
+
+    @log_function
+    def find_duplicates(self, table_name: str, field_name: str) -> List[dict]:
+        # The git db documents have no object ids to report, and they cannot be deleted
+        raise NotImplementedError(DBConsts.GIT_DB_FIND_DUPLICATES_ERROR_MSG)
+
+    @log_function
+    def sample(self, table_name: str, data_filter: dict, amount: int) -> List[dict]:
+        try:
+            self.logger.debug("Trying to sample %s data from table: '%s', db: '%s'", amount, table_name, self.DB_NAME)
+            collection = self.__get_snapshot().get_collection(table_name=table_name)
+            documents = reservoir_sample(documents=collection.find(data_filter=data_filter), amount=amount)
+            self.logger.info("Got %s random data from db: '%s', table_name: '%s'", len(documents), self.DB_NAME,
+                             table_name)
+            return documents
+        except Exception as e:
+            self.logger.error("Error sample from db - %s", e)
+            raise e
+
+    @log_function
+    def distinct(self, table_name: str, field_name: str, data_filter: dict = None) -> List[Any]:
+        try:
+            collection = self.__get_snapshot().get_collection(table_name=table_name)
+            values = collection.distinct(field_name=field_name, data_filter=data_filter)
+            self.logger.info("Got %s distinct `%s` from db: '%s', table_name: '%s'", len(values), field_name,
+                             self.DB_NAME, table_name)
+            return values
+        except Exception as e:
+            self.logger.error("Error get distinct from db - %s", e)
+            raise e
+
+    @log_function
+    def get_max(self, table_name: str, field_name: str, data_filter: dict = None) -> Any:
+        try:
+            collection = self.__get_snapshot().get_collection(table_name=table_name)
+            max_value = collection.get_max(field_name=field_name, data_filter=data_filter)
+            if max_value is None:
+                desc = f"Error find max `{field_name}` with filter: {data_filter}, table: '{table_name}', " \
+                       f"db: '{self.DB_NAME}'"
+                self.logger.warning(desc)
+                raise DataNotFoundDBException(desc)
+            return max_value
+        except Exception as e:
+            self.logger.error("Error get max from db - %s", e)
             raise e
 
     @log_function
@@ -151,8 +316,22 @@ class GitDBDriver(DBDriverInterface, Singleton):
     def insert_many(self, table_name: str, data_list: List[dict]) -> List[ObjectId]:
         raise NotImplementedError(DBConsts.GIT_DB_INSERT_ERROR_MSG)
 
-    def update_one(self, table_name: str, data_filter: dict, new_data: dict) -> ObjectId:
+    def update_one(self, table_name: str, data_filter: dict, new_data: dict = None, push_data: dict = None,
+                   inc_data: dict = None, add_to_set_data: dict = None, pull_data: dict = None) -> ObjectId:
+        raise NotImplementedError(DBConsts.GIT_DB_UPDATE_ERROR_MSG)
+
+    def update_many(self, table_name: str, data_filter: dict, new_data: dict = None, push_data: dict = None,
+                    inc_data: dict = None, add_to_set_data: dict = None, pull_data: dict = None) -> List[ObjectId]:
         raise NotImplementedError(DBConsts.GIT_DB_UPDATE_ERROR_MSG)
 
-    def update_many(self, table_name: str, data_filter: dict, new_data: dict) -> List[ObjectId]:
+    def find_one_and_update(self, table_name: str, data_filter: dict, new_data: dict = None,
+                            sort: Optional[List[Tuple[str, int]]] = None, push_data: dict = None,
+                            inc_data: dict = None, add_to_set_data: dict = None, pull_data: dict = None) -> dict:
         raise NotImplementedError(DBConsts.GIT_DB_UPDATE_ERROR_MSG)
+
+    def bulk_write(self, table_name: str, operations: List[BulkOperation],
+                   ordered: bool = True) -> List[BulkOperationResult]:
+        raise NotImplementedError(DBConsts.GIT_DB_BULK_WRITE_ERROR_MSG)
+
+    def upsert_many(self, table_name: str, data_list: List[dict], key_field: str) -> List[BulkOperationResult]:
+        raise NotImplementedError(DBConsts.GIT_DB_BULK_WRITE_ERROR_MSG)
@@ -1,6 +1,8 @@
-from typing import List
+from typing import Any, Iterator, List, Optional, Tuple, Union
 from bson.objectid import ObjectId
 
+from db_driver.db_objects.bulk_operation import BulkOperation, BulkOperationResult
+
 
 class DBDriverInterface:
     def insert_one(self, table_name: str, data: dict) -> ObjectId:
@@ -39,6 +41,61 @@ class DBDriverInterface:
         """
         raise NotImplementedError
 
+    def iter_many(self, table_name: str, data_filter: dict, projection: Optional[Union[List[str], dict]] = None,
+                  sort: Optional[List[Tuple[str, int]]] = None, limit: int = 0, skip: int = 0,
+                  batch_size: Optional[int] = None) -> Iterator[dict]:
+        """
+        Iterate over the data from db lazily, without loading all of it to memory
+        :param table_name:
+        :param data_filter:
+        :param projection: fields to get (list of fields or mongo style projection dict), all the fields if None
+        :param sort: list of (field name, 1 for ascending or -1 for descending)
+        :param limit: max count of data, 0 for no limit
+        :param skip: count of data to skip
+        :param batch_size: count of data fetched in each round trip
+        :return: iterator of wanted data, empty if nothing is matching
+        """
+        raise NotImplementedError
+
+    def sample(self, table_name: str, data_filter: dict, amount: int) -> List[dict]:
+        """
+        Get random data from db
+        :param table_name:
+        :param data_filter:
+        :param amount: count of data to get
+        :return: list of random matching data, shorter than the amount if there is not enough matching data
+        """
+        raise NotImplementedError
+
+    def distinct(self, table_name: str, field_name: str, data_filter: dict = None) -> List[Any]:
+        """
+        Get the distinct values of the field, the items of array fields are values
+        :param table_name:
+        :param field_name:
+        :param data_filter: all the data if None
+        :return: list of the distinct values
+        """
+        raise NotImplementedError
+
+    def get_max(self, table_name: str, field_name: str, data_filter: dict = None) -> Any:
+        """
+        Get the max value of the field
+        :param table_name:
+        :param field_name:
+        :param data_filter: all the data if None
+        :return: the max value, raise DataNotFoundDBException if no data has a value
+        """
+        raise NotImplementedError
+
+    def find_duplicates(self, table_name: str, field_name: str) -> List[dict]:
+        """
+        Find the values of the field that more than one data has, in one pass over the table
+        :param table_name:
+        :param field_name:
+        :return: list of {"value": duplicated value, "ids": object ids of its data, oldest first, "count": count}
+        """
+        raise NotImplementedError
+
     def delete_one(self, table_name: str, data_filter: dict) -> bool:
         """
         Delete one data from db
@@ -57,26 +114,53 @@ class DBDriverInterface:
         """
         raise NotImplementedError
 
-    def update_one(self, table_name: str, data_filter: dict, new_data: dict) -> ObjectId:
+    def update_one(self, table_name: str, data_filter: dict, new_data: dict = None, push_data: dict = None,
+                   inc_data: dict = None, add_to_set_data: dict = None, pull_data: dict = None) -> ObjectId:
         """
         Update one data in db
         :param table_name:
         :param data_filter:
-        :param new_data:
+        :param new_data: fields to set
+        :param push_data: {array field: item to append}
+        :param inc_data: {number field: amount to add}
+        :param add_to_set_data: {array field: item to append if it is not in the array}
+        :param pull_data: {array field: item or condition of the items to remove from the array}
         :return: object id of updated data
         """
         raise NotImplementedError
 
-    def update_many(self, table_name: str, data_filter: dict, new_data: dict) -> List[ObjectId]:
+    def update_many(self, table_name: str, data_filter: dict, new_data: dict = None, push_data: dict = None,
+                    inc_data: dict = None, add_to_set_data: dict = None, pull_data: dict = None) -> List[ObjectId]:
         """
         Update many data in db
         :param table_name:
         :param data_filter:
-        :param new_data:
+        :param new_data: fields to set
+        :param push_data: {array field: item to append}
+        :param inc_data: {number field: amount to add}
+        :param add_to_set_data: {array field: item to append if it is not in the array}
+        :param pull_data: {array field: item or condition of the items to remove from the array}
         :return: list of object ids of updated data
         """
         raise NotImplementedError
 
+    def find_one_and_update(self, table_name: str, data_filter: dict, new_data: dict = None,
+                            sort: Optional[List[Tuple[str, int]]] = None, push_data: dict = None,
+                            inc_data: dict = None, add_to_set_data: dict = None, pull_data: dict = None) -> dict:
+        """
+        Update one data in db and get it after the update, atomically
+        :param table_name:
+        :param data_filter:
+        :param new_data: fields to set
+        :param push_data: {array field: item to append}
+        :param inc_data: {number field: amount to add}
+        :param add_to_set_data: {array field: item to append if it is not in the array}
+        :param pull_data: {array field: item or condition of the items to remove from the array}
+        :param sort: list of (field name, 1 or -1), the first matching data by this order is updated
+        :return: the updated data
+        """
+        raise NotImplementedError
+
     def count(self, table_name: str, data_filter: dict) -> int:
         """
         Count data in db by data_filter
@@ -94,3 +178,24 @@ class DBDriverInterface:
         :return: if the data is existing in table by data filter
         """
         raise NotImplementedError
+
+    def bulk_write(self, table_name: str, operations: List[BulkOperation],
+                   ordered: bool = True) -> List[BulkOperationResult]:
+        """
+        Run many insert / update / upsert / delete operations in one round trip
+        :param table_name:
+        :param operations:
+        :param ordered: stop at the first failed operation if True, else run all the operations
+        :return: result of every operation, in the order of the operations
+        """
+        raise NotImplementedError
+
+    def upsert_many(self, table_name: str, data_list: List[dict], key_field: str) -> List[BulkOperationResult]:
+        """
+        Update every data by its key field, insert it if it is not existing, in one round trip
+        :param table_name:
+        :param data_list:
+        :param key_field: field that identifies the data, like `article_id`
+        :return: result of every data, in the order of the data list
+        """
+        raise NotImplementedError
@@ -1,37 +1,136 @@
 import os
-from typing import List
+import threading
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
 
 from bson import ObjectId
-from pymongo import MongoClient
+from pymongo import InsertOne, UpdateOne, UpdateMany, DeleteOne, DeleteMany, ReturnDocument
+from pymongo.database import Database
+from pymongo.errors import BulkWriteError
 
+from db_driver.db_objects.bulk_operation import BulkOperation, BulkOperationResult
 from db_driver.insterfaces.interface_db_driver import DBDriverInterface
+from db_driver.utils.consts import BulkOperationConsts, DBConsts
 from db_driver.utils.exceptions import ErrorConnectDBException, InsertDataDBException, DataNotFoundDBException, \
     DeleteDataDBException, UpdateDataDBException
+from db_utils.mongo_client_registry import MongoClientRegistry
 from db_utils.validation_utils import get_mongodb_connection_string
 from logger import get_current_logger, log_function
 
 
 class MongoDBDriver(DBDriverInterface):
     DB_NAME = os.getenv(key='DB_NAME', default='local')
+    INDEX_OPTIONS = ["unique", "expireAfterSeconds"]
+    __indexed_dbs = set()
+    __indexes_lock = threading.Lock()
 
     def __init__(self):
         self.logger = get_current_logger()
+        self.indexes_report: Dict[str, Dict[str, List[str]]] = dict()
         self.__connect_to_db()
-        self.logger.debug(f"Connected to mongodb")
+        self.logger.debug("Connected to mongodb")
+        if DBConsts.ENSURE_INDEXES:
+            self.__ensure_indexes_once()
 
     def __connect_to_db(self):
         try:
             self._connection_string = get_mongodb_connection_string()
-            self.__client = MongoClient(self._connection_string)
-            self.__db = self.__client[self.DB_NAME]
+            self.__client = MongoClientRegistry.get_client(connection_string=self._connection_string)
+            self.__database = self.__client[self.DB_NAME]
         except Exception as e:
             desc = f"Error connecting to MongoDB, except: {str(e)}"
             self.logger.error(desc)
             raise ErrorConnectDBException(desc)
 
+    @property
+    def __db(self) -> Database:
+        # The client is shared by the whole process, get it from the registry again if it was closed or forked
+        client = MongoClientRegistry.get_client(connection_string=self._connection_string)
+        if client is not self.__client:
+            self.__client = client
+            self.__database = client[self.DB_NAME]
+        return self.__database
+
+    def __ensure_indexes_once(self):
+        """
+        Apply the indexes registry once per connection string and db, failures don't fail the connection
+        :return:
+        """
+        db_key = (self._connection_string, self.DB_NAME)
+        with MongoDBDriver.__indexes_lock:
+            if db_key in MongoDBDriver.__indexed_dbs:
+                return
+            try:
+                self.indexes_report = self.ensure_indexes()
+                MongoDBDriver.__indexed_dbs.add(db_key)
+            except Exception as e:
+                self.logger.error("Error ensuring indexes of db: '%s' - %s", self.DB_NAME, e)
+
+    @staticmethod
+    def get_index_name(keys: List[Tuple[str, int]]) -> str:
+        """
+        Get the default mongo name of the index
+
+        >>> MongoDBDriver.get_index_name([("status", 1), ("creation_time", -1)])
+        'status_1_creation_time_-1'
+        """
+        return "_".join(f"{field_name}_{direction}" for field_name, direction in keys)
+
+    @log_function
+    def ensure_indexes(self, tables_indexes: Dict[str, List[dict]] = None) -> Dict[str, Dict[str, List[str]]]:
+        """
+        Create the missing indexes of the tables, existing indexes are not changed or dropped
+        :param tables_indexes: {table name: indexes}, `DBConsts.DB_INDEXES` if None
+        :return: {table name: {"created", "existing", "missing" (failed to create), "mismatched" (existing with other
+                  options), "extra" (existing and not in the registry): index names}}
+        """
+        tables_indexes = tables_indexes if tables_indexes is not None else DBConsts.DB_INDEXES
+        report = dict()
+        for table_name, indexes in tables_indexes.items():
+            collection = self.__db[table_name]
+            existing_indexes = collection.index_information()
+            table_report = {"created": [], "existing": [], "missing": [], "mismatched": [], "extra": []}
+            index_names = set()
+            for index in indexes:
+                options = {option: value for option, value in index.items() if option != "keys"}
+                index_name = self.get_index_name(keys=index["keys"])
+                index_names.add(index_name)
+                existing_index = existing_indexes.get(index_name)
+                if existing_index is not None:
+                    is_matching = all(existing_index.get(option) == options.get(option)
+                                      for option in self.INDEX_OPTIONS)
+                    table_report["existing" if is_matching else "mismatched"].append(index_name)
+                    continue
+                try:
+                    collection.create_index(index["keys"], name=index_name, **options)
+                    table_report["created"].append(index_name)
+                except Exception as e:
+                    self.logger.error("Error creating index: '%s', table: '%s' - %s", index_name, table_name, e)
+                    table_report["missing"].append(index_name)
+
+            table_report["extra"] = [index_name for index_name in existing_indexes
+                                     if index_name != "_id_" and index_name not in index_names]
+            report[table_name] = table_report
+            if table_report["missing"] or table_report["mismatched"] or table_report["extra"]:
+                self.logger.warning(
+                    "Indexes of table: '%s' are not matching the registry: %s", table_name, table_report)
+            else:
+                self.logger.info("Indexes of table: '%s' are up to date, created: %s", table_name,
+                                 table_report["created"])
+        return report
+
     @log_function
     def close(self):
-        self.__client.close()
+        """
+        Release the client reference of this driver. The pooled client is shared by all the drivers of the process and
+        stays open for them, it is closed by `MongoClientRegistry.close_all`
+        :return:
+        """
+        self.__client = None
+        self.__database = None
+
+    @log_function
+    def get_pool_stats(self) -> dict:
+        return MongoClientRegistry.get_pool_stats(connection_string=self._connection_string)
 
     @log_function
     def list_collection_names(self) -> List[str]:
@@ -40,177 +139,384 @@ class MongoDBDriver(DBDriverInterface):
     @log_function
     def insert_one(self, table_name: str, data: dict) -> ObjectId:
         try:
-            self.logger.debug(f"Trying to insert data to table: '{table_name}', db: '{self.DB_NAME}'")
+            self.logger.debug("Trying to insert data to table: '%s', db: '%s'", table_name, self.DB_NAME)
             res = self.__db[table_name].insert_one(data)
             if res:
-                self.logger.info(f"Successfully inserted data to db, object id: '{str(res.inserted_id)}'")
+                self.logger.info("Successfully inserted data to db, object id: '%s'", res.inserted_id)
                 return res.inserted_id
             else:
                 desc = f"Error insert data: {data}, table: '{table_name}', db: '{self.DB_NAME}'"
                 self.logger.error(desc)
                 raise InsertDataDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error insert data to db - {str(e)}")
+            self.logger.error("Error insert data to db - %s", e)
             raise e
 
     @log_function
     def insert_many(self, table_name: str, data_list: List[dict]) -> List[ObjectId]:
         if not data_list:
-            self.logger.warning(f"Error insert many to db, data list is empty")
+            self.logger.warning("Error insert many to db, data list is empty")
             return list()
         try:
-            self.logger.debug(f"Trying to insert {len(data_list)} to table: '{table_name}', db: '{self.DB_NAME}'")
+            self.logger.debug("Trying to insert %s to table: '%s', db: '%s'", len(data_list), table_name, self.DB_NAME)
             res = self.__db[table_name].insert_many(data_list)
             if res:
                 for inserted_id in res.inserted_ids:
-                    self.logger.info(f"Successfully inserted data to db, object id: {str(inserted_id)}")
+                    self.logger.info("Successfully inserted data to db, object id: %s", inserted_id)
                 return res.inserted_ids
             else:
-                desc = f"Error insert data: {data_list}, table: '{table_name}', db: '{self.DB_NAME}'"
+                desc = f"Error insert {len(data_list)} data, table: '{table_name}', db: '{self.DB_NAME}'"
                 self.logger.error(desc)
                 raise InsertDataDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error insert data to db - {str(e)}")
+            self.logger.error("Error insert data to db - %s", e)
             raise e
 
     @log_function
     def get_one(self, table_name: str, data_filter: dict) -> dict:
         try:
-            self.logger.debug(f"Trying to get one data from table: '{table_name}', db: '{self.DB_NAME}'")
+            self.logger.debug("Trying to get one data from table: '%s', db: '%s'", table_name, self.DB_NAME)
             res = self.__db[table_name].find_one(data_filter)
             if res:
                 object_id = res.get('_id')
-                self.logger.info(f"Got data from db: '{self.DB_NAME}', table_name: '{table_name}', id: '{object_id}'")
+                self.logger.info(
+                    "Got data from db: '%s', table_name: '%s', id: '%s'", self.DB_NAME, table_name, object_id)
                 return dict(res)
             else:
                 desc = f"Error find data with filter: {data_filter}, table: '{table_name}', db: '{self.DB_NAME}'"
                 self.logger.warning(desc)
                 raise DataNotFoundDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error get one from db - {str(e)}")
+            self.logger.error("Error get one from db - %s", e)
             raise e
 
     @log_function
     def delete_one(self, table_name: str, data_filter: dict) -> bool:  # TODO: check
         try:
-            self.logger.debug(f"Trying to delete one data from table: '{table_name}', db: '{self.DB_NAME}'")
+            self.logger.debug("Trying to delete one data from table: '%s', db: '%s'", table_name, self.DB_NAME)
             res = self.__db[table_name].delete_one(data_filter)
             if res:
                 object_id = res.raw_result.get('_id')
                 self.logger.info(
-                    f"Deleted data from db: '{self.DB_NAME}', table_name: '{table_name}', id: '{object_id}'")
+                    "Deleted data from db: '%s', table_name: '%s', id: '%s'", self.DB_NAME, table_name, object_id)
                 return True
             else:
                 desc = f"Error delete data with filter: {data_filter}, table: '{table_name}, db: {self.DB_NAME}'"
                 self.logger.error(desc)
                 raise DeleteDataDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error delete one from db: {str(e)}")
+            self.logger.error("Error delete one from db: %s", e)
             return False
 
     @log_function
     def delete_many(self, table_name: str, data_filter: dict) -> bool:
         try:
-            self.logger.debug(f"Trying to delete collection of data from table: '{table_name}', db: '{self.DB_NAME}'")
+            self.logger.debug(
+                "Trying to delete collection of data from table: '%s', db: '%s'", table_name, self.DB_NAME)
             res = self.__db[table_name].delete_many(data_filter)
             if res:
                 self.logger.info(
-                    f"Deleted {res.deleted_count} records from db: '{self.DB_NAME}', " f"table_name: '{table_name}'")
+                    "Deleted %s records from db: '%s', table_name: '%s'", res.deleted_count, self.DB_NAME, table_name)
                 return True
             else:
                 desc = f"Error delete data with filter: {data_filter}, table: '{table_name}, db: {self.DB_NAME}'"
                 self.logger.error(desc)
                 raise DeleteDataDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error delete many from db: {str(e)}")
+            self.logger.error("Error delete many from db: %s", e)
             return False
 
+    @staticmethod
+    def _build_update(new_data: dict = None, push_data: dict = None, inc_data: dict = None,
+                      add_to_set_data: dict = None, pull_data: dict = None) -> dict:
+        """
+        Build the update document, only the given fields are changed
+
+        >>> MongoDBDriver._build_update(new_data={"status": "failed"}, inc_data={"failed_count": 1})
+        {'$set': {'status': 'failed'}, '$inc': {'failed_count': 1}}
+
+        :param new_data: fields to set
+        :param push_data: {array field: item to append}
+        :param inc_data: {number field: amount to add}
+        :param add_to_set_data: {array field: item to append if it is not in the array}
+        :param pull_data: {array field: item or condition of the items to remove from the array}
+        :return:
+        """
+        update = dict()
+        for update_operator, data in [("$set", new_data), ("$push", push_data), ("$inc", inc_data),
+                                      ("$addToSet", add_to_set_data), ("$pull", pull_data)]:
+            if data:
+                update[update_operator] = data
+        if not update:
+            raise ValueError("Cannot update without new data")
+        return update
+
     @log_function
-    def update_one(self, table_name: str, data_filter: dict, new_data: dict) -> ObjectId:
+    def update_one(self, table_name: str, data_filter: dict, new_data: dict = None, push_data: dict = None,
+                   inc_data: dict = None, add_to_set_data: dict = None, pull_data: dict = None) -> ObjectId:
         try:
-            self.logger.debug(f"Trying to update one data from table: '{table_name}', db: '{self.DB_NAME}'")
-            res = self.__db[table_name].update_one(data_filter, {"$set": new_data})
+            self.logger.debug("Trying to update one data from table: '%s', db: '%s'", table_name, self.DB_NAME)
+            update = self._build_update(new_data=new_data, push_data=push_data, inc_data=inc_data,
+                                        add_to_set_data=add_to_set_data, pull_data=pull_data)
+            res = self.__db[table_name].update_one(data_filter, update)
             if res:
                 object_id = res.raw_result.get('_id')
                 self.logger.info(
-                    f"updated one data from db: '{self.DB_NAME}', table_name: '{table_name}', id: '{object_id}'")
+                    "updated one data from db: '%s', table_name: '%s', id: '%s'", self.DB_NAME, table_name, object_id)
                 return object_id
             else:
                 desc = f"Error update data with filter: {data_filter}, table: '{table_name}, db: {self.DB_NAME}'"
                 self.logger.error(desc)
                 raise UpdateDataDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error update one from db: {str(e)}")
+            self.logger.error("Error update one from db: %s", e)
             raise e
 
     @log_function
-    def update_many(self, table_name: str, data_filter: dict, new_data: dict) -> List[ObjectId]:
+    def update_many(self, table_name: str, data_filter: dict, new_data: dict = None, push_data: dict = None,
+                    inc_data: dict = None, add_to_set_data: dict = None, pull_data: dict = None) -> List[ObjectId]:
         try:
-            self.logger.debug(
-                f"Trying to update {len(new_data)} records from table: '{table_name}', db: '{self.DB_NAME}'")
-            res = self.__db[table_name].update_many(data_filter, new_data)
+            self.logger.debug("Trying to update many records from table: '%s', db: '%s'", table_name, self.DB_NAME)
+            update = self._build_update(new_data=new_data, push_data=push_data, inc_data=inc_data,
+                                        add_to_set_data=add_to_set_data, pull_data=pull_data)
+            res = self.__db[table_name].update_many(data_filter, update)
             if res:
                 object_id = res.raw_result.get('_id')
                 self.logger.info(
-                    f"updated {res.matched_count} records from db: '{self.DB_NAME}', table_name: '{table_name}', id: '{object_id}'")
+                    "updated %s records from db: '%s', table_name: '%s', id: '%s'",
+                    res.matched_count, self.DB_NAME, table_name, object_id)
                 return object_id
             else:
                 desc = f"Error update data with filter: {data_filter}, table: '{table_name}, db: {self.DB_NAME}'"
                 self.logger.error(desc)
                 raise UpdateDataDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error delete one from db: {str(e)}")
+            self.logger.error("Error update many from db: %s", e)
+            raise e
+
+    @log_function
+    def find_duplicates(self, table_name: str, field_name: str) -> List[dict]:
+        try:
+            self.logger.debug("Trying to find duplicates of `%s` from table: '%s', db: '%s'", field_name, table_name,
+                              self.DB_NAME)
+            pipeline = [
+                {"$match": {field_name: {"$ne": None}}},
+                {"$sort": {"_id": 1}},
+                {"$group": {"_id": f"${field_name}", "ids": {"$push": "$_id"}, "count": {"$sum": 1}}},
+                {"$match": {"count": {"$gt": 1}}},
+                {"$project": {"_id": 0, "value": "$_id", "ids": 1, "count": 1}}
+            ]
+            duplicates = list(self.__db[table_name].aggregate(pipeline, allowDiskUse=True))
+            self.logger.info("Found %s duplicated `%s` in db: '%s', table_name: '%s'", len(duplicates), field_name,
+                             self.DB_NAME, table_name)
+            return duplicates
+        except Exception as e:
+            self.logger.error("Error find duplicates from db - %s", e)
+            raise e
+
+    @log_function
+    def sample(self, table_name: str, data_filter: dict, amount: int) -> List[dict]:
+        try:
+            self.logger.debug("Trying to sample %s data from table: '%s', db: '%s'", amount, table_name, self.DB_NAME)
+            if amount <= 0:
+                return list()
+            pipeline = [{"$match": data_filter}, {"$sample": {"size": amount}}]
+            documents = list(self.__db[table_name].aggregate(pipeline))
+            self.logger.info("Got %s random data from db: '%s', table_name: '%s'", len(documents), self.DB_NAME,
+                             table_name)
+            return documents
+        except Exception as e:
+            self.logger.error("Error sample from db - %s", e)
+            raise e
+
+    @log_function
+    def distinct(self, table_name: str, field_name: str, data_filter: dict = None) -> List[Any]:
+        try:
+            self.logger.debug("Trying to get distinct `%s` from table: '%s', db: '%s'", field_name, table_name,
+                              self.DB_NAME)
+            values = [value for value in self.__db[table_name].distinct(field_name, data_filter or {})
+                      if value is not None]
+            self.logger.info("Got %s distinct `%s` from db: '%s', table_name: '%s'", len(values), field_name,
+                             self.DB_NAME, table_name)
+            return values
+        except Exception as e:
+            self.logger.error("Error get distinct from db - %s", e)
+            raise e
+
+    @log_function
+    def get_max(self, table_name: str, field_name: str, data_filter: dict = None) -> Any:
+        try:
+            self.logger.debug("Trying to get max `%s` from table: '%s', db: '%s'", field_name, table_name, self.DB_NAME)
+            has_value_filter = {field_name: {"$ne": None}}
+            data_filter = {"$and": [data_filter, has_value_filter]} if data_filter else has_value_filter
+            # With an index on the field, this reads one index entry
+            res = self.__db[table_name].find_one(data_filter, projection={field_name: 1}, sort=[(field_name, -1)])
+            if res:
+                return res[field_name]
+            else:
+                desc = f"Error find max `{field_name}` with filter: {data_filter}, table: '{table_name}', " \
+                       f"db: '{self.DB_NAME}'"
+                self.logger.warning(desc)
+                raise DataNotFoundDBException(desc)
+        except Exception as e:
+            self.logger.error("Error get max from db - %s", e)
+            raise e
+
+    @log_function
+    def find_one_and_update(self, table_name: str, data_filter: dict, new_data: dict = None,
+                            sort: Optional[List[Tuple[str, int]]] = None, push_data: dict = None,
+                            inc_data: dict = None, add_to_set_data: dict = None, pull_data: dict = None) -> dict:
+        try:
+            self.logger.debug("Trying to find and update one data from table: '%s', db: '%s'", table_name, self.DB_NAME)
+            update = self._build_update(new_data=new_data, push_data=push_data, inc_data=inc_data,
+                                        add_to_set_data=add_to_set_data, pull_data=pull_data)
+            res = self.__db[table_name].find_one_and_update(data_filter, update, sort=sort,
+                                                            return_document=ReturnDocument.AFTER)
+            if res:
+                self.logger.info("Found and updated data from db: '%s', table_name: '%s', id: '%s'",
+                                 self.DB_NAME, table_name, res.get('_id'))
+                return dict(res)
+            else:
+                desc = f"Error find data with filter: {data_filter}, table: '{table_name}', db: '{self.DB_NAME}'"
+                self.logger.debug(desc)
+                raise DataNotFoundDBException(desc)
+        except DataNotFoundDBException as e:
+            raise e
+        except Exception as e:
+            self.logger.error("Error find one and update from db - %s", e)
             raise e
 
     @log_function
     def count(self, table_name: str, data_filter: dict) -> int:
         try:
             self.logger.debug(
-                f"Trying to count table: '{table_name}', db: '{self.DB_NAME}'")
+                "Trying to count table: '%s', db: '%s'", table_name, self.DB_NAME)
             res = self.__db[table_name].count_documents(data_filter)
             if res and res > 0:
-                self.logger.info(f"Counted {res} records from db: '{self.DB_NAME}', table_name: '{table_name}")
+                self.logger.info("Counted %s records from db: '%s', table_name: '%s", res, self.DB_NAME, table_name)
                 return res
             else:
                 desc = f"Didn't find record with filter: {data_filter}, table: '{table_name}, db: {self.DB_NAME}'"
                 self.logger.debug(desc)
                 return 0
         except Exception as e:
-            self.logger.error(f"Error counting from db: {str(e)}")
+            self.logger.error("Error counting from db: %s", e)
             raise e
 
     @log_function
     def exists(self, table_name: str, data_filter: dict) -> bool:
         try:
             self.logger.debug(
-                f"Trying to count table: '{table_name}', db: '{self.DB_NAME}'")
+                "Trying to count table: '%s', db: '%s'", table_name, self.DB_NAME)
             res = self.count(table_name, data_filter)
             if res and res > 0:
                 # object_id = res.raw_result.get('_id')
                 self.logger.info(
-                    f"Found {res} in db: '{self.DB_NAME}', table_name: '{table_name}'")
+                    "Found %s in db: '%s', table_name: '%s'", res, self.DB_NAME, table_name)
                 return True
             else:
                 desc = f"Didn't find record with filter: {data_filter}, table: '{table_name}, db: {self.DB_NAME}'"
                 self.logger.warning(desc)
                 return False
         except Exception as e:
-            self.logger.error(f"Error counting from db: {str(e)}")
+            self.logger.error("Error counting from db: %s", e)
             return False
 
     @log_function
     def get_many(self, table_name: str, data_filter: dict) -> List[dict]:
         try:
-            self.logger.debug(f"Trying to get one data from table: '{table_name}', db: '{self.DB_NAME}'")
+            self.logger.debug("Trying to get one data from table: '%s', db: '%s'", table_name, self.DB_NAME)
             res = self.__db[table_name].find(data_filter)
             if res:
                 list_res = list(res)
-                self.logger.info(f"Got {len(list_res)} data from db: '{self.DB_NAME}', table_name: '{table_name}'")
+                self.logger.info("Got %s data from db: '%s', table_name: '%s'", len(list_res), self.DB_NAME, table_name)
                 return list_res
             else:
                 desc = f"Error find data with filter: {data_filter}, table: '{table_name}', db: '{self.DB_NAME}'"
                 self.logger.warning(desc)
                 raise DataNotFoundDBException(desc)
         except Exception as e:
-            self.logger.error(f"Error get many from db - {str(e)}")
+            self.logger.error("Error get many from db - %s", e)
+            raise e
+
+    @log_function
+    def iter_many(self, table_name: str, data_filter: dict, projection: Optional[Union[List[str], dict]] = None,
+                  sort: Optional[List[Tuple[str, int]]] = None, limit: int = 0, skip: int = 0,
+                  batch_size: Optional[int] = None) -> Iterator[dict]:
+        try:
+            self.logger.debug("Trying to iterate data from table: '%s', db: '%s'", table_name, self.DB_NAME)
+            cursor = self.__db[table_name].find(data_filter, projection=projection, skip=skip, limit=limit,
+                                                batch_size=batch_size or DBConsts.ITER_MANY_BATCH_SIZE)
+            if sort:
+                cursor = cursor.sort(sort)
+            return cursor
+        except Exception as e:
+            self.logger.error("Error iterate many from db - %s", e)
+            raise e
+
+    @staticmethod
+    def __to_write_request(operation: BulkOperation):
+        if operation.operation == BulkOperationConsts.INSERT_ONE:
+            return InsertOne(operation.data)
+        elif operation.operation in [BulkOperationConsts.UPDATE_ONE, BulkOperationConsts.UPDATE_MANY]:
+            update = MongoDBDriver._build_update(new_data=operation.new_data, push_data=operation.push_data,
+                                                 inc_data=operation.inc_data,
+                                                 add_to_set_data=operation.add_to_set_data,
+                                                 pull_data=operation.pull_data)
+            update_class = UpdateOne if operation.operation == BulkOperationConsts.UPDATE_ONE else UpdateMany
+            return update_class(operation.data_filter, update, upsert=operation.upsert)
+        elif operation.operation == BulkOperationConsts.DELETE_ONE:
+            return DeleteOne(operation.data_filter)
+        else:
+            return DeleteMany(operation.data_filter)
+
+    @log_function
+    def bulk_write(self, table_name: str, operations: List[BulkOperation],
+                   ordered: bool = True) -> List[BulkOperationResult]:
+        if not operations:
+            self.logger.warning("Error bulk write to db, operations list is empty")
+            return list()
+        try:
+            self.logger.debug("Trying to bulk write %s operations to table: '%s', db: '%s', ordered: %s",
+                              len(operations), table_name, self.DB_NAME, ordered)
+            requests = [self.__to_write_request(operation) for operation in operations]
+            write_errors = dict()
+            try:
+                res = self.__db[table_name].bulk_write(requests, ordered=ordered)
+                upserted_ids = res.upserted_ids or dict()
+            except BulkWriteError as e:
+                write_errors = {error["index"]: error.get("errmsg") for error in e.details.get("writeErrors", [])}
+                upserted_ids = {upserted["index"]: upserted["_id"] for upserted in e.details.get("upserted", [])}
+                self.logger.warning("Bulk write to table: '%s' had %s failed operations", table_name, len(write_errors))
+
+            # An ordered bulk stops at its first error, the next operations were not executed
+            first_error_index = min(write_errors) if ordered and write_errors else len(operations)
+            results = list()
+            for index, operation in enumerate(operations):
+                if index in write_errors:
+                    error = write_errors[index]
+                elif index > first_error_index:
+                    error = BulkOperationConsts.NOT_EXECUTED_ERROR_MSG
+                else:
+                    error = None
+                inserted_id = operation.data.get("_id") \
+                    if error is None and operation.operation == BulkOperationConsts.INSERT_ONE else None
+                results.append(BulkOperationResult(index=index, operation=operation.operation, succeeded=error is None,
+                                                   inserted_id=inserted_id, upserted_id=upserted_ids.get(index),
+                                                   error=error))
+            self.logger.info("Bulk wrote %s/%s operations to db: '%s', table_name: '%s'",
+                             len([result for result in results if result.succeeded]), len(results), self.DB_NAME,
+                             table_name)
+            return results
+        except Exception as e:
+            self.logger.error("Error bulk write to db - %s", e)
             raise e
+
+    @log_function
+    def upsert_many(self, table_name: str, data_list: List[dict], key_field: str) -> List[BulkOperationResult]:
+        operations = [
+            BulkOperation(operation=BulkOperationConsts.UPDATE_ONE, data_filter={key_field: data[key_field]},
+                          new_data=data, upsert=True)
+            for data in data_list
+        ]
+        return self.bulk_write(table_name=table_name, operations=operations, ordered=False)
@@ -0,0 +1,26 @@
+from unittest import TestCase
+
+from db_driver.db_objects.bulk_operation import BulkOperation
+from db_driver.utils.consts import BulkOperationConsts
+
+
+class TestBulkOperation(TestCase):
+    def test_valid_operations(self):
+        BulkOperation(operation=BulkOperationConsts.INSERT_ONE, data={"article_id": "1"})
+        BulkOperation(operation=BulkOperationConsts.UPDATE_ONE, data_filter={"article_id": "1"},
+                      new_data={"cluster_id": "2"}, upsert=True)
+        BulkOperation(operation=BulkOperationConsts.UPDATE_MANY, data_filter={"cluster_id": "1"},
+                      pull_data={"articles_id": {"$in": ["1", "2"]}})
+        BulkOperation(operation=BulkOperationConsts.DELETE_MANY, data_filter={})
+
+    def test_unknown_operation(self):
+        with self.assertRaises(ValueError):
+            BulkOperation(operation="replace_one", data_filter={"article_id": "1"})
+
+    def test_missing_fields(self):
+        with self.assertRaises(ValueError):
+            BulkOperation(operation=BulkOperationConsts.INSERT_ONE)
+        with self.assertRaises(ValueError):
+            BulkOperation(operation=BulkOperationConsts.DELETE_ONE)
+        with self.assertRaises(ValueError):
+            BulkOperation(operation=BulkOperationConsts.UPDATE_MANY, data_filter={"cluster_id": None})
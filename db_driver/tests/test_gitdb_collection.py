@@ -0,0 +1,67 @@
+from unittest import TestCase
+
+from db_driver.gitdb.gitdb_collection import GitDBCollection
+
+
+def init_articles():
+    return [
+        {"article_id": "1", "url": "cnn.com/1", "domain": "cnn", "cluster_id": None, "rank": 3},
+        {"article_id": "2", "url": "bbc.com/2", "domain": "bbc", "cluster_id": "c1", "rank": 7},
+        {"article_id": "3", "url": "cnn.com/3", "domain": "cnn", "cluster_id": "c1", "rank": None},
+        {"article_id": "4", "url": "nbc.com/4", "domain": "nbc", "cluster_id": None, "title": "test", "rank": 5},
+    ]
+
+
+class TestGitDBCollection(TestCase):
+    def setUp(self):
+        self.collection = GitDBCollection.from_documents(
+            documents=init_articles(), indexed_fields=["article_id", "url", "domain", "cluster_id"],
+            max_fields=["rank"]
+        )
+
+    def test_point_lookup(self):
+        documents = list(self.collection.find(data_filter={"article_id": "3"}))
+        self.assertEqual(["3"], [document["article_id"] for document in documents])
+
+    def test_in_lookup(self):
+        data_filter = {"url": {"$in": ["nbc.com/4", "cnn.com/1", "missing.com"]}}
+        documents = list(self.collection.find(data_filter=data_filter))
+        self.assertEqual(["1", "4"], [document["article_id"] for document in documents])
+
+    def test_index_intersection(self):
+        positions, residual_filter = self.collection.find_positions(data_filter={"domain": "cnn", "cluster_id": None})
+        self.assertEqual([0], positions)
+        self.assertEqual({}, residual_filter)
+
+    def test_residual_filter_scan(self):
+        data_filter = {"cluster_id": None, "title": "test"}
+        positions, residual_filter = self.collection.find_positions(data_filter=data_filter)
+        self.assertEqual([0, 3], positions)
+        self.assertEqual({"title": "test"}, residual_filter)
+        documents = list(self.collection.find(data_filter=data_filter))
+        self.assertEqual(["4"], [document["article_id"] for document in documents])
+
+    def test_not_found(self):
+        self.assertEqual([], list(self.collection.find(data_filter={"article_id": "5", "domain": "cnn"})))
+
+    def test_empty_filter(self):
+        self.assertEqual(4, len(list(self.collection.find(data_filter={}))))
+
+    def test_distinct(self):
+        self.assertEqual(["cnn", "bbc", "nbc"], self.collection.distinct(field_name="domain"))
+        self.assertEqual(["c1"], self.collection.distinct(field_name="cluster_id"))
+        distinct_domains = self.collection.distinct(field_name="domain", data_filter={"cluster_id": "c1"})
+        self.assertEqual(["bbc", "cnn"], distinct_domains)
+        self.assertEqual([3, 7, 5], self.collection.distinct(field_name="rank"))
+
+    def test_distinct_array_field(self):
+        collection = GitDBCollection.from_documents(
+            documents=[{"domains": ["cnn", "bbc"]}, {"domains": ["bbc", "nbc"]}], indexed_fields=["domains"])
+        self.assertEqual(["cnn", "bbc", "nbc"], collection.distinct(field_name="domains"))
+        self.assertEqual(["bbc", "nbc"], collection.distinct(field_name="domains", data_filter={"domains": "nbc"}))
+
+    def test_max(self):
+        self.assertEqual({"rank": 7}, self.collection.max_values)
+        self.assertEqual(7, self.collection.get_max(field_name="rank"))
+        self.assertEqual(5, self.collection.get_max(field_name="rank", data_filter={"cluster_id": None}))
+        self.assertIsNone(self.collection.get_max(field_name="title", data_filter={"domain": "cnn"}))
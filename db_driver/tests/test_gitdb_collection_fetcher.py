@@ -0,0 +1,68 @@
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import TestCase
+
+from db_driver.gitdb.collection_fetcher import GitDBCollectionFetcher
+
+ARTICLES = [{"article_id": "1", "collecting_time": "2023-08-01T10:00:00", "publishing_time": None}]
+ETAG = '"articles-v1"'
+
+
+class GitDBStandInHandler(BaseHTTPRequestHandler):
+    requests_count = 0
+    not_modified_count = 0
+
+    def do_GET(self):
+        GitDBStandInHandler.requests_count += 1
+        if self.headers.get("If-None-Match") == ETAG:
+            GitDBStandInHandler.not_modified_count += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+
+        body = json.dumps(ARTICLES).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", ETAG)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestGitDBCollectionFetcher(TestCase):
+    def setUp(self):
+        GitDBStandInHandler.requests_count = 0
+        GitDBStandInHandler.not_modified_count = 0
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), GitDBStandInHandler)
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.fetcher = GitDBCollectionFetcher(base_url=f"http://127.0.0.1:{self.server.server_port}/")
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_fetch(self):
+        for stream_parsing in [True, False]:
+            self.fetcher.stream_parsing = stream_parsing
+            self.fetcher.reset_validators()
+            collection = self.fetcher.fetch(collection="articles")
+            self.assertEqual(1, len(collection))
+            self.assertEqual(2023, collection.documents[0]["collecting_time"].year)
+            self.assertIsNone(collection.documents[0]["publishing_time"])
+            self.assertEqual(1, len(list(collection.find(data_filter={"article_id": "1"}))))
+
+    def test_conditional_fetch_not_modified(self):
+        self.assertIsNotNone(self.fetcher.fetch(collection="articles"))
+        self.assertIsNone(self.fetcher.fetch(collection="articles"))
+        self.assertEqual(2, GitDBStandInHandler.requests_count)
+        self.assertEqual(1, GitDBStandInHandler.not_modified_count)
+
+    def test_reset_validators(self):
+        self.fetcher.fetch(collection="articles")
+        self.fetcher.reset_validators(collection="articles")
+        self.assertIsNotNone(self.fetcher.fetch(collection="articles"))
+        self.assertEqual(0, GitDBStandInHandler.not_modified_count)
@@ -0,0 +1,148 @@
+import tempfile
+import threading
+from typing import Dict, List
+from unittest import TestCase
+from unittest.mock import patch
+
+from db_driver.gitdb.collection_fetcher import GitDBCollectionFetcher
+from db_driver.gitdb.gitdb_collection import GitDBCollection
+from db_driver.gitdb.snapshot_cache import GitDBSnapshotCache
+from db_driver.gitdb_driver import GitDBDriver
+from db_driver.utils.consts import DBConsts
+from db_driver.utils.exceptions import ErrorConnectDBException
+from singleton_class import Singleton
+
+
+def init_collections_data(version: int) -> Dict[str, List[dict]]:
+    return {
+        DBConsts.ARTICLES_TABLE_NAME: [{"article_id": "1", "title": f"title v{version}", "cluster_id": "c1"}],
+        DBConsts.CLUSTERS_TABLE_NAME: [{"cluster_id": "c1", "trend": f"trend v{version}"}],
+        DBConsts.MEDIA_TABLE_NAME: [{"media": "cnn", "src": f"cnn v{version}.png"}]
+    }
+
+
+class TestGitDBDriverSnapshots(TestCase):
+    def setUp(self):
+        self.collections_data = init_collections_data(version=1)
+        self.failing_collections = set()
+        self.fetch_hooks = dict()
+        for name, value in [("GIT_DB_CACHE_DIR", ""), ("GIT_DB_FETCH_TRIES", 1), ("GIT_DB_FETCH_RETRY_SLEEP", 0)]:
+            consts_patcher = patch.object(DBConsts, name, value)
+            consts_patcher.start()
+            self.addCleanup(consts_patcher.stop)
+        fetch_patcher = patch.object(GitDBCollectionFetcher, "fetch", autospec=True, side_effect=self._fetch)
+        fetch_patcher.start()
+        self.addCleanup(fetch_patcher.stop)
+
+        Singleton._instances.pop(GitDBDriver, None)
+        self.addCleanup(Singleton._instances.pop, GitDBDriver, None)
+        self.db = GitDBDriver()
+        self.db.close()
+
+    def _fetch(self, fetcher: GitDBCollectionFetcher, collection: str) -> GitDBCollection:
+        if collection in self.fetch_hooks:
+            self.fetch_hooks[collection]()
+        if collection in self.failing_collections:
+            raise ConnectionError(f"Cannot get `{collection}`")
+        if fetcher.get_validators(collection=collection):
+            return None  # Not modified since the validators
+        documents = [dict(document) for document in self.collections_data[collection]]
+        return GitDBCollection.from_documents(documents=documents,
+                                              indexed_fields=DBConsts.GIT_DB_INDEXED_FIELDS.get(collection))
+
+    def get_titles(self) -> tuple:
+        article = self.db.get_one(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter={"article_id": "1"})
+        cluster = self.db.get_one(table_name=DBConsts.CLUSTERS_TABLE_NAME, data_filter={"cluster_id": "c1"})
+        return article["title"], cluster["trend"]
+
+    def test_pinned_reader_keeps_snapshot_across_refresh(self):
+        with self.db.pin_snapshot() as snapshot:
+            self.collections_data = init_collections_data(version=2)
+            self.db.refresh_db_data()
+            self.assertEqual(("title v1", "trend v1"), self.get_titles())
+            self.assertEqual(snapshot.version, self.db.snapshot_version)
+        self.assertEqual(("title v2", "trend v2"), self.get_titles())
+        self.assertEqual(snapshot.version + 1, self.db.snapshot_version)
+
+    def test_snapshot_published_atomically(self):
+        version = self.db.snapshot_version
+        fetch_started = threading.Event()
+        release_fetch = threading.Event()
+
+        def block_clusters_fetch():
+            fetch_started.set()
+            release_fetch.wait(timeout=5)
+
+        self.fetch_hooks[DBConsts.CLUSTERS_TABLE_NAME] = block_clusters_fetch
+        self.collections_data = init_collections_data(version=2)
+        refresh_thread = threading.Thread(target=self.db.refresh_db_data)
+        refresh_thread.start()
+        self.assertTrue(fetch_started.wait(timeout=5))
+
+        # Articles of the new version may be fetched already, nothing is visible until all the collections are
+        self.assertEqual(("title v1", "trend v1"), self.get_titles())
+        self.assertEqual(version, self.db.snapshot_version)
+
+        release_fetch.set()
+        refresh_thread.join(timeout=5)
+        self.assertEqual(("title v2", "trend v2"), self.get_titles())
+        self.assertEqual(version + 1, self.db.snapshot_version)
+
+    def test_failed_refresh_publishes_nothing(self):
+        version = self.db.snapshot_version
+        self.collections_data = init_collections_data(version=2)
+        self.failing_collections.add(DBConsts.CLUSTERS_TABLE_NAME)
+        with self.assertRaises(ErrorConnectDBException):
+            self.db.refresh_db_data()
+        self.assertEqual(("title v1", "trend v1"), self.get_titles())
+        self.assertEqual(version, self.db.snapshot_version)
+
+        self.failing_collections.clear()
+        self.db.refresh_db_data()
+        self.assertEqual(("title v2", "trend v2"), self.get_titles())
+
+    def test_find_duplicates_not_supported(self):
+        with self.assertRaises(NotImplementedError):
+            self.db.find_duplicates(table_name=DBConsts.MEDIA_TABLE_NAME, field_name="media")
+
+    def test_warm_start_from_cache(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        cache = GitDBSnapshotCache(cache_dir=temp_dir.name)
+        for collection, documents in self.collections_data.items():
+            cache.save(collection=collection, documents=documents)
+
+        fetch_started = threading.Event()
+        release_fetch = threading.Event()
+
+        def block_articles_fetch():
+            fetch_started.set()
+            release_fetch.wait(timeout=5)
+
+        self.fetch_hooks[DBConsts.ARTICLES_TABLE_NAME] = block_articles_fetch
+        self.collections_data = init_collections_data(version=2)
+        Singleton._instances.pop(GitDBDriver, None)
+        with patch.object(DBConsts, "GIT_DB_CACHE_DIR", temp_dir.name):
+            self.db = GitDBDriver()
+        self.addCleanup(self.db.close)
+        self.addCleanup(release_fetch.set)
+
+        # Served from the cache while the network refresh is still running
+        self.assertTrue(fetch_started.wait(timeout=5))
+        self.assertEqual(("title v1", "trend v1"), self.get_titles())
+
+    def test_partial_cache_not_used(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        cache = GitDBSnapshotCache(cache_dir=temp_dir.name)
+        cache.save(collection=DBConsts.ARTICLES_TABLE_NAME,
+                   documents=self.collections_data[DBConsts.ARTICLES_TABLE_NAME], validators={"ETag": '"1"'})
+
+        self.collections_data = init_collections_data(version=2)
+        Singleton._instances.pop(GitDBDriver, None)
+        with patch.object(DBConsts, "GIT_DB_CACHE_DIR", temp_dir.name):
+            self.db = GitDBDriver()
+        self.addCleanup(self.db.close)
+
+        self.assertEqual(("title v2", "trend v2"), self.get_titles())
+        self.assertEqual(1, self.db.snapshot_version)
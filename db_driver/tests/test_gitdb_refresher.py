@@ -0,0 +1,46 @@
+import threading
+from unittest import TestCase
+
+from db_driver.gitdb.refresher import GitDBRefresher
+
+
+class TestGitDBRefresher(TestCase):
+    def setUp(self):
+        self.refreshed = threading.Event()
+        self.refresh_count = 0
+
+    def _refresh(self):
+        self.refresh_count += 1
+        self.refreshed.set()
+
+    def test_trigger(self):
+        refresher = GitDBRefresher(refresh_function=self._refresh, interval_seconds=3600)
+        refresher.start()
+        self.assertFalse(self.refreshed.wait(timeout=0.2))
+        refresher.trigger()
+        self.assertTrue(self.refreshed.wait(timeout=2))
+        refresher.stop(timeout=2)
+        self.assertFalse(refresher.is_running)
+        self.assertEqual(1, self.refresh_count)
+
+    def test_run_now(self):
+        refresher = GitDBRefresher(refresh_function=self._refresh, interval_seconds=3600)
+        refresher.start(run_now=True)
+        self.assertTrue(self.refreshed.wait(timeout=2))
+        refresher.stop(timeout=2)
+
+    def test_backoff_on_failure(self):
+        def failing_refresh():
+            raise ValueError("refresh failed")
+
+        refresher = GitDBRefresher(refresh_function=failing_refresh, interval_seconds=3600, backoff_seconds=2)
+        self.assertEqual(3600, refresher.get_next_delay())
+        refresher._failures = 3
+        self.assertEqual(8, refresher.get_next_delay())
+        refresher._failures = 20
+        self.assertEqual(3600, refresher.get_next_delay())
+
+    def test_jitter(self):
+        refresher = GitDBRefresher(refresh_function=self._refresh, interval_seconds=100, jitter=0.1)
+        for _ in range(100):
+            self.assertTrue(90 <= refresher.get_next_delay() <= 110)
@@ -0,0 +1,32 @@
+from unittest import TestCase
+
+from db_driver.gitdb.json_stream import iter_json_array
+
+
+class TestIterJsonArray(TestCase):
+    def test_items_split_between_chunks(self):
+        chunks = [b'[{"a": 1}, {"b"', b': [2, 3]}, "x', b'y"]']
+        self.assertEqual([{"a": 1}, {"b": [2, 3]}, "xy"], list(iter_json_array(chunks=chunks)))
+
+    def test_number_split_between_chunks(self):
+        for chunks in [[b"[1, 12", b".5, 3]"], [b"[1, 12.", b"5, 3]"], [b"[1, 12e", b"3, 3]"],
+                       [b"[1, 12E", b"+3, 3]"], [b"[1, -", b"12.5, 3]"], [b"[1, 1", b"2", b".", b"5", b", 3]"]]:
+            with self.subTest(chunks=chunks):
+                expected = [1, float(b"".join(chunks)[4:-4]), 3]
+                self.assertEqual(expected, list(iter_json_array(chunks=chunks)))
+
+    def test_number_at_end_of_last_chunk(self):
+        self.assertEqual([1, 2], list(iter_json_array(chunks=[b"[1, ", b"2]"])))
+        self.assertEqual([1.5, True, None], list(iter_json_array(chunks=[b"[1.5, true", b", null]"])))
+
+    def test_multi_byte_char_split_between_chunks(self):
+        encoded = '["שלום"]'.encode("utf-8")
+        self.assertEqual(["שלום"], list(iter_json_array(chunks=[encoded[:4], encoded[4:]])))
+
+    def test_invalid_json(self):
+        with self.assertRaises(ValueError):
+            list(iter_json_array(chunks=[b'{"a": 1}']))
+        with self.assertRaises(ValueError):
+            list(iter_json_array(chunks=[b"[1, 2"]))
+        with self.assertRaises(ValueError):
+            list(iter_json_array(chunks=[b"[1, 2.", b"]"]))
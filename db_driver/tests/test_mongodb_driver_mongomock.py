@@ -0,0 +1,232 @@
+import os
+from datetime import datetime, timedelta
+from unittest import TestCase
+from unittest.mock import patch
+
+import mongomock
+from pymongo.errors import OperationFailure
+
+import db_driver
+from db_driver.db_objects.bulk_operation import BulkOperation
+from db_driver.mongodb_driver import MongoDBDriver
+from db_driver.utils.consts import BulkOperationConsts, DBConsts
+from db_driver.utils.exceptions import DataNotFoundDBException
+from db_utils.mongo_client_registry import MongoClientRegistry
+
+CONNECTION_STRING = "mongodb://mongomock.test:27017"
+
+
+def init_mongomock_client() -> mongomock.MongoClient:
+    """
+    Register a mongomock client as the shared client of `CONNECTION_STRING`, drivers created inside
+    `patch.dict(os.environ, {"CONNECTION_STRING": CONNECTION_STRING})` will use it
+    """
+    client = mongomock.MongoClient()
+    MongoClientRegistry._clients[CONNECTION_STRING] = client
+    return client
+
+
+class MongomockTestCase(TestCase):
+    def setUp(self):
+        self.client = init_mongomock_client()
+        env_patcher = patch.dict(os.environ, {"CONNECTION_STRING": CONNECTION_STRING})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+        # Utils created by the test get a driver of the mongomock client
+        instances_patcher = patch.dict(db_driver.DB_INSTANCES, clear=True)
+        instances_patcher.start()
+        self.addCleanup(instances_patcher.stop)
+        self.addCleanup(MongoClientRegistry.close_all)
+        self.db = MongoDBDriver()
+
+
+class TestMongoDBDriverClient(MongomockTestCase):
+    def test_drivers_share_client(self):
+        other_db = MongoDBDriver()
+        self.db.insert_one(table_name="articles", data={"article_id": "1"})
+        self.assertTrue(other_db.exists(table_name="articles", data_filter={"article_id": "1"}))
+
+    def test_close_keeps_shared_client(self):
+        other_db = MongoDBDriver()
+        self.db.close()
+        self.assertIs(self.client, MongoClientRegistry.get_client(connection_string=CONNECTION_STRING))
+        other_db.insert_one(table_name="articles", data={"article_id": "1"})
+        self.assertTrue(self.db.exists(table_name="articles", data_filter={"article_id": "1"}))
+
+
+class TestMongoDBDriverIndexes(MongomockTestCase):
+    def test_ensure_indexes_report(self):
+        collection = self.client[MongoDBDriver.DB_NAME]["test_table"]
+        collection.create_index([("a", 1)], name="a_1", unique=True)
+        collection.create_index([("b", 1)], name="b_1")
+        collection.create_index([("z", 1)], name="z_1")
+        tables_indexes = {"test_table": [
+            {"keys": [("a", 1)], "unique": True},
+            {"keys": [("b", 1)], "unique": True},
+            {"keys": [("c", 1), ("d", -1)]},
+            {"keys": [("e", 1)], "expireAfterSeconds": 60}
+        ]}
+        create_index = mongomock.collection.Collection.create_index
+
+        def create_index_mock(collection_self, keys, **kwargs):
+            if kwargs.get("name") == "e_1":
+                raise OperationFailure("Cannot create index")
+            return create_index(collection_self, keys, **kwargs)
+
+        with patch.object(mongomock.collection.Collection, "create_index", autospec=True,
+                          side_effect=create_index_mock):
+            report = self.db.ensure_indexes(tables_indexes=tables_indexes)
+
+        expected_report = {"created": ["c_1_d_-1"], "existing": ["a_1"], "missing": ["e_1"], "mismatched": ["b_1"],
+                           "extra": ["z_1"]}
+        self.assertEqual({"test_table": expected_report}, report)
+        self.assertIn("c_1_d_-1", collection.index_information())
+        self.assertFalse(collection.index_information()["b_1"].get("unique", False))
+
+    def test_ensure_indexes_of_registry(self):
+        self.client.drop_database(MongoDBDriver.DB_NAME)
+        report = self.db.ensure_indexes()
+        self.assertEqual(set(DBConsts.DB_INDEXES), set(report))
+        for table_name, indexes in DBConsts.DB_INDEXES.items():
+            self.assertEqual(len(indexes), len(report[table_name]["created"]))
+
+        report = self.db.ensure_indexes()
+        for table_name, indexes in DBConsts.DB_INDEXES.items():
+            index_names = [MongoDBDriver.get_index_name(keys=index["keys"]) for index in indexes]
+            expected_report = {"created": [], "existing": index_names, "missing": [], "mismatched": [], "extra": []}
+            self.assertEqual(expected_report, report[table_name])
+
+
+class TestMongoDBDriverUpdate(MongomockTestCase):
+    def test_build_update(self):
+        update = MongoDBDriver._build_update(new_data={"main_article_id": "2"}, pull_data={"articles_id": "1"},
+                                             add_to_set_data={"domains": "cnn"})
+        self.assertEqual({"$set": {"main_article_id": "2"}, "$addToSet": {"domains": "cnn"},
+                          "$pull": {"articles_id": "1"}}, update)
+        with self.assertRaises(ValueError):
+            MongoDBDriver._build_update()
+
+    def test_pull(self):
+        self.db.insert_one(table_name="clusters", data={"cluster_id": "1", "articles_id": ["1", "2", "3"]})
+        self.db.update_one(table_name="clusters", data_filter={"cluster_id": "1"},
+                           pull_data={"articles_id": {"$in": ["1", "3"]}})
+        cluster = self.db.get_one(table_name="clusters", data_filter={"cluster_id": "1"})
+        self.assertEqual(["2"], cluster["articles_id"])
+
+
+class TestMongoDBDriverSample(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        data_list = [{"article_id": str(i), "domain": "cnn" if i % 2 else "bbc"} for i in range(10)]
+        self.db.insert_many(table_name="articles", data_list=data_list)
+
+    def test_sample(self):
+        documents = self.db.sample(table_name="articles", data_filter={"domain": "cnn"}, amount=3)
+        self.assertEqual(3, len(documents))
+        self.assertEqual(3, len({document["article_id"] for document in documents}))
+        self.assertTrue(all(document["domain"] == "cnn" for document in documents))
+
+    def test_sample_less_than_amount(self):
+        documents = self.db.sample(table_name="articles", data_filter={"domain": "cnn"}, amount=20)
+        self.assertEqual({"1", "3", "5", "7", "9"}, {document["article_id"] for document in documents})
+
+    def test_sample_nothing(self):
+        self.assertEqual([], self.db.sample(table_name="articles", data_filter={"domain": "fox"}, amount=3))
+        self.assertEqual([], self.db.sample(table_name="articles", data_filter={}, amount=0))
+
+
+class TestMongoDBDriverAggregates(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.time = datetime(2023, 5, 1)
+        data_list = [
+            {"cluster_id": "1", "domains": ["cnn", "bbc"], "trend": "a", "last_updated": self.time},
+            {"cluster_id": "2", "domains": ["bbc", "fox"], "trend": "b", "last_updated": self.time + timedelta(days=2)},
+            {"cluster_id": "3", "domains": ["ynet"], "trend": "a", "last_updated": self.time + timedelta(days=1)},
+            {"cluster_id": "4", "domains": [], "trend": None, "last_updated": None}
+        ]
+        self.db.insert_many(table_name="clusters", data_list=data_list)
+
+    def test_distinct(self):
+        domains = self.db.distinct(table_name="clusters", field_name="domains")
+        self.assertEqual(["bbc", "cnn", "fox", "ynet"], sorted(domains))
+        self.assertEqual(["a", "b"], sorted(self.db.distinct(table_name="clusters", field_name="trend")))
+        self.assertEqual(["bbc", "cnn"], sorted(self.db.distinct(table_name="clusters", field_name="domains",
+                                                                  data_filter={"cluster_id": "1"})))
+        self.assertEqual([], self.db.distinct(table_name="clusters", field_name="domains",
+                                              data_filter={"cluster_id": "5"}))
+
+    def test_get_max(self):
+        max_time = self.db.get_max(table_name="clusters", field_name="last_updated")
+        self.assertEqual(self.time + timedelta(days=2), max_time)
+        max_time = self.db.get_max(table_name="clusters", field_name="last_updated", data_filter={"trend": "a"})
+        self.assertEqual(self.time + timedelta(days=1), max_time)
+
+    def test_get_max_without_values(self):
+        with self.assertRaises(DataNotFoundDBException):
+            self.db.get_max(table_name="clusters", field_name="last_updated", data_filter={"cluster_id": "4"})
+        with self.assertRaises(DataNotFoundDBException):
+            self.db.get_max(table_name="empty_table", field_name="last_updated")
+
+
+class TestMongoDBDriverBulkWrite(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.collection = self.client[MongoDBDriver.DB_NAME]["bulk_test"]
+        self.collection.create_index([("article_id", 1)], name="article_id_1", unique=True)
+        self.operations = [
+            BulkOperation(operation=BulkOperationConsts.INSERT_ONE, data={"article_id": "1"}),
+            BulkOperation(operation=BulkOperationConsts.INSERT_ONE, data={"article_id": "1"}),
+            BulkOperation(operation=BulkOperationConsts.INSERT_ONE, data={"article_id": "2"})
+        ]
+
+    def get_articles_id(self) -> list:
+        return sorted(document["article_id"] for document in self.collection.find({}))
+
+    def test_ordered_stops_at_first_error(self):
+        results = self.db.bulk_write(table_name="bulk_test", operations=self.operations, ordered=True)
+        self.assertEqual([True, False, False], [result.succeeded for result in results])
+        self.assertEqual([0, 1, 2], [result.index for result in results])
+        self.assertIsNone(results[0].error)
+        self.assertIn("duplicate", results[1].error.lower())
+        self.assertEqual(BulkOperationConsts.NOT_EXECUTED_ERROR_MSG, results[2].error)
+        self.assertEqual(["1"], self.get_articles_id())
+
+    def test_unordered_executes_all(self):
+        results = self.db.bulk_write(table_name="bulk_test", operations=self.operations, ordered=False)
+        self.assertEqual([True, False, True], [result.succeeded for result in results])
+        self.assertIsNone(results[2].error)
+        self.assertEqual(["1", "2"], self.get_articles_id())
+
+    def test_inserted_id(self):
+        results = self.db.bulk_write(table_name="bulk_test", operations=self.operations, ordered=False)
+        self.assertEqual(self.collection.find_one({"article_id": "1"})["_id"], results[0].inserted_id)
+        self.assertIsNone(results[1].inserted_id)
+        self.assertEqual(self.collection.find_one({"article_id": "2"})["_id"], results[2].inserted_id)
+
+    def test_mixed_operations(self):
+        self.collection.insert_many([{"article_id": "1", "title": "old"}, {"article_id": "2"}])
+        operations = [
+            BulkOperation(operation=BulkOperationConsts.UPDATE_ONE, data_filter={"article_id": "1"},
+                          new_data={"title": "new"}),
+            BulkOperation(operation=BulkOperationConsts.DELETE_ONE, data_filter={"article_id": "2"}),
+            BulkOperation(operation=BulkOperationConsts.INSERT_ONE, data={"article_id": "3"})
+        ]
+        results = self.db.bulk_write(table_name="bulk_test", operations=operations)
+        self.assertTrue(all(result.succeeded for result in results))
+        self.assertEqual("new", self.collection.find_one({"article_id": "1"})["title"])
+        self.assertEqual(["1", "3"], self.get_articles_id())
+
+    def test_empty_operations(self):
+        self.assertEqual([], self.db.bulk_write(table_name="bulk_test", operations=[]))
+
+    def test_upsert_many(self):
+        self.collection.insert_one({"article_id": "1", "title": "old"})
+        # The upserted data is first, mongomock reports the upserted index among the upserts only
+        data_list = [{"article_id": "2", "title": "2"}, {"article_id": "1", "title": "new"}]
+        results = self.db.upsert_many(table_name="bulk_test", data_list=data_list, key_field="article_id")
+        self.assertEqual([True, True], [result.succeeded for result in results])
+        self.assertEqual(self.collection.find_one({"article_id": "2"})["_id"], results[0].upserted_id)
+        self.assertIsNone(results[1].upserted_id)
+        self.assertEqual(1, self.collection.count_documents({"article_id": "1"}))
+        self.assertEqual("new", self.collection.find_one({"article_id": "1"})["title"])
@@ -0,0 +1,60 @@
+from datetime import datetime
+from unittest import TestCase
+
+from db_driver.gitdb.query_filter import compile_filter
+
+CLUSTER = {
+    "cluster_id": "c1",
+    "domains": ["cnn", "bbc"],
+    "categories": ["sport"],
+    "trend": None,
+    "last_updated": datetime(2023, 8, 1)
+}
+
+
+class TestQueryFilter(TestCase):
+    def assert_matching(self, data_filter: dict, expected: bool = True):
+        self.assertEqual(expected, compile_filter(data_filter)(CLUSTER), data_filter)
+
+    def test_equal(self):
+        self.assert_matching({"cluster_id": "c1"})
+        self.assert_matching({"cluster_id": {"$eq": "c2"}}, expected=False)
+        self.assert_matching({"domains": "bbc"})
+        self.assert_matching({"domains": ["cnn", "bbc"]})
+        self.assert_matching({"trend": None})
+        self.assert_matching({"missing_field": None})
+
+    def test_not_equal(self):
+        self.assert_matching({"cluster_id": {"$ne": "c2"}})
+        self.assert_matching({"domains": {"$ne": "cnn"}}, expected=False)
+
+    def test_in(self):
+        self.assert_matching({"categories": {"$in": ["sport", "tech"]}})
+        self.assert_matching({"domains": {"$in": ["nbc"]}}, expected=False)
+        self.assert_matching({"cluster_id": {"$in": []}}, expected=False)
+
+    def test_not_in(self):
+        self.assert_matching({"domains": {"$nin": ["nbc"]}})
+        self.assert_matching({"domains": {"$nin": ["cnn"]}}, expected=False)
+
+    def test_comparison(self):
+        self.assert_matching({"last_updated": {"$gt": datetime(2023, 1, 1), "$lt": datetime(2024, 1, 1)}})
+        self.assert_matching({"last_updated": {"$lte": datetime(2023, 1, 1)}}, expected=False)
+        self.assert_matching({"trend": {"$gt": 1}}, expected=False)
+
+    def test_exists(self):
+        self.assert_matching({"trend": {"$exists": True}})
+        self.assert_matching({"missing_field": {"$exists": False}})
+        self.assert_matching({"cluster_id": {"$exists": False}}, expected=False)
+
+    def test_all_keys_must_match(self):
+        self.assert_matching({"cluster_id": "c1", "domains": {"$nin": ["cnn"]}}, expected=False)
+
+    def test_unsupported_operator(self):
+        with self.assertRaises(ValueError):
+            compile_filter({"cluster_id": {"$regex": "c"}})
+
+    def test_unsupported_top_level_operator(self):
+        for data_filter in [{"$or": [{"cluster_id": "c1"}]}, {"$and": [{"cluster_id": "c1"}], "domains": "cnn"}]:
+            with self.subTest(data_filter=data_filter), self.assertRaises(ValueError):
+                compile_filter(data_filter)
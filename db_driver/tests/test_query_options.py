@@ -0,0 +1,51 @@
+from datetime import datetime
+from unittest import TestCase
+
+from db_driver.gitdb.query_options import apply_query_options, compile_projection, reservoir_sample
+
+CLUSTERS = [
+    {"cluster_id": "c1", "domains": ["cnn"], "last_updated": datetime(2023, 8, 1)},
+    {"cluster_id": "c2", "domains": ["bbc"], "last_updated": datetime(2023, 8, 3)},
+    {"cluster_id": "c3", "domains": ["nbc"], "last_updated": None},
+    {"cluster_id": "c4", "domains": ["cnn", "bbc"], "last_updated": datetime(2023, 8, 2)}
+]
+
+
+class TestQueryOptions(TestCase):
+    def get_clusters_id(self, **query_options) -> list:
+        return [cluster["cluster_id"] for cluster in apply_query_options(documents=CLUSTERS, **query_options)]
+
+    def test_sort(self):
+        self.assertEqual(["c3", "c1", "c4", "c2"], self.get_clusters_id(sort=[("last_updated", 1)]))
+        self.assertEqual(["c2", "c4", "c1", "c3"], self.get_clusters_id(sort=[("last_updated", -1)]))
+
+    def test_skip_and_limit(self):
+        self.assertEqual(["c1", "c2", "c3", "c4"], self.get_clusters_id())
+        self.assertEqual(["c2", "c3"], self.get_clusters_id(skip=1, limit=2))
+        self.assertEqual(["c2"], self.get_clusters_id(sort=[("last_updated", -1)], limit=1))
+
+    def test_projection(self):
+        documents = list(apply_query_options(documents=CLUSTERS, projection=["domains"], limit=1))
+        self.assertEqual([{"domains": ["cnn"]}], documents)
+        self.assertEqual({"cluster_id": "c1"}, compile_projection({"domains": 0, "last_updated": 0})(CLUSTERS[0]))
+        self.assertIsNone(compile_projection(None))
+        with self.assertRaises(ValueError):
+            compile_projection({"domains": 0, "cluster_id": 1})
+
+    def test_lazy_without_sort(self):
+        documents = apply_query_options(documents=iter(CLUSTERS), limit=1)
+        self.assertFalse(isinstance(documents, list))
+        self.assertEqual(1, len(list(documents)))
+
+    def test_reservoir_sample(self):
+        sample = reservoir_sample(documents=iter(CLUSTERS), amount=2)
+        self.assertEqual(2, len(sample))
+        self.assertTrue(all(cluster in CLUSTERS for cluster in sample))
+        self.assertEqual(CLUSTERS, reservoir_sample(documents=CLUSTERS, amount=10))
+        self.assertEqual([], reservoir_sample(documents=CLUSTERS, amount=0))
+
+    def test_reservoir_sample_uniform(self):
+        counts = {cluster["cluster_id"]: 0 for cluster in CLUSTERS}
+        for _ in range(4000):
+            counts[reservoir_sample(documents=CLUSTERS, amount=1)[0]["cluster_id"]] += 1
+        self.assertTrue(all(800 < count < 1200 for count in counts.values()), counts)
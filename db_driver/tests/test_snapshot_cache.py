@@ -0,0 +1,56 @@
+import os
+import tempfile
+from datetime import datetime, timezone
+from unittest import TestCase
+
+from db_driver.gitdb.snapshot_cache import GitDBSnapshotCache
+
+
+class TestGitDBSnapshotCache(TestCase):
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.cache_dir = os.path.join(temp_dir.name, "gitdb_cache")
+        self.cache = GitDBSnapshotCache(cache_dir=self.cache_dir)
+        self.documents = [
+            {"article_id": "1", "publishing_time": datetime(2023, 5, 1, 12, 30, 15, 123456), "domains": ["a", "b"]},
+            {"article_id": "2", "publishing_time": datetime(2023, 5, 2, tzinfo=timezone.utc), "content": None}
+        ]
+        self.validators = {"ETag": '"1234"'}
+
+    def test_save_load_round_trip(self):
+        self.assertTrue(self.cache.save(collection="articles", documents=self.documents, validators=self.validators))
+        self.assertEqual((self.documents, self.validators), self.cache.load(collection="articles"))
+        self.assertEqual(0o700, os.stat(self.cache_dir).st_mode & 0o777)
+
+    def test_load_missing_collection(self):
+        self.assertIsNone(self.cache.load(collection="articles"))
+
+    def test_load_unknown_header(self):
+        self.cache.save(collection="articles", documents=self.documents)
+        cache_path = self.cache.get_cache_path(collection="articles")
+        with open(cache_path, "rb") as cache_file:
+            data = cache_file.read()
+        with open(cache_path, "wb") as cache_file:
+            cache_file.write(b"GITDB_CACHE_V1\n" + data[len(GitDBSnapshotCache.FILE_HEADER):])
+        self.assertIsNone(self.cache.load(collection="articles"))
+
+    def test_load_corrupt_data(self):
+        self.cache.save(collection="articles", documents=self.documents)
+        cache_path = self.cache.get_cache_path(collection="articles")
+        with open(cache_path, "rb") as cache_file:
+            data = cache_file.read()
+        with open(cache_path, "wb") as cache_file:
+            cache_file.write(data[:len(data) // 2])
+        self.assertIsNone(self.cache.load(collection="articles"))
+
+    def test_not_private_cache_ignored(self):
+        self.cache.save(collection="articles", documents=self.documents)
+        cache_path = self.cache.get_cache_path(collection="articles")
+        os.chmod(cache_path, 0o666)
+        self.assertIsNone(self.cache.load(collection="articles"))
+
+        os.chmod(cache_path, 0o600)
+        os.chmod(self.cache_dir, 0o777)
+        self.assertIsNone(self.cache.load(collection="articles"))
+        self.assertFalse(self.cache.save(collection="articles", documents=self.documents))
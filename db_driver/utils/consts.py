@@ -3,16 +3,69 @@ import os
 
 class DBConsts:
     REQUEST_TIMEOUT = int(os.getenv(key="REQUEST_TIMEOUT", default=3))
+    ITER_MANY_BATCH_SIZE = int(os.getenv(key="ITER_MANY_BATCH_SIZE", default=500))
+    DELETE_CHUNK_SIZE = int(os.getenv(key="DELETE_CHUNK_SIZE", default=1000))
     MEDIA_TABLE_NAME = "media"
     TASKS_TABLE_NAME = "tasks"
     ARTICLES_TABLE_NAME = "articles"
     CLUSTERS_TABLE_NAME = "clusters"
+    LOG_TABLE_NAME = "log"
     GIT_DB_NAME = "git"
     GIT_DB_URL = "https://all-news-project.github.io/api-data/"
     GIT_DB_DELETE_ERROR_MSG = "Cannot delete using GitDBDriver"
     GIT_DB_INSERT_ERROR_MSG = "Cannot insert using GitDBDriver"
     GIT_DB_UPDATE_ERROR_MSG = "Cannot update using GitDBDriver"
+    GIT_DB_BULK_WRITE_ERROR_MSG = "Cannot bulk write using GitDBDriver"
+    GIT_DB_FIND_DUPLICATES_ERROR_MSG = "Cannot find duplicates by object id using GitDBDriver"
     GIT_DB_COLLECTIONS = [ARTICLES_TABLE_NAME, CLUSTERS_TABLE_NAME, MEDIA_TABLE_NAME]
+    GIT_DB_FETCH_WORKERS = int(os.getenv(key="GIT_DB_FETCH_WORKERS", default=4))
+    GIT_DB_FETCH_TRIES = int(os.getenv(key="GIT_DB_FETCH_TRIES", default=3))
+    GIT_DB_FETCH_RETRY_SLEEP = float(os.getenv(key="GIT_DB_FETCH_RETRY_SLEEP", default=1))
+    GIT_DB_STREAM_PARSING = os.getenv(key="GIT_DB_STREAM_PARSING", default="true").lower() == "true"
+    GIT_DB_STREAM_CHUNK_SIZE = int(os.getenv(key="GIT_DB_STREAM_CHUNK_SIZE", default=64 * 1024))
+    GIT_DB_REFRESH_JITTER = float(os.getenv(key="GIT_DB_REFRESH_JITTER", default=0.1))
+    GIT_DB_REFRESH_BACKOFF_SECONDS = float(os.getenv(key="GIT_DB_REFRESH_BACKOFF_SECONDS", default=5))
+    GIT_DB_CACHE_DIR = os.getenv(key="GIT_DB_CACHE_DIR", default="")  # The local cache is off when empty
+    GIT_DB_INDEXED_FIELDS = {
+        ARTICLES_TABLE_NAME: ['article_id', 'url', 'cluster_id', 'domain', 'media'],
+        CLUSTERS_TABLE_NAME: ['cluster_id', 'trend', 'domains'],
+        MEDIA_TABLE_NAME: ['media']
+    }
+    GIT_DB_MAX_FIELDS = {
+        ARTICLES_TABLE_NAME: ['collecting_time', 'publishing_time'],
+        CLUSTERS_TABLE_NAME: ['creation_time', 'last_updated']
+    }
+    ENSURE_INDEXES = os.getenv(key="DB_ENSURE_INDEXES", default="true").lower() == "true"
+    LOG_TTL_SECONDS = int(os.getenv(key="LOG_TTL_SECONDS", default=60 * 60 * 24 * 30))
+    # Indexes of every table, `keys` is a list of (field name, 1 or -1), the other keys are create_index options
+    DB_INDEXES = {
+        ARTICLES_TABLE_NAME: [
+            {"keys": [("article_id", 1)], "unique": True},
+            {"keys": [("url", 1)]},
+            {"keys": [("cluster_id", 1)]}
+        ],
+        CLUSTERS_TABLE_NAME: [
+            {"keys": [("cluster_id", 1)], "unique": True},
+            {"keys": [("trend", 1)]},
+            {"keys": [("domains", 1)]},
+            {"keys": [("categories", 1)]},
+            {"keys": [("last_updated", 1)]}
+        ],
+        TASKS_TABLE_NAME: [
+            {"keys": [("task_id", 1)], "unique": True},
+            {"keys": [("status", 1), ("creation_time", 1)]},
+            {"keys": [("url", 1)]},
+            {"keys": [("domain", 1)]}
+        ],
+        MEDIA_TABLE_NAME: [
+            {"keys": [("media", 1)]}
+        ],
+        LOG_TABLE_NAME: [
+            {"keys": [("task_id", 1)]},
+            {"keys": [("task_type", 1)]},
+            {"keys": [("created", 1)], "expireAfterSeconds": LOG_TTL_SECONDS}
+        ]
+    }
     CLUSTER_LOW_SIM = int(os.getenv(key="CLUSTER_LOW_SIM", default=60))
     CLUSTER_HIGH_SIM = int(os.getenv(key="CLUSTER_HIGH_SIM", default=90))
     CLUSTER_THRESHOLD = int(os.getenv(key="CLUSTER_THRESHOLD", default=70))
@@ -23,3 +76,13 @@ class DBObjectsConsts:
         DBConsts.ARTICLES_TABLE_NAME: ['collecting_time', 'publishing_time'],
         DBConsts.CLUSTERS_TABLE_NAME: ['creation_time', 'last_updated']
     }
+
+
+class BulkOperationConsts:
+    INSERT_ONE = "insert_one"
+    UPDATE_ONE = "update_one"
+    UPDATE_MANY = "update_many"
+    DELETE_ONE = "delete_one"
+    DELETE_MANY = "delete_many"
+    OPERATIONS = [INSERT_ONE, UPDATE_ONE, UPDATE_MANY, DELETE_ONE, DELETE_MANY]
+    NOT_EXECUTED_ERROR_MSG = "Operation was not executed, a previous operation of the ordered bulk failed"
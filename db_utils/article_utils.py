@@ -1,11 +1,13 @@
 import random
-from typing import List, Union
+from collections import defaultdict
+from typing import Dict, List, Union
 
 from db_driver import get_current_db_driver
 from db_driver.db_objects.article import Article
+from db_driver.db_objects.bulk_operation import BulkOperation
 from db_driver.db_objects.cluster import Cluster
 from db_driver.db_objects.db_objects_utils import get_db_object_from_dict
-from db_driver.utils.consts import DBConsts
+from db_driver.utils.consts import DBConsts, BulkOperationConsts
 from db_driver.utils.exceptions import InsertDataDBException, UpdateDataDBException, \
     DataNotFoundDBException
 from logger import get_current_logger
@@ -21,7 +23,7 @@ class ArticleUtils:
         for trie in range(ArticleConsts.TIMES_TRY_INSERT_ARTICLE):
             try:
                 obj_id = self._db.insert_one(table_name=DBConsts.ARTICLES_TABLE_NAME, data=article.convert_to_dict())
-                self.logger.info(f"Inserted article inserted_id: `{obj_id}`, article_id: `{article.article_id}`")
+                self.logger.info("Inserted article inserted_id: `%s`, article_id: `%s`", obj_id, article.article_id)
                 return
             except Exception as e:
                 desc = f"Error insert article NO. {trie}/{ArticleConsts.TIMES_TRY_INSERT_ARTICLE} - {str(e)}"
@@ -36,7 +38,7 @@ class ArticleUtils:
                 data_filter = {"article_id": article_id}
                 new_data = {"cluster_id": cluster_id}
                 self._db.update_one(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter, new_data=new_data)
-                self.logger.info(f"Updated article article_id: `{article_id}`")
+                self.logger.info("Updated article article_id: `%s`", article_id)
                 return
             except Exception as e:
                 desc = f"Error insert article NO. {try_counter}/{ArticleConsts.TIMES_TRY_INSERT_ARTICLE} - {str(e)}"
@@ -45,14 +47,41 @@ class ArticleUtils:
         desc = f"Error inserting article into db after {ArticleConsts.TIMES_TRY_INSERT_ARTICLE} tries"
         raise UpdateDataDBException(desc)
 
+    def update_cluster_id_many(self, articles_id: List[str], cluster_id: str):
+        """
+        Set the cluster id of all the articles with one query
+        :param articles_id:
+        :param cluster_id:
+        :return:
+        """
+        for try_counter in range(ArticleConsts.TIMES_TRY_UPDATE_CLUSTER_ID):
+            try:
+                data_filter = {"article_id": {"$in": articles_id}}
+                new_data = {"cluster_id": cluster_id}
+                self._db.update_many(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter,
+                                     new_data=new_data)
+                self.logger.info("Updated cluster id of %s articles to cluster_id: `%s`", len(articles_id), cluster_id)
+                return
+            except Exception as e:
+                desc = f"Error update articles cluster id NO. {try_counter}/" \
+                       f"{ArticleConsts.TIMES_TRY_UPDATE_CLUSTER_ID} - {str(e)}"
+                self.logger.warning(desc)
+                continue
+        desc = f"Error updating articles cluster id after {ArticleConsts.TIMES_TRY_UPDATE_CLUSTER_ID} tries"
+        raise UpdateDataDBException(desc)
+
     def get_unclassified_article(self, required_filter_data: dict = None, get_random: bool = False) -> Article:
         data_filter = {"cluster_id": None}
         if required_filter_data:
             data_filter.update(required_filter_data)
 
         if get_random:
-            articles = self._db.get_many(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter)
-            article = random.choice(articles)
+            articles = self._db.sample(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter, amount=1)
+            if not articles:
+                desc = f"Error find unclassified article with filter: {data_filter}"
+                self.logger.warning(desc)
+                raise DataNotFoundDBException(desc)
+            article = articles[0]
         else:
             # todo: check the order of the collecting article
             article = self._db.get_one(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter)
@@ -67,8 +96,8 @@ class ArticleUtils:
             article_object: Article = get_db_object_from_dict(object_dict=article_data, class_instance=Article)
             article = article_object
         except DataNotFoundDBException as e:
-            self.logger.warning(f"Error get article by article id: `{article_id}` - {str(e)}")
-        self.logger.info(f"Got article from db, article_id: `{article.article_id}`, url: `{article.url}`")
+            self.logger.warning("Error get article by article id: `%s` - %s", article_id, e)
+        self.logger.info("Got article from db, article_id: `%s`, url: `%s`", article.article_id, article.url)
         return article
 
     def get_article_by_url(self, article_url: str) -> Union[Article, None]:
@@ -77,10 +106,10 @@ class ArticleUtils:
             article_data = self._db.get_one(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter)
             article_object: Article = get_db_object_from_dict(object_dict=article_data, class_instance=Article)
             article = article_object
-            self.logger.info(f"Got article from db, article_id: `{article.article_id}`, url: `{article.url}`")
+            self.logger.info("Got article from db, article_id: `%s`, url: `%s`", article.article_id, article.url)
             return article
         except DataNotFoundDBException as e:
-            self.logger.warning(f"Error get article by article url: `{article_url}` - {str(e)}")
+            self.logger.warning("Error get article by article url: `%s` - %s", article_url, e)
 
     def get_articles(self, articles_id: List[str]) -> List[Article]:
         # todo: separate this function to: get_articles_by_ids and get_articles_by_urls
@@ -107,7 +136,7 @@ class ArticleUtils:
     def get_all_articles(self, data_filter: dict = None) -> List[Article]:
         data_filter = data_filter if data_filter else {}
         articles: List[Article] = list()
-        articles_data = self._db.get_many(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter)
+        articles_data = self._db.iter_many(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter)
         for article_data in articles_data:
             articles.append(get_db_object_from_dict(object_dict=article_data, class_instance=Article))
         return articles
@@ -116,41 +145,85 @@ class ArticleUtils:
         data_filter = {"article_id": article_id}
         deleted: bool = self._db.delete_one(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter)
         if deleted:
-            self.logger.info(f"Deleted article by id: `{article_id}`")
+            self.logger.info("Deleted article by id: `%s`", article_id)
             return True
         else:
-            self.logger.warning(f"Error to delete article by id: `{article_id}`")
+            self.logger.warning("Error to delete article by id: `%s`", article_id)
             return False
 
     def delete_random_articles(self, amount_to_delete: int, data_filter: dict):
-        articles: List[Article] = self.get_all_articles(data_filter=data_filter)
-        random_articles = random.sample(articles, amount_to_delete)
-        count_article_deleted = 0
-        count_cluster_deleted = 0
-        for article in random_articles:
-            if self.delete_article(article_id=article.article_id):
-                count_article_deleted += 1
-                if article.cluster_id:
-                    if self.delete_article_from_cluster(article=article, cluster_id=article.cluster_id):
-                        count_cluster_deleted += 1
-
-        self.logger.info(f"Deleted {count_article_deleted} articles, delete from clusters: {count_cluster_deleted}")
+        articles_data = self._db.sample(table_name=DBConsts.ARTICLES_TABLE_NAME, data_filter=data_filter,
+                                        amount=amount_to_delete)
+        random_articles: List[Article] = [get_db_object_from_dict(object_dict=article_data, class_instance=Article)
+                                          for article_data in articles_data]
+        operations = [
+            BulkOperation(operation=BulkOperationConsts.DELETE_ONE, data_filter={"article_id": article.article_id})
+            for article in random_articles
+        ]
+        results = self._db.bulk_write(table_name=DBConsts.ARTICLES_TABLE_NAME, operations=operations, ordered=False)
+        deleted_articles = [article for article, result in zip(random_articles, results) if result.succeeded]
+        count_cluster_deleted = self.delete_articles_from_clusters(articles=deleted_articles)
+        self.logger.info("Deleted %s articles, delete from clusters: %s", len(deleted_articles), count_cluster_deleted)
+
+    def delete_articles_from_clusters(self, articles: List[Article]) -> int:
+        """
+        Remove the articles from their clusters, with one query for the clusters and one bulk write for the updates.
+        The articles are removed with `$pull`, so articles added to the clusters meanwhile are kept
+        :param articles:
+        :return: count of articles removed from their cluster
+        """
+        articles_id_by_cluster: Dict[str, List[str]] = defaultdict(list)
+        for article in articles:
+            if article.cluster_id:
+                articles_id_by_cluster[article.cluster_id].append(article.article_id)
+        if not articles_id_by_cluster:
+            return 0
+
+        try:
+            data_filter = {"cluster_id": {"$in": list(articles_id_by_cluster.keys())}}
+            clusters_data = self._db.get_many(table_name=DBConsts.CLUSTERS_TABLE_NAME, data_filter=data_filter)
+        except DataNotFoundDBException:
+            return 0
+
+        operations: List[BulkOperation] = list()
+        removed_counts: List[int] = list()
+        for cluster_data in clusters_data:
+            cluster_object: Cluster = get_db_object_from_dict(object_dict=cluster_data, class_instance=Cluster)
+            removed_articles_id = set(articles_id_by_cluster[cluster_object.cluster_id])
+            articles_id = [article_id for article_id in cluster_object.articles_id
+                           if article_id not in removed_articles_id]
+            pull_data = {"articles_id": {"$in": list(removed_articles_id)}}
+
+            # Replace main article id
+            new_data = None
+            if cluster_object.main_article_id in removed_articles_id and articles_id:
+                new_data = {"main_article_id": random.choice(articles_id)}
+
+            operations.append(BulkOperation(operation=BulkOperationConsts.UPDATE_ONE,
+                                            data_filter={"cluster_id": cluster_object.cluster_id},
+                                            new_data=new_data, pull_data=pull_data))
+            removed_counts.append(len(cluster_object.articles_id) - len(articles_id))
+
+        results = self._db.bulk_write(table_name=DBConsts.CLUSTERS_TABLE_NAME, operations=operations, ordered=False)
+        return sum(count for count, result in zip(removed_counts, results) if result.succeeded)
 
     def delete_article_from_cluster(self, article: Article, cluster_id: str) -> bool:
         try:
             data_filter = {"cluster_id": cluster_id}
             cluster_data = self._db.get_one(table_name=DBConsts.CLUSTERS_TABLE_NAME, data_filter=data_filter)
             cluster_object: Cluster = get_db_object_from_dict(object_dict=cluster_data, class_instance=Cluster)
+            if article.article_id not in cluster_object.articles_id:
+                return False
             cluster_object.articles_id.remove(article.article_id)
 
-            new_data = {"articles_id": cluster_object.articles_id}
-
             # Replace main article id
-            if cluster_object.main_article_id == article.article_id:
+            new_data = None
+            if cluster_object.main_article_id == article.article_id and cluster_object.articles_id:
                 cluster_object.main_article_id = random.choice(cluster_object.articles_id)
-                new_data.update({"main_article_id": cluster_object.main_article_id})
+                new_data = {"main_article_id": cluster_object.main_article_id}
 
-            self._db.update_one(table_name=DBConsts.CLUSTERS_TABLE_NAME, data_filter=data_filter, new_data=new_data)
+            self._db.update_one(table_name=DBConsts.CLUSTERS_TABLE_NAME, data_filter=data_filter, new_data=new_data,
+                                pull_data={"articles_id": article.article_id})
             return True
         except DataNotFoundDBException:
             return False
@@ -19,47 +19,72 @@ class ClusterUtils:
         self._db = get_current_db_driver()
         self.article_utils = ArticleUtils()
 
-    # todo: separate first part of the function to another function called `_create_empty_cluster`
+    @staticmethod
+    def _build_cluster(articles: List[Article], classified_categories: List[str] = None, trend: str = None) -> Cluster:
+        """
+        Build the cluster of the articles in memory, the first article is the main article
+        :param articles:
+        :param classified_categories:
+        :param trend:
+        :return:
+        """
+        current_time = datetime.now()
+        articles_id = list(dict.fromkeys(article.article_id for article in articles))
+        domains = list(dict.fromkeys(article.domain for article in articles))
+        cluster_data = {
+            "cluster_id": str(uuid.uuid4()),
+            "articles_id": articles_id,
+            "main_article_id": articles[0].article_id,
+            "creation_time": current_time,
+            "last_updated": current_time,
+            "domains": domains,
+            "categories": classified_categories if classified_categories else list(),
+            "trend": trend
+        }
+        return Cluster(**cluster_data)
+
     @log_function
     def create_new_cluster(
             self, article: Article, classified_categories: List[str] = None, trend: str = None) -> Cluster:
         try:
-            current_time = datetime.now()
-            categories = classified_categories if classified_categories else list()
-            cluster_data = {
-                "cluster_id": str(uuid.uuid4()),
-                "articles_id": [article.article_id],
-                "main_article_id": article.article_id,
-                "creation_time": current_time,
-                "last_updated": current_time,
-                "domains": [article.domain],
-                "categories": categories,
-                "trend": trend
-            }
-            cluster: Cluster = Cluster(**cluster_data)
+            cluster: Cluster = self._build_cluster(articles=[article], classified_categories=classified_categories,
+                                                   trend=trend)
             _id = self._db.insert_one(table_name=DBConsts.CLUSTERS_TABLE_NAME, data=cluster.convert_to_dict())
-            self.logger.info(f"Inserted cluster inserted_id: `{_id}`, cluster_id: `{cluster.cluster_id}`")
-            self.article_utils.update_cluster_id(article_id=article.article_id, cluster_id=cluster_data["cluster_id"])
+            self.logger.info("Inserted cluster inserted_id: `%s`, cluster_id: `%s`", _id, cluster.cluster_id)
+            self.article_utils.update_cluster_id(article_id=article.article_id, cluster_id=cluster.cluster_id)
             return cluster
         except Exception as e:
             desc = f"Error insert cluster - {str(e)}"
             self.logger.exception(desc)
             raise CreateNewClusterException(desc)
 
+    @log_function
     def create_cluster_from_articles_list(self, articles: List[Article],
                                           classified_categories: List[str] = None, trend: str = None) -> Cluster:
+        """
+        Create one cluster of all the articles, the cluster is inserted once and the cluster id of all the articles
+        is updated with one query
+        :param articles: the first article is the main article of the cluster
+        :param classified_categories:
+        :param trend:
+        :return:
+        """
         if len(articles) == 0:
             desc = f"Cannot create cluster with empty list of articles"
             raise CreateNewClusterException(desc)
 
-        first_article: Article = articles[0]
-        cluster = self.create_new_cluster(
-            article=first_article, classified_categories=classified_categories, trend=trend
-        )
-        articles.remove(first_article)
-        for article in articles:
-            cluster = self.add_article_to_cluster(cluster=cluster, article=article)
-        return cluster
+        try:
+            cluster: Cluster = self._build_cluster(articles=articles, classified_categories=classified_categories,
+                                                   trend=trend)
+            _id = self._db.insert_one(table_name=DBConsts.CLUSTERS_TABLE_NAME, data=cluster.convert_to_dict())
+            self.logger.info("Inserted cluster inserted_id: `%s`, cluster_id: `%s`, with %s articles", _id,
+                             cluster.cluster_id, len(cluster.articles_id))
+            self.article_utils.update_cluster_id_many(articles_id=cluster.articles_id, cluster_id=cluster.cluster_id)
+            return cluster
+        except Exception as e:
+            desc = f"Error insert cluster - {str(e)}"
+            self.logger.exception(desc)
+            raise CreateNewClusterException(desc)
 
     @log_function
     def get_cluster(self, cluster_id: str) -> Cluster:
@@ -97,54 +122,51 @@ class ClusterUtils:
 
     @log_function
     def add_article_to_cluster(self, cluster: Cluster, article: Article) -> Cluster:
-
-        # Article id
-        if article.article_id in cluster.articles_id:
-            self.logger.warning(f"Cannot add article to cluster that already has the article")
-            return cluster
-
-        cluster.articles_id.append(article.article_id)
-
-        # Domain
-        if article.domain not in cluster.domains:
-            cluster.domains.append(article.domain)
-
-        # Update
+        """
+        Add the article to the cluster, only the article id and domain are sent and they are added to the cluster
+        arrays by the db if they are not there yet, so concurrent adds don't overwrite each other
+        :param cluster:
+        :param article:
+        :return: the cluster with the article
+        """
         data_filter = {"cluster_id": cluster.cluster_id}
-        data = {"articles_id": cluster.articles_id, "domains": cluster.domains, "last_updated": datetime.now()}
+        add_to_set_data = {"articles_id": article.article_id, "domains": article.domain}
+        new_data = {"last_updated": datetime.now()}
         for try_counter in range(ClusterConsts.TIMES_TRY_UPDATE_CLUSTER):
             try:
-                self._db.update_one(table_name=DBConsts.CLUSTERS_TABLE_NAME, data_filter=data_filter, new_data=data)
+                self._db.update_one(table_name=DBConsts.CLUSTERS_TABLE_NAME, data_filter=data_filter,
+                                    new_data=new_data, add_to_set_data=add_to_set_data)
                 self.article_utils.update_cluster_id(article_id=article.article_id, cluster_id=cluster.cluster_id)
-                self.logger.info(f"Updated cluster cluster_id: `{cluster.cluster_id}`")
-                return cluster
+                self.logger.info("Updated cluster cluster_id: `%s`", cluster.cluster_id)
+                break
             except Exception as e:
                 desc = f"Error insert article NO. {try_counter}/{ClusterConsts.TIMES_TRY_UPDATE_CLUSTER} - {str(e)}"
                 self.logger.warning(desc)
                 continue
-        desc = f"Error inserting article into db after {ClusterConsts.TIMES_TRY_UPDATE_CLUSTER} tries"
-        raise UpdateDataDBException(desc)
+        else:
+            desc = f"Error inserting article into db after {ClusterConsts.TIMES_TRY_UPDATE_CLUSTER} tries"
+            raise UpdateDataDBException(desc)
+
+        # Keep the given cluster object matching the db
+        if article.article_id not in cluster.articles_id:
+            cluster.articles_id.append(article.article_id)
+        if article.domain not in cluster.domains:
+            cluster.domains.append(article.domain)
+        cluster.last_updated = new_data["last_updated"]
+        return cluster
 
     def get_all_clusters(self):
         clusters: List[Cluster] = list()
-        clusters_data = self._db.get_many(table_name=DBConsts.CLUSTERS_TABLE_NAME, data_filter={})
+        clusters_data = self._db.iter_many(table_name=DBConsts.CLUSTERS_TABLE_NAME, data_filter={})
         for cluster_data in clusters_data:
             clusters.append(get_db_object_from_dict(object_dict=cluster_data, class_instance=Cluster))
         return clusters
 
     def get_all_domains(self) -> List[str]:
-        clusters: List[Cluster] = self.get_all_clusters()
-        domains = set()
-        for cluster in clusters:
-            for domain in cluster.domains:
-                domains.add(domain)
-        return list(domains)
+        return self._db.distinct(table_name=DBConsts.CLUSTERS_TABLE_NAME, field_name="domains")
 
     def get_last_time_db_update(self) -> datetime:
-        clusters: List[Cluster] = self.get_all_clusters()
-        dates = [cluster.last_updated for cluster in clusters]
-        dates.sort()
-        return dates[-1]
+        return self._db.get_max(table_name=DBConsts.CLUSTERS_TABLE_NAME, field_name="last_updated")
 
 
 # For debug
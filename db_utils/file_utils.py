@@ -26,7 +26,7 @@ class FileUtils:
             with open(file_path, 'wb') as f:
                 for chunk in r.iter_content():
                     f.write(chunk)
-            self.logger.info(f"Saved image to -> `{file_path}`")
+            self.logger.info("Saved image to -> `%s`", file_path)
             return file_path
         except Exception as e:
             print(f"Error saving image from `{url}`, except: {str(e)}")
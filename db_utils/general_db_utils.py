@@ -1,6 +1,8 @@
-from typing import Any, List
+from typing import Any, Iterator, List, Union
 
 from db_driver import get_current_db_driver
+from db_driver.db_objects.bulk_operation import BulkOperation
+from db_driver.utils.consts import DBConsts, BulkOperationConsts
 from logger import get_current_logger
 
 
@@ -9,24 +11,63 @@ class GeneralDBUtils:
         self.logger = get_current_logger()
         self._db = get_current_db_driver()
 
-    def remove_duplicates_by_field(self, table_name: str, field_name: str):
-        unique_data = self.get_all_unique_values_by_field(table_name=table_name, field_name=field_name)
-        for data in unique_data:
-            count = self._db.count(table_name=table_name, data_filter={field_name: data})
-            self.logger.info(f"Found {count} of data filter: {field_name}:{data}")
-            while count > 1:
-                self._db.delete_one(table_name=table_name, data_filter={field_name: data})
-                count -= 1
+    def remove_duplicates_by_field(self, table_name: str, field_name: str, dry_run: bool = False,
+                                   chunk_size: int = DBConsts.DELETE_CHUNK_SIZE) -> dict:
+        """
+        Keep only the oldest data of every value of the field.
+        The duplicates are found with one group by pass and deleted with one bulk write, in chunks of ids
+        :param table_name:
+        :param field_name:
+        :param dry_run: only report what would be deleted
+        :param chunk_size: count of ids deleted by one delete operation
+        :return: {"duplicated_values", "to_delete", "deleted", "dry_run", "duplicates": [{"value", "kept_id",
+                  "deleted_ids"}]}
+        """
+        duplicates = self._db.find_duplicates(table_name=table_name, field_name=field_name)
+        report_duplicates = [
+            {"value": duplicate["value"], "kept_id": duplicate["ids"][0], "deleted_ids": duplicate["ids"][1:]}
+            for duplicate in duplicates
+        ]
+        ids_to_delete = [object_id for duplicate in report_duplicates for object_id in duplicate["deleted_ids"]]
+        report = {
+            "duplicated_values": len(report_duplicates),
+            "to_delete": len(ids_to_delete),
+            "deleted": 0,
+            "dry_run": dry_run,
+            "duplicates": report_duplicates
+        }
+        self.logger.info("Found %s duplicated values of `%s` in `%s`, %s data to delete", len(report_duplicates),
+                         field_name, table_name, len(ids_to_delete))
+        if dry_run or not ids_to_delete:
+            return report
+
+        chunks = [ids_to_delete[i:i + chunk_size] for i in range(0, len(ids_to_delete), chunk_size)]
+        operations = [BulkOperation(operation=BulkOperationConsts.DELETE_MANY, data_filter={"_id": {"$in": chunk}})
+                      for chunk in chunks]
+        results = self._db.bulk_write(table_name=table_name, operations=operations, ordered=False)
+        report["deleted"] = sum(len(chunk) for chunk, result in zip(chunks, results) if result.succeeded)
+        self.logger.info("Deleted %s/%s duplicates of `%s` in `%s`", report["deleted"], len(ids_to_delete),
+                         field_name, table_name)
+        return report
 
     def get_all_unique_values_by_field(self, table_name: str, field_name: str) -> List[Any]:
-        all_data = self.get_all_collection_data(table_name=table_name)
+        all_data = self.iter_collection_data(table_name=table_name, projection=[field_name])
         field_data = set()
         for data in all_data:
             field_data.add(data[field_name])
         return list(field_data)
 
     def get_all_collection_data(self, table_name) -> List[dict]:
-        return self._db.get_many(table_name=table_name, data_filter={})
+        return list(self.iter_collection_data(table_name=table_name))
+
+    def iter_collection_data(self, table_name: str, projection: Union[List[str], dict] = None) -> Iterator[dict]:
+        """
+        Iterate over all the data of the collection in batches, without loading the whole collection to memory
+        :param table_name:
+        :param projection: fields to get, all the fields if None
+        :return:
+        """
+        return self._db.iter_many(table_name=table_name, data_filter={}, projection=projection)
 
 
 if __name__ == '__main__':
@@ -17,10 +17,10 @@ class MediaUtils:
             data_filter = {"media": media}
             data_dict = self._db.get_one(table_name=DBConsts.MEDIA_TABLE_NAME, data_filter=data_filter)
             url = data_dict["src"]
-            self.logger.info(f"Got icon url of media `{media}` -> `{url}`")
+            self.logger.info("Got icon url of media `%s` -> `%s`", media, url)
             return url
         except DataNotFoundDBException:
-            self.logger.warning(f"Didn't find url icon for media `{media}`")
+            self.logger.warning("Didn't find url icon for media `%s`", media)
             return None
         except Exception as e:
             desc = f"Error getting icon url for media `{media}`, except: {str(e)}"
@@ -29,7 +29,7 @@ class MediaUtils:
 
     def get_media_list(self) -> List[str]:
         media_list = []
-        media = self._general_db_utils.get_all_collection_data(table_name="media")
+        media = self._general_db_utils.iter_collection_data(table_name=DBConsts.MEDIA_TABLE_NAME, projection=["media"])
         for media_data in media:
             media_list.append(media_data.get("media"))
         return media_list
@@ -1,5 +1,5 @@
 from datetime import datetime
-from typing import List
+from typing import List, Optional
 from uuid import uuid4
 
 from db_driver.db_objects.status_timestamp import StatusTimestamp
@@ -29,35 +29,76 @@ class TaskUtils:
                     "status": TaskConsts.PENDING,
                     "type": task_type,
                     "status_timestamp": [StatusTimestamp(status=TaskConsts.PENDING, time_changed=creation_time)],
-                    "creation_time": creation_time
+                    "creation_time": creation_time,
+                    "failed_count": 0
                 }
                 new_task: dict = Task(**task_data).convert_to_dict()
                 inserted_id = self._db.insert_one(table_name=DBConsts.TASKS_TABLE_NAME, data=new_task)
-                self.logger.info(f"Created new task inserted_id: {inserted_id}")
+                self.logger.info("Created new task inserted_id: %s", inserted_id)
                 return
             except Exception as e:
-                self.logger.warning(f"Error create new task NO. {trie}/{TaskConsts.TIMES_TRY_CREATE_TASK} - {str(e)}")
+                self.logger.warning("Error create new task NO. %s/%s - %s", trie, TaskConsts.TIMES_TRY_CREATE_TASK, e)
                 continue
         desc = f"Error creating new task into db after {TaskConsts.TIMES_TRY_CREATE_TASK} tries"
         raise InsertDataDBException(desc)
 
     @log_function
     def update_task_status(self, task: Task, status: str, desc: str = None):
+        """
+        Change the status of the task, the new status timestamp is appended to the history in the db (not rewritten)
+        and the failed count is incremented if the task failed.
+        A task whose failed count in the db reached `TaskConsts.MAX_TIME_FAILED` is then moved to `failed_constantly`
+        (both timestamps are appended) and is not claimed again
+        :param task:
+        :param status:
+        :param desc:
+        :return:
+        """
         try:
             data_filter = {"task_id": task.task_id}
-            new_timestamp = StatusTimestamp(status=status, time_changed=datetime.now(), desc=desc)
-            task.status_timestamp.append(new_timestamp.convert_to_dict())
-            new_data = {"status": status, "status_timestamp": task.status_timestamp}
-            self._db.update_one(table_name=DBConsts.TASKS_TABLE_NAME, data_filter=data_filter, new_data=new_data)
-        except UpdateDataDBException as e:
+            new_timestamp = StatusTimestamp(status=status, time_changed=datetime.now(), desc=desc).convert_to_dict()
+            new_data = {"status": status}
+            if status != TaskConsts.FAILED:
+                self._db.update_one(table_name=DBConsts.TASKS_TABLE_NAME, data_filter=data_filter, new_data=new_data,
+                                    push_data={"status_timestamp": new_timestamp})
+                task.status = status
+                task.status_timestamp.append(new_timestamp)
+                return
+
+            inc_data = None
+            if task.failed_count is None:
+                # Task created before the failed count, start it from its history
+                new_data.update({"failed_count": self.get_failed_count(task=task) + 1})
+            else:
+                inc_data = {"failed_count": 1}
+            task_data = self._db.find_one_and_update(table_name=DBConsts.TASKS_TABLE_NAME, data_filter=data_filter,
+                                                     new_data=new_data, push_data={"status_timestamp": new_timestamp},
+                                                     inc_data=inc_data)
+            task.failed_count = task_data["failed_count"]
+            task.status = status
+            task.status_timestamp.append(new_timestamp)
+            if task.failed_count >= TaskConsts.MAX_TIME_FAILED:
+                self.__set_failed_constantly(task=task)
+        except (UpdateDataDBException, DataNotFoundDBException) as e:
             desc = f"Error updating task task_id: `{task.task_id}` as status: `{status}`"
             self.logger.error(desc)
             raise e
 
+    def __set_failed_constantly(self, task: Task):
+        self.logger.warning("Task task_id: `%s` failed %s times, marking it as `%s`", task.task_id, task.failed_count,
+                            TaskConsts.FAILED_CONSTANTLY)
+        new_timestamp = StatusTimestamp(status=TaskConsts.FAILED_CONSTANTLY,
+                                        time_changed=datetime.now()).convert_to_dict()
+        self._db.update_one(table_name=DBConsts.TASKS_TABLE_NAME, data_filter={"task_id": task.task_id},
+                            new_data={"status": TaskConsts.FAILED_CONSTANTLY},
+                            push_data={"status_timestamp": new_timestamp})
+        task.status = TaskConsts.FAILED_CONSTANTLY
+        task.status_timestamp.append(new_timestamp)
+
     @log_function
     def _get_task_by_status(self, status: str):
         try:
-            self.logger.debug(f"Trying get task by status: `{status}`")
+            self.logger.debug("Trying get task by status: `%s`", status)
             task: dict = self._db.get_one(table_name=DBConsts.TASKS_TABLE_NAME, data_filter={"status": status})
             task_object: Task = get_db_object_from_dict(task, Task)
             return task_object
@@ -71,6 +112,43 @@ class TaskUtils:
             if task:
                 return task
 
+    @log_function
+    def claim_next_task(self) -> Optional[Task]:
+        """
+        Claim the oldest pending task (or the oldest failed task if nothing is pending), see `claim_next_tasks`
+        :return: the claimed task, None if there is no task to claim
+        """
+        tasks = self.claim_next_tasks(amount=1)
+        return tasks[0] if tasks else None
+
+    @log_function
+    def claim_next_tasks(self, amount: int) -> List[Task]:
+        """
+        Claim up to `amount` tasks, pending tasks first and then failed tasks, the oldest first.
+        Every task is moved to `running` atomically by the db, so a task is claimed by one worker only.
+        Failed tasks are claimed while they failed less than `TaskConsts.MAX_TIME_FAILED` times
+        :param amount:
+        :return: the claimed tasks, already in `running` status
+        """
+        tasks: List[Task] = list()
+        failed_filter = {"status": TaskConsts.FAILED,
+                         # Tasks created before the failed count have no `failed_count`
+                         "$or": [{"failed_count": {"$lt": TaskConsts.MAX_TIME_FAILED}}, {"failed_count": None}]}
+        for data_filter in [{"status": TaskConsts.PENDING}, failed_filter]:
+            while len(tasks) < amount:
+                try:
+                    new_timestamp = StatusTimestamp(status=TaskConsts.RUNNING, time_changed=datetime.now())
+                    task_data = self._db.find_one_and_update(
+                        table_name=DBConsts.TASKS_TABLE_NAME, data_filter=data_filter,
+                        new_data={"status": TaskConsts.RUNNING}, sort=[("creation_time", 1)],
+                        push_data={"status_timestamp": new_timestamp.convert_to_dict()}
+                    )
+                except DataNotFoundDBException:
+                    break
+                tasks.append(get_db_object_from_dict(object_dict=task_data, class_instance=Task))
+        self.logger.info("Claimed %s/%s tasks", len(tasks), amount)
+        return tasks
+
     @log_function
     def get_unwanted_articles_by_domain(self, domain: str, status: str = None) -> List[Task]:
         unwanted_articles_in_tasks: List[Task] = list()
@@ -83,7 +161,7 @@ class TaskUtils:
                 task_object: Task = get_db_object_from_dict(task, Task)
                 unwanted_articles_in_tasks.append(task_object)
         except Exception as e:
-            self.logger.error(f"Error getting unwanted articles in tasks by domain, {str(e)}")
+            self.logger.error("Error getting unwanted articles in tasks by domain, %s", e)
         return unwanted_articles_in_tasks
 
     @log_function
@@ -94,7 +172,7 @@ class TaskUtils:
             tasks_dict = self._db.get_many(table_name=DBConsts.TASKS_TABLE_NAME, data_filter=data_filter)
             tasks.extend(self.convert_tasks_dict_to_objects(tasks_dict=tasks_dict))
         except DataNotFoundDBException:
-            self.logger.warning(f"Didn't find any task by url: `{url}`")
+            self.logger.warning("Didn't find any task by url: `%s`", url)
         return tasks
 
     @staticmethod
@@ -109,6 +187,22 @@ class TaskUtils:
             tasks.append(task_object)
         return tasks
 
+    @staticmethod
+    def get_failed_count(task: Task) -> int:
+        """
+        Get how many times the task failed, from its failed count or from its history if it has no failed count
+        :param task:
+        :return:
+        """
+        if task.failed_count is not None:
+            return task.failed_count
+        status_timestamp = TaskUtils.get_task_status_timestamp(task=task)
+        return TaskUtils.count_amount_failed_task_in_timestamp(status_timestamp=status_timestamp)
+
+    @staticmethod
+    def is_failed_constantly(task: Task) -> bool:
+        return TaskUtils.get_failed_count(task=task) >= TaskConsts.MAX_TIME_FAILED
+
     @staticmethod
     def count_amount_failed_task_in_timestamp(status_timestamp: List[StatusTimestamp]) -> int:
         counter = 0
@@ -130,10 +224,11 @@ class TaskUtils:
                     "status": task_dict["status"],
                     "type": task_dict["type"],
                     "status_timestamp": task_dict["status_timestamp"],
-                    "creation_time": task_dict["creation_time"]
+                    "creation_time": task_dict["creation_time"],
+                    "failed_count": task_dict.get("failed_count")
                 }
                 tasks.append(Task(**data))
             return tasks
         except Exception as e:
-            self.logger.error(f"Error getting all tasks by data_filter: `{data_filter}`, except: {str(e)}")
+            self.logger.error("Error getting all tasks by data_filter: `%s`, except: %s", data_filter, e)
             return []
@@ -0,0 +1,128 @@
+from datetime import datetime
+from unittest.mock import patch
+
+from db_driver.db_objects.article import Article
+from db_driver.tests.test_mongodb_driver_mongomock import MongomockTestCase
+from db_driver.utils.consts import DBConsts
+from db_driver.utils.exceptions import DataNotFoundDBException
+from db_utils.article_utils import ArticleUtils
+
+
+def init_article(article_id: str, domain: str, cluster_id: str) -> Article:
+    return Article(article_id=article_id, url=f"https://{domain}.com/{article_id}", domain=domain, title=article_id,
+                   content="content", collecting_time=datetime.now(), cluster_id=cluster_id)
+
+
+class ArticleUtilsTestCase(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.article_utils = ArticleUtils()
+        db = self.client[self.db.DB_NAME]
+        self.articles_collection = db[DBConsts.ARTICLES_TABLE_NAME]
+        self.clusters_collection = db[DBConsts.CLUSTERS_TABLE_NAME]
+        self.articles_collection.delete_many({})
+        self.clusters_collection.delete_many({})
+
+        self.articles = {article.article_id: article for article in [
+            init_article(article_id="a1", domain="cnn", cluster_id="c1"),
+            init_article(article_id="a2", domain="cnn", cluster_id="c1"),
+            init_article(article_id="a3", domain="bbc", cluster_id="c1"),
+            init_article(article_id="b1", domain="fox", cluster_id="c2"),
+            init_article(article_id="b2", domain="fox", cluster_id="c2")
+        ]}
+        self.articles_collection.insert_many([article.convert_to_dict() for article in self.articles.values()])
+        self.insert_cluster(cluster_id="c1", articles_id=["a1", "a2", "a3"], main_article_id="a3",
+                            domains=["cnn", "bbc"])
+        self.insert_cluster(cluster_id="c2", articles_id=["b1", "b2"], main_article_id="b2", domains=["fox"])
+
+    def insert_cluster(self, cluster_id: str, articles_id: list, main_article_id: str, domains: list):
+        self.clusters_collection.insert_one({
+            "cluster_id": cluster_id, "articles_id": articles_id, "main_article_id": main_article_id,
+            "creation_time": datetime.now(), "last_updated": datetime.now(), "domains": domains
+        })
+
+    def get_cluster_data(self, cluster_id: str) -> dict:
+        return self.clusters_collection.find_one({"cluster_id": cluster_id})
+
+    def get_articles_id(self) -> set:
+        return {document["article_id"] for document in self.articles_collection.find({})}
+
+
+class TestDeleteArticlesFromClusters(ArticleUtilsTestCase):
+    def test_delete_articles_from_clusters(self):
+        deleted_articles = [self.articles[article_id] for article_id in ["a1", "a3", "b1"]]
+        self.articles_collection.delete_many({"article_id": {"$in": ["a1", "a3", "b1"]}})
+
+        self.assertEqual(3, self.article_utils.delete_articles_from_clusters(articles=deleted_articles))
+        first_cluster = self.get_cluster_data(cluster_id="c1")
+        self.assertEqual(["a2"], first_cluster["articles_id"])
+        self.assertEqual(["cnn", "bbc"], first_cluster["domains"])
+        self.assertEqual("a2", first_cluster["main_article_id"])
+        second_cluster = self.get_cluster_data(cluster_id="c2")
+        self.assertEqual(["b2"], second_cluster["articles_id"])
+        self.assertEqual(["fox"], second_cluster["domains"])
+        self.assertEqual("b2", second_cluster["main_article_id"])
+
+    def test_delete_keeps_articles_added_meanwhile(self):
+        get_many = self.article_utils._db.get_many
+
+        def get_many_then_add_article(*args, **kwargs):
+            clusters_data = get_many(*args, **kwargs)
+            # Another worker adds an article after the clusters were read
+            self.clusters_collection.update_one({"cluster_id": "c1"}, {"$addToSet": {"articles_id": "a4"}})
+            return clusters_data
+
+        with patch.object(self.article_utils._db, "get_many", side_effect=get_many_then_add_article):
+            self.article_utils.delete_articles_from_clusters(articles=[self.articles["a1"]])
+        self.assertEqual(["a2", "a3", "a4"], self.get_cluster_data(cluster_id="c1")["articles_id"])
+
+    def test_delete_article_from_cluster(self):
+        self.assertTrue(self.article_utils.delete_article_from_cluster(article=self.articles["a3"], cluster_id="c1"))
+        cluster_data = self.get_cluster_data(cluster_id="c1")
+        self.assertEqual(["a1", "a2"], cluster_data["articles_id"])
+        self.assertEqual(["cnn", "bbc"], cluster_data["domains"])
+        self.assertIn(cluster_data["main_article_id"], ["a1", "a2"])
+
+        self.assertTrue(self.article_utils.delete_article_from_cluster(article=self.articles["a1"], cluster_id="c1"))
+        self.assertEqual(["a2"], self.get_cluster_data(cluster_id="c1")["articles_id"])
+        self.assertFalse(self.article_utils.delete_article_from_cluster(article=self.articles["a1"], cluster_id="c1"))
+        self.assertFalse(self.article_utils.delete_article_from_cluster(article=self.articles["a1"], cluster_id="c3"))
+
+
+class TestDeleteRandomArticles(ArticleUtilsTestCase):
+    def test_delete_random_articles(self):
+        self.article_utils.delete_random_articles(amount_to_delete=3, data_filter={})
+        remaining_articles_id = self.get_articles_id()
+        self.assertEqual(2, len(remaining_articles_id))
+        clusters_articles_id = {article_id for cluster_data in self.clusters_collection.find({})
+                                for article_id in cluster_data["articles_id"]}
+        self.assertEqual(remaining_articles_id, clusters_articles_id)
+
+    def test_delete_random_articles_by_filter(self):
+        self.article_utils.delete_random_articles(amount_to_delete=5, data_filter={"domain": "fox"})
+        self.assertEqual({"a1", "a2", "a3"}, self.get_articles_id())
+        self.assertEqual([], self.get_cluster_data(cluster_id="c2")["articles_id"])
+        self.assertEqual(["a1", "a2", "a3"], self.get_cluster_data(cluster_id="c1")["articles_id"])
+
+    def test_delete_random_articles_nothing_matching(self):
+        self.article_utils.delete_random_articles(amount_to_delete=3, data_filter={"domain": "nbc"})
+        self.assertEqual(set(self.articles), self.get_articles_id())
+
+
+class TestGetUnclassifiedArticle(ArticleUtilsTestCase):
+    def test_get_random_unclassified_article(self):
+        unclassified_articles = [init_article(article_id=f"u{i}", domain="cnn", cluster_id=None) for i in range(3)]
+        self.articles_collection.insert_many([article.convert_to_dict() for article in unclassified_articles])
+        article = self.article_utils.get_unclassified_article(get_random=True)
+        self.assertIn(article.article_id, ["u0", "u1", "u2"])
+        self.assertIsNone(article.cluster_id)
+
+        article = self.article_utils.get_unclassified_article(required_filter_data={"article_id": "u1"},
+                                                              get_random=True)
+        self.assertEqual("u1", article.article_id)
+
+    def test_no_unclassified_article(self):
+        with self.assertRaises(DataNotFoundDBException):
+            self.article_utils.get_unclassified_article(get_random=True)
+        with self.assertRaises(DataNotFoundDBException):
+            self.article_utils.get_unclassified_article()
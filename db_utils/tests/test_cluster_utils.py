@@ -0,0 +1,123 @@
+import threading
+from datetime import datetime, timedelta
+
+from db_driver.db_objects.article import Article
+from db_driver.db_objects.cluster import Cluster
+from db_driver.tests.test_mongodb_driver_mongomock import MongomockTestCase
+from db_driver.utils.consts import DBConsts
+from db_driver.utils.exceptions import CreateNewClusterException, DataNotFoundDBException
+from db_utils.cluster_utils import ClusterUtils
+
+
+def init_article(article_id: str, domain: str) -> Article:
+    return Article(article_id=article_id, url=f"https://{domain}.com/{article_id}", domain=domain, title=article_id,
+                   content="content", collecting_time=datetime.now())
+
+
+class ClusterUtilsTestCase(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cluster_utils = ClusterUtils()
+        db = self.client[self.db.DB_NAME]
+        self.articles_collection = db[DBConsts.ARTICLES_TABLE_NAME]
+        self.clusters_collection = db[DBConsts.CLUSTERS_TABLE_NAME]
+        self.articles = {article.article_id: article for article in [
+            init_article(article_id="a1", domain="cnn"),
+            init_article(article_id="a2", domain="cnn"),
+            init_article(article_id="a3", domain="bbc"),
+            init_article(article_id="a4", domain="fox")
+        ]}
+        self.articles_collection.insert_many([article.convert_to_dict() for article in self.articles.values()])
+
+    def get_cluster_id_by_article(self) -> dict:
+        return {document["article_id"]: document["cluster_id"] for document in self.articles_collection.find({})}
+
+
+class TestCreateClusterFromArticlesList(ClusterUtilsTestCase):
+    def test_create_cluster_from_articles_list(self):
+        articles = [self.articles[article_id] for article_id in ["a2", "a1", "a2", "a3"]]
+        cluster = self.cluster_utils.create_cluster_from_articles_list(articles=articles,
+                                                                       classified_categories=["sport"], trend="final")
+
+        cluster_data = self.clusters_collection.find_one({"cluster_id": cluster.cluster_id})
+        self.assertEqual(["a2", "a1", "a3"], cluster_data["articles_id"])
+        self.assertEqual(["cnn", "bbc"], cluster_data["domains"])
+        self.assertEqual("a2", cluster_data["main_article_id"])
+        self.assertEqual(["sport"], cluster_data["categories"])
+        self.assertEqual("final", cluster_data["trend"])
+        self.assertEqual((cluster_data["articles_id"], cluster_data["domains"], cluster_data["main_article_id"]),
+                         (cluster.articles_id, cluster.domains, cluster.main_article_id))
+        self.assertEqual(1, self.clusters_collection.count_documents({}))
+        self.assertEqual({"a1": cluster.cluster_id, "a2": cluster.cluster_id, "a3": cluster.cluster_id, "a4": None},
+                         self.get_cluster_id_by_article())
+
+    def test_create_cluster_from_empty_list(self):
+        with self.assertRaises(CreateNewClusterException):
+            self.cluster_utils.create_cluster_from_articles_list(articles=[])
+        self.assertEqual(0, self.clusters_collection.count_documents({}))
+
+
+class TestAddArticleToCluster(ClusterUtilsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.cluster = self.cluster_utils.create_cluster_from_articles_list(articles=[self.articles["a1"]])
+
+    def get_cluster_data(self) -> dict:
+        return self.clusters_collection.find_one({"cluster_id": self.cluster.cluster_id})
+
+    def test_add_article_to_cluster(self):
+        cluster = self.cluster_utils.add_article_to_cluster(cluster=self.cluster, article=self.articles["a3"])
+        cluster_data = self.get_cluster_data()
+        self.assertEqual(["a1", "a3"], cluster_data["articles_id"])
+        self.assertEqual(["cnn", "bbc"], cluster_data["domains"])
+        self.assertEqual((["a1", "a3"], ["cnn", "bbc"]), (cluster.articles_id, cluster.domains))
+        self.assertEqual(self.cluster.cluster_id, self.get_cluster_id_by_article()["a3"])
+
+    def test_add_article_repeatedly(self):
+        for _ in range(3):
+            self.cluster_utils.add_article_to_cluster(cluster=self.cluster, article=self.articles["a2"])
+        cluster_data = self.get_cluster_data()
+        self.assertEqual(["a1", "a2"], cluster_data["articles_id"])
+        self.assertEqual(["cnn"], cluster_data["domains"])
+        self.assertEqual((["a1", "a2"], ["cnn"]), (self.cluster.articles_id, self.cluster.domains))
+
+    def test_add_articles_concurrently(self):
+        barrier = threading.Barrier(3)
+
+        def add_article(article_id: str):
+            # Every worker holds its own copy of the cluster, without the articles of the other workers
+            cluster = Cluster(**self.cluster.convert_to_dict())
+            cluster_utils = ClusterUtils()
+            barrier.wait(timeout=5)
+            cluster_utils.add_article_to_cluster(cluster=cluster, article=self.articles[article_id])
+
+        threads = [threading.Thread(target=add_article, args=(article_id,)) for article_id in ["a2", "a3", "a4"]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=5)
+
+        cluster_data = self.get_cluster_data()
+        self.assertEqual(["a1", "a2", "a3", "a4"], sorted(cluster_data["articles_id"]))
+        self.assertEqual(["bbc", "cnn", "fox"], sorted(cluster_data["domains"]))
+        self.assertEqual({article_id: self.cluster.cluster_id for article_id in self.articles},
+                         self.get_cluster_id_by_article())
+
+
+class TestClustersSummary(ClusterUtilsTestCase):
+    def test_get_all_domains(self):
+        self.assertEqual([], self.cluster_utils.get_all_domains())
+        self.cluster_utils.create_cluster_from_articles_list(articles=[self.articles["a1"], self.articles["a3"]])
+        self.cluster_utils.create_cluster_from_articles_list(articles=[self.articles["a2"], self.articles["a4"]])
+        self.assertEqual(["bbc", "cnn", "fox"], sorted(self.cluster_utils.get_all_domains()))
+
+    def test_get_last_time_db_update(self):
+        with self.assertRaises(DataNotFoundDBException):
+            self.cluster_utils.get_last_time_db_update()
+
+        last_updated = datetime(2023, 5, 1)
+        for days, article_id in enumerate(["a1", "a2", "a3"]):
+            cluster = self.cluster_utils.create_cluster_from_articles_list(articles=[self.articles[article_id]])
+            self.clusters_collection.update_one({"cluster_id": cluster.cluster_id},
+                                                {"$set": {"last_updated": last_updated - timedelta(days=days)}})
+        self.assertEqual(last_updated, self.cluster_utils.get_last_time_db_update())
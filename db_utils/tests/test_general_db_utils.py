@@ -0,0 +1,57 @@
+from unittest.mock import patch
+
+from db_driver.tests.test_mongodb_driver_mongomock import MongomockTestCase
+from db_driver.utils.consts import BulkOperationConsts
+from db_utils.general_db_utils import GeneralDBUtils
+
+
+class TestRemoveDuplicates(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.general_db_utils = GeneralDBUtils()
+        self.collection = self.client[self.db.DB_NAME]["media"]
+        self.collection.delete_many({})
+
+        media_data = [("cnn", "cnn.png"), ("bbc", "bbc.png"), ("cnn", "cnn_2.png"), ("fox", "fox.png"),
+                      ("cnn", "cnn_3.png"), ("bbc", "bbc_2.png"), ("no_src", None), ("no_src", None)]
+        self.collection.insert_many([{"media": media, "src": src} for media, src in media_data])
+
+    def get_src_by_media(self) -> dict:
+        return {document["media"]: document["src"] for document in self.collection.find({})}
+
+    def test_dry_run_keeps_data(self):
+        report = self.general_db_utils.remove_duplicates_by_field(table_name="media", field_name="media",
+                                                                  dry_run=True)
+        self.assertEqual(8, self.collection.count_documents({}))
+        self.assertTrue(report["dry_run"])
+        self.assertEqual(0, report["deleted"])
+        self.assertEqual(4, report["to_delete"])
+        self.assertEqual(3, report["duplicated_values"])
+
+    def test_keeps_oldest_data(self):
+        cnn_ids = [document["_id"] for document in self.collection.find({"media": "cnn"}).sort("_id", 1)]
+        report = self.general_db_utils.remove_duplicates_by_field(table_name="media", field_name="media")
+
+        self.assertEqual(4, report["deleted"])
+        self.assertEqual({"cnn": "cnn.png", "bbc": "bbc.png", "fox": "fox.png", "no_src": None},
+                         self.get_src_by_media())
+        self.assertEqual(4, self.collection.count_documents({}))
+        cnn_report = next(duplicate for duplicate in report["duplicates"] if duplicate["value"] == "cnn")
+        self.assertEqual(cnn_ids[0], cnn_report["kept_id"])
+        self.assertEqual(cnn_ids[1:], cnn_report["deleted_ids"])
+
+    def test_none_values_not_duplicates(self):
+        report = self.general_db_utils.remove_duplicates_by_field(table_name="media", field_name="src")
+        self.assertEqual(0, report["to_delete"])
+        self.assertEqual(8, self.collection.count_documents({}))
+
+    def test_chunked_delete(self):
+        with patch.object(self.general_db_utils._db, "bulk_write", wraps=self.general_db_utils._db.bulk_write) \
+                as bulk_write_mock:
+            report = self.general_db_utils.remove_duplicates_by_field(table_name="media", field_name="media",
+                                                                      chunk_size=3)
+        operations = bulk_write_mock.call_args.kwargs["operations"]
+        self.assertEqual([BulkOperationConsts.DELETE_MANY] * 2, [operation.operation for operation in operations])
+        self.assertEqual([3, 1], [len(operation.data_filter["_id"]["$in"]) for operation in operations])
+        self.assertEqual(4, report["deleted"])
+        self.assertEqual(4, self.collection.count_documents({}))
@@ -0,0 +1,153 @@
+import threading
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import mongomock
+
+from db_driver.tests.test_mongodb_driver_mongomock import MongomockTestCase
+from db_driver.utils.consts import DBConsts
+from db_utils.task_utils import TaskUtils
+from server_consts import TaskConsts
+
+
+class TaskUtilsTestCase(MongomockTestCase):
+    def setUp(self):
+        super().setUp()
+        self.task_utils = TaskUtils()
+        self.tasks_collection = self.client[self.db.DB_NAME][DBConsts.TASKS_TABLE_NAME]
+        self.tasks_collection.delete_many({})
+
+    def insert_task(self, task_id: str, status: str, minutes_ago: int, failed_count: int = 0):
+        self.tasks_collection.insert_one({
+            "task_id": task_id, "url": f"https://test.com/{task_id}", "domain": "test.com", "status": status,
+            "type": "test", "status_timestamp": [], "creation_time": datetime.now() - timedelta(minutes=minutes_ago),
+            "failed_count": failed_count
+        })
+
+
+class TestClaimTasks(TaskUtilsTestCase):
+    def test_pending_claimed_before_failed(self):
+        self.insert_task(task_id="failed_old", status=TaskConsts.FAILED, minutes_ago=30, failed_count=1)
+        self.insert_task(task_id="pending_new", status=TaskConsts.PENDING, minutes_ago=1)
+        self.insert_task(task_id="pending_old", status=TaskConsts.PENDING, minutes_ago=20)
+        self.insert_task(task_id="running", status=TaskConsts.RUNNING, minutes_ago=40)
+
+        tasks = self.task_utils.claim_next_tasks(amount=10)
+        self.assertEqual(["pending_old", "pending_new", "failed_old"], [task.task_id for task in tasks])
+        self.assertTrue(all(task.status == TaskConsts.RUNNING for task in tasks))
+        self.assertEqual(TaskConsts.RUNNING, tasks[0].status_timestamp[-1]["status"])
+        self.assertIsNone(self.task_utils.claim_next_task())
+
+    def test_claimers_never_get_same_task(self):
+        for i in range(40):
+            self.insert_task(task_id=f"task_{i}", status=TaskConsts.PENDING if i % 2 else TaskConsts.FAILED,
+                             minutes_ago=i)
+
+        # The db updates one document atomically, mongomock does not
+        find_one_and_update = mongomock.collection.Collection.find_one_and_update
+        update_lock = threading.Lock()
+
+        def atomic_find_one_and_update(*args, **kwargs):
+            with update_lock:
+                return find_one_and_update(*args, **kwargs)
+
+        claimed_tasks = {"first": [], "second": []}
+
+        def claim_tasks(claimer: str):
+            task_utils = TaskUtils()
+            while True:
+                task = task_utils.claim_next_task()
+                if task is None:
+                    return
+                claimed_tasks[claimer].append(task.task_id)
+
+        with patch.object(mongomock.collection.Collection, "find_one_and_update", autospec=True,
+                          side_effect=atomic_find_one_and_update):
+            threads = [threading.Thread(target=claim_tasks, args=(claimer,)) for claimer in claimed_tasks]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join(timeout=30)
+
+        all_claimed = claimed_tasks["first"] + claimed_tasks["second"]
+        self.assertEqual(40, len(all_claimed))
+        self.assertEqual({f"task_{i}" for i in range(40)}, set(all_claimed))
+        self.assertEqual(40, self.tasks_collection.count_documents({"status": TaskConsts.RUNNING}))
+
+    def test_failed_constantly_not_claimed(self):
+        self.insert_task(task_id="failed_constantly", status=TaskConsts.FAILED, minutes_ago=30,
+                         failed_count=TaskConsts.MAX_TIME_FAILED)
+        self.insert_task(task_id="failed_legacy", status=TaskConsts.FAILED, minutes_ago=20)
+        self.tasks_collection.update_one({"task_id": "failed_legacy"}, {"$unset": {"failed_count": ""}})
+        self.insert_task(task_id="failed", status=TaskConsts.FAILED, minutes_ago=10,
+                         failed_count=TaskConsts.MAX_TIME_FAILED - 1)
+
+        tasks = self.task_utils.claim_next_tasks(amount=10)
+        self.assertEqual(["failed_legacy", "failed"], [task.task_id for task in tasks])
+
+
+class TestUpdateTaskStatus(TaskUtilsTestCase):
+    def get_task_data(self, task_id: str) -> dict:
+        return self.tasks_collection.find_one({"task_id": task_id})
+
+    def test_failures_counted(self):
+        self.insert_task(task_id="task", status=TaskConsts.PENDING, minutes_ago=1)
+        task = self.task_utils.claim_next_task()
+        self.task_utils.update_task_status(task=task, status=TaskConsts.FAILED, desc="first")
+        task = self.task_utils.claim_next_task()
+        self.task_utils.update_task_status(task=task, status=TaskConsts.FAILED, desc="second")
+
+        task_data = self.get_task_data(task_id="task")
+        self.assertEqual(2, task_data["failed_count"])
+        self.assertEqual(TaskConsts.FAILED, task_data["status"])
+        self.assertEqual([TaskConsts.RUNNING, TaskConsts.FAILED, TaskConsts.RUNNING, TaskConsts.FAILED],
+                         [timestamp["status"] for timestamp in task_data["status_timestamp"]])
+        self.assertEqual(["first", "second"], [timestamp["desc"] for timestamp in task_data["status_timestamp"]
+                                               if timestamp["status"] == TaskConsts.FAILED])
+        self.assertEqual(2, task.failed_count)
+
+    def test_failed_count_of_legacy_task(self):
+        self.insert_task(task_id="task", status=TaskConsts.RUNNING, minutes_ago=1)
+        self.tasks_collection.update_one({"task_id": "task"}, {
+            "$unset": {"failed_count": ""},
+            "$set": {"status_timestamp": [{"status": TaskConsts.FAILED, "time_changed": datetime.now(), "desc": None}]}
+        })
+        task = self.task_utils.get_all_tasks(data_filter={"task_id": "task"})[0]
+        self.task_utils.update_task_status(task=task, status=TaskConsts.FAILED)
+        self.assertEqual(2, self.get_task_data(task_id="task")["failed_count"])
+
+    def test_max_failures_moves_to_failed_constantly(self):
+        self.insert_task(task_id="task", status=TaskConsts.PENDING, minutes_ago=1)
+        for _ in range(TaskConsts.MAX_TIME_FAILED):
+            task = self.task_utils.claim_next_task()
+            self.assertIsNotNone(task)
+            self.task_utils.update_task_status(task=task, status=TaskConsts.FAILED)
+
+        task_data = self.get_task_data(task_id="task")
+        self.assertEqual(TaskConsts.MAX_TIME_FAILED, task_data["failed_count"])
+        self.assertEqual(TaskConsts.FAILED_CONSTANTLY, task_data["status"])
+        self.assertEqual(TaskConsts.FAILED_CONSTANTLY, task.status)
+        self.assertIsNone(self.task_utils.claim_next_task())
+
+        statuses = [timestamp["status"] for timestamp in task_data["status_timestamp"]]
+        self.assertEqual([TaskConsts.FAILED, TaskConsts.FAILED_CONSTANTLY], statuses[-2:])
+        self.assertEqual(TaskConsts.MAX_TIME_FAILED, statuses.count(TaskConsts.FAILED))
+
+    def test_failed_constantly_decided_by_db_count(self):
+        self.insert_task(task_id="task", status=TaskConsts.RUNNING, minutes_ago=1,
+                         failed_count=TaskConsts.MAX_TIME_FAILED - 1)
+        stale_task = self.task_utils.get_all_tasks(data_filter={"task_id": "task"})[0]
+        stale_task.failed_count = 0
+        self.task_utils.update_task_status(task=stale_task, status=TaskConsts.FAILED)
+
+        self.assertEqual(TaskConsts.MAX_TIME_FAILED, stale_task.failed_count)
+        self.assertEqual(TaskConsts.FAILED_CONSTANTLY, self.get_task_data(task_id="task")["status"])
+
+    def test_other_status(self):
+        self.insert_task(task_id="task", status=TaskConsts.RUNNING, minutes_ago=1, failed_count=1)
+        task = self.task_utils.get_all_tasks(data_filter={"task_id": "task"})[0]
+        self.task_utils.update_task_status(task=task, status=TaskConsts.SUCCEEDED)
+        task_data = self.get_task_data(task_id="task")
+        self.assertEqual(TaskConsts.SUCCEEDED, task_data["status"])
+        self.assertEqual(1, task_data["failed_count"])
+        self.assertEqual([TaskConsts.SUCCEEDED], [timestamp["status"] for timestamp in task_data["status_timestamp"]])
@@ -1,9 +1,16 @@
+import functools
+import logging
+from time import perf_counter
+
+from logger.function_stats import FunctionStats
 from logger.server_logger import ServerLogger
 
 
 def get_current_logger(*args, **kwargs):
     """
-    Singleton logger
+    Singleton logger.
+    Calling it with `task_id` / `task_type` sets the task of the calling thread / asyncio task for the rest of it (not
+    only for the returned logger), use `logger.task_context` or `logger.bind` to log with a task for a limited scope
     :return:
     """
     return ServerLogger(*args, **kwargs)
@@ -18,17 +25,47 @@ def is_method(args) -> bool:
 
 
 def log_function(func):
+    """
+    Log the start and the end of the function in debug level.
+    The messages are built once, when the debug level is disabled the call costs a level check only.
+    When `FunctionStats.ENABLED`, the calls are counted and timed instead of logged, see `get_function_stats`
+    :param func:
+    :return:
+    """
     logger = get_current_logger()
+    function_name = func.__qualname__
+    if "." in function_name:
+        class_name, name = function_name.rsplit(".", 1)
+        start_msg, end_msg = f"{class_name} - {name} method started", f"{class_name} - {name} method ended"
+    else:
+        start_msg, end_msg = f"{function_name} function started", f"{function_name} function ended"
+    function_stats = FunctionStats.get(function_name=function_name)
 
+    @functools.wraps(func)
     def inner(*args, **kwargs):
-        if is_method(args=args):
-            logger.debug(f"{args[0].__class__.__name__} - {func.__name__} method started")
-            res = func(*args, **kwargs)
-            logger.debug(f"{args[0].__class__.__name__} - {func.__name__} method ended")
-        else:
-            logger.debug(f"{func.__name__} function started")
-            res = func(*args, **kwargs)
-            logger.debug(f"{func.__name__} function ended")
+        if FunctionStats.ENABLED:
+            if not FunctionStats.is_sampled():
+                function_stats.add_call()
+                return func(*args, **kwargs)
+            start_time = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                function_stats.add_sampled_call(seconds=perf_counter() - start_time)
+
+        if not logger.is_enabled_for(level=logging.DEBUG):
+            return func(*args, **kwargs)
+        logger.debug(start_msg)
+        res = func(*args, **kwargs)
+        logger.debug(end_msg)
         return res
 
     return inner
+
+
+def get_function_stats() -> dict:
+    """
+    Get the call counts and latency histograms of the functions decorated by `log_function`
+    :return: {function qualified name: stats}
+    """
+    return FunctionStats.get_all_stats()
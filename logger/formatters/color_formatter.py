@@ -1,10 +1,17 @@
 import logging
 import logging.handlers
 import re
+import sys
+from functools import lru_cache
+from string import Formatter
+from typing import Optional, Tuple
 
 from logger.formatters.consts import ColorCodes, MainConsts
 from logger.formatters.style_formatter import StyleFormatter
 
+# (literal text, field name, format spec, conversion, color) per part of a brace style message
+CompiledTemplate = Tuple[Tuple[str, Optional[str], str, Optional[str], str], ...]
+
 
 class ColorFormatter(logging.Formatter):
     arg_colors = [ColorCodes.PURPLE, ColorCodes.LIGHT_BLUE]
@@ -17,29 +24,42 @@ class ColorFormatter(logging.Formatter):
         logging.CRITICAL: ColorCodes.BOLD_RED,
     }
 
-    def __init__(self, fmt: str):
+    def __init__(self, fmt: str, task_fmt: str = None, use_color: bool = None):
         super().__init__()
-        self.level_to_formatter = {}
-
-        def add_color_format(level: int):
-            color = ColorFormatter.level_to_color[level]
-            _format = fmt
-            search = r"(%([^;]*))"
-            _format = re.sub(search, f"{color}\\1{ColorCodes.RESET}", _format)
-            formatter = logging.Formatter(_format)
-            self.level_to_formatter[level] = formatter
-
-        add_color_format(logging.DEBUG)
-        add_color_format(logging.INFO)
-        add_color_format(logging.WARNING)
-        add_color_format(logging.ERROR)
-        add_color_format(logging.CRITICAL)
+        self.use_color = self.should_use_color() if use_color is None else use_color
+        self.level_to_formatter = self.create_level_formatters(fmt=fmt, use_color=self.use_color)
+        # Records logged with a task context (task_id / task_type) are formatted with the task format
+        self.level_to_task_formatter = \
+            self.create_level_formatters(fmt=task_fmt, use_color=self.use_color) if task_fmt else None
+
+    @staticmethod
+    def should_use_color() -> bool:
+        if MainConsts.COLOR_MODE == "always":
+            return True
+        if MainConsts.COLOR_MODE == "never":
+            return False
+        return hasattr(sys.stdout, "isatty") and sys.stdout.isatty()
+
+    @staticmethod
+    def create_level_formatters(fmt: str, use_color: bool = True) -> dict:
+        level_to_formatter = {}
+        search = r"(%([^;]*))"
+        for level, color in ColorFormatter.level_to_color.items():
+            _format = re.sub(search, f"{color}\\1{ColorCodes.RESET}", fmt) if use_color else fmt
+            level_to_formatter[level] = logging.Formatter(_format)
+        return level_to_formatter
 
     def format(self, record):
         orig_msg = record.msg
         orig_args = record.args
-        formatter = self.level_to_formatter.get(record.levelno)
-        self.rewrite_record(record)
+        if self.use_color and getattr(record, "colored_msg", None):
+            # Message rendered with its args when it was queued, see `BoundedQueueHandler.prepare`
+            record.msg = record.colored_msg
+        if self.level_to_task_formatter and getattr(record, "task_id", None):
+            formatter = self.level_to_task_formatter.get(record.levelno)
+        else:
+            formatter = self.level_to_formatter.get(record.levelno)
+        self.rewrite_record(record, use_color=self.use_color)
         formatted = formatter.format(record)
 
         # restore log record to original state for other handlers
@@ -48,20 +68,84 @@ class ColorFormatter(logging.Formatter):
         return formatted
 
     @staticmethod
-    def rewrite_record(record: logging.LogRecord):
+    def rewrite_record(record: logging.LogRecord, use_color: bool = True):
         if not StyleFormatter.is_brace_format_style(record):
             return
 
-        msg = record.msg.replace("{", "_{{").replace("}", "_}}")
-        placeholder_count = 0
+        record.msg = ColorFormatter.render_brace_message(record, use_color=use_color)
+        record.args = []
+
+    @staticmethod
+    def render_message(record: logging.LogRecord, use_color: bool = True) -> str:
+        """
+        Render the message of the record with its args, brace style or % style
+        :param record:
+        :param use_color: color the params of a brace style message
+        :return:
+        """
+        if StyleFormatter.is_brace_format_style(record):
+            return ColorFormatter.render_brace_message(record, use_color=use_color)
+        return record.getMessage()
+
+    @staticmethod
+    def render_brace_message(record: logging.LogRecord, use_color: bool = True) -> str:
+        template = compile_brace_template(msg=record.msg, use_color=use_color)
+        if template is None:
+            return record.msg.format(*record.args)
+        return render_brace_template(template=template, args=record.args)
 
-        while True:
-            if "_{{" not in msg:
-                break
-            color_index = placeholder_count % len(ColorFormatter.arg_colors)
-            color = ColorFormatter.arg_colors[color_index]
-            msg = msg.replace("_{{", color + "{").replace("_}}", "}" + ColorCodes.RESET)
-            placeholder_count += 1
 
-        record.msg = msg.format(*record.args)
-        record.args = []
+@lru_cache(maxsize=MainConsts.TEMPLATES_CACHE_SIZE)
+def compile_brace_template(msg: str, use_color: bool = True) -> Optional[CompiledTemplate]:
+    """
+    Tokenize a brace style message once, the params get alternate colors
+    :param msg:
+    :param use_color:
+    :return: the compiled template, None if the message has params that are not positional (rendered by str.format)
+    """
+    template = []
+    placeholder_count = 0
+    try:
+        for literal_text, field_name, format_spec, conversion in Formatter().parse(msg):
+            color = ""
+            if field_name is not None:
+                if (field_name and not field_name.isdigit()) or "{" in (format_spec or ""):
+                    return None
+                if use_color:
+                    color = ColorFormatter.arg_colors[placeholder_count % len(ColorFormatter.arg_colors)]
+                placeholder_count += 1
+            template.append((literal_text, field_name, format_spec or "", conversion, color))
+    except ValueError:
+        return None
+    return tuple(template)
+
+
+def render_brace_template(template: CompiledTemplate, args: tuple) -> str:
+    """
+    Render a compiled brace style template with its args in one join
+
+    >>> render_brace_template(compile_brace_template("Got {} of {!r}", use_color=False), (3, "cnn"))
+    "Got 3 of 'cnn'"
+    """
+    parts = []
+    auto_index = 0
+    for literal_text, field_name, format_spec, conversion, color in template:
+        parts.append(literal_text)
+        if field_name is None:
+            continue
+        if field_name:
+            value = args[int(field_name)]
+        else:
+            value = args[auto_index]
+            auto_index += 1
+        if conversion == "r":
+            value = repr(value)
+        elif conversion == "s":
+            value = str(value)
+        elif conversion == "a":
+            value = ascii(value)
+        if color:
+            parts.extend((color, format(value, format_spec), ColorCodes.RESET))
+        else:
+            parts.append(format(value, format_spec))
+    return "".join(parts)
@@ -1,7 +1,12 @@
+import os
+
+
 class MainConsts:
     SERVER_LOGGER_FORMAT = "%(asctime)s | %(levelname)-8s | %(message)s | %(task_type)s | %(task_id)s"
     LOGGER_FORMAT = "%(asctime)s | %(levelname)-8s | %(message)s"
     LEVEL_FIELDS = ["levelname", "levelno"]
+    COLOR_MODE = os.getenv(key="LOG_COLOR", default="auto").lower()  # auto (only on a tty) / always / never
+    TEMPLATES_CACHE_SIZE = int(os.getenv(key="LOG_TEMPLATES_CACHE_SIZE", default=1024))
 
 
 class ColorCodes:
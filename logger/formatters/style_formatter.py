@@ -1,4 +1,7 @@
 import logging
+from functools import lru_cache
+
+from logger.formatters.consts import MainConsts
 
 
 class StyleFormatter(logging.Formatter):
@@ -8,20 +11,29 @@ class StyleFormatter(logging.Formatter):
 
     @staticmethod
     def is_brace_format_style(record: logging.LogRecord) -> bool:
-        if len(record.args) == 0:
-            return False
-
-        msg = record.msg
-        if '%' in msg:
+        if not record.args or not isinstance(record.msg, str):
             return False
-
-        count_of_start_param = msg.count("{")
-        count_of_end_param = msg.count("}")
-
-        if count_of_start_param != count_of_end_param:
-            return False
-
-        if count_of_start_param != len(record.args):
-            return False
-
-        return True
+        return get_brace_params_count(msg=record.msg) == len(record.args)
+
+
+@lru_cache(maxsize=MainConsts.TEMPLATES_CACHE_SIZE)
+def get_brace_params_count(msg: str) -> int:
+    """
+    Count the brace params of the message, once per distinct message
+
+    >>> get_brace_params_count("Got {} articles of {}")
+    2
+    >>> get_brace_params_count("Got %s articles of {}")
+    -1
+
+    :param msg:
+    :return: count of brace params, -1 if the message is not brace style
+    """
+    if '%' in msg:
+        return -1
+
+    count_of_start_param = msg.count("{")
+    count_of_end_param = msg.count("}")
+    if count_of_start_param != count_of_end_param:
+        return -1
+    return count_of_start_param
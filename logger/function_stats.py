@@ -0,0 +1,74 @@
+import os
+import random
+import threading
+from bisect import bisect_left
+from typing import Dict, List
+
+
+class FunctionStats:
+    """
+    Call count and latency histogram of one function decorated by `log_function`.
+    When `LOG_FUNCTION_STATS` is enabled, `log_function` records the calls instead of writing debug lines,
+    `LOG_FUNCTION_SAMPLE_RATE` is the part of the calls that are timed (all the calls are counted).
+    """
+    ENABLED = os.getenv(key="LOG_FUNCTION_STATS", default="false").lower() == "true"
+    SAMPLE_RATE = float(os.getenv(key="LOG_FUNCTION_SAMPLE_RATE", default=1))
+    BUCKETS_MS = [0.1, 0.5, 1, 5, 10, 50, 100, 500, 1000, 5000]
+    _registry: Dict[str, 'FunctionStats'] = dict()
+    _registry_lock = threading.Lock()
+
+    def __init__(self, function_name: str):
+        self.function_name = function_name
+        self.calls = 0
+        self.sampled_calls = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.histogram: List[int] = [0] * (len(self.BUCKETS_MS) + 1)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get(cls, function_name: str) -> 'FunctionStats':
+        function_stats = cls._registry.get(function_name)
+        if function_stats is None:
+            with cls._registry_lock:
+                function_stats = cls._registry.setdefault(function_name, cls(function_name=function_name))
+        return function_stats
+
+    @classmethod
+    def get_all_stats(cls) -> Dict[str, dict]:
+        with cls._registry_lock:
+            functions_stats = list(cls._registry.values())
+        return {function_stats.function_name: function_stats.to_dict() for function_stats in functions_stats}
+
+    @classmethod
+    def reset_all(cls):
+        with cls._registry_lock:
+            cls._registry.clear()
+
+    @classmethod
+    def is_sampled(cls) -> bool:
+        return cls.SAMPLE_RATE >= 1 or random.random() < cls.SAMPLE_RATE
+
+    def add_call(self):
+        with self._lock:
+            self.calls += 1
+
+    def add_sampled_call(self, seconds: float):
+        ms = seconds * 1000
+        with self._lock:
+            self.calls += 1
+            self.sampled_calls += 1
+            self.total_ms += ms
+            self.max_ms = max(self.max_ms, ms)
+            self.histogram[bisect_left(self.BUCKETS_MS, ms)] += 1
+
+    def to_dict(self) -> dict:
+        with self._lock:
+            buckets = [f"<={bucket}ms" for bucket in self.BUCKETS_MS] + [f">{self.BUCKETS_MS[-1]}ms"]
+            return {
+                "calls": self.calls,
+                "sampled_calls": self.sampled_calls,
+                "avg_ms": self.total_ms / self.sampled_calls if self.sampled_calls else 0.0,
+                "max_ms": self.max_ms,
+                "histogram": dict(zip(buckets, self.histogram))
+            }
@@ -1,48 +1,149 @@
 import logging
 import os
+import queue
+import sys
+import threading
 from datetime import datetime
+from time import monotonic
+from typing import List
 
-from pymongo import MongoClient
-
+from db_utils.mongo_client_registry import MongoClientRegistry
 from db_utils.validation_utils import get_mongodb_connection_string
+from logger.formatters.color_formatter import ColorFormatter
 from logger.objects.log import Log
 
 
 class LogDBHandler(logging.Handler):
+    """
+    Saving the log records to the db without blocking the logging thread.
+    Every record is formatted when emitted (brace style like the console), so a bad record is reported alone by
+    `handleError` and later changes of its args are not saved. The logs are put in a bounded buffer and a background
+    writer inserts them with `insert_many`, when a batch is full or when the flush interval passed. When the buffer is
+    full the record is dropped (`drop` policy) or the logging thread waits up to `LOG_DB_BLOCK_TIMEOUT` seconds for a
+    free place (`block` policy).
+    """
     DB_NAME = os.getenv(key='DB_NAME', default='local')
     LOG_TABLE = "log"
-    connection_string = None
+    BUFFER_SIZE = int(os.getenv(key="LOG_DB_BUFFER_SIZE", default=10000))
+    BATCH_SIZE = int(os.getenv(key="LOG_DB_BATCH_SIZE", default=100))
+    FLUSH_INTERVAL = float(os.getenv(key="LOG_DB_FLUSH_INTERVAL", default=2))
+    OVERFLOW_POLICY = os.getenv(key="LOG_DB_OVERFLOW_POLICY", default="drop")
+    BLOCK_TIMEOUT = float(os.getenv(key="LOG_DB_BLOCK_TIMEOUT", default=1))
+    FLUSH_TIMEOUT = float(os.getenv(key="LOG_DB_FLUSH_TIMEOUT", default=10))
+    DROP_POLICY = "drop"
+    BLOCK_POLICY = "block"
+    _STOP = object()
 
-    def _connect(self):
-        self._connection_string = get_mongodb_connection_string()
-        self.__client = MongoClient(self.connection_string)
-        self.__db = self.__client[self.DB_NAME]
+    def __init__(self, level: int = logging.NOTSET, buffer_size: int = BUFFER_SIZE, batch_size: int = BATCH_SIZE,
+                 flush_interval: float = FLUSH_INTERVAL, overflow_policy: str = OVERFLOW_POLICY):
+        super().__init__(level=level)
+        if overflow_policy not in [self.DROP_POLICY, self.BLOCK_POLICY]:
+            raise ValueError(f"Unknown overflow policy: `{overflow_policy}`")
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.overflow_policy = overflow_policy
+        self.setFormatter(ColorFormatter(fmt="%(message)s", use_color=False))
+        self._queue = queue.Queue(maxsize=buffer_size)
+        self._counters_lock = threading.Lock()
+        self._counters = {"flushed": 0, "dropped": 0, "failed": 0, "batches": 0}
+        self._writer = threading.Thread(target=self._run_writer, name="log_db_writer", daemon=True)
+        self._writer.start()
 
-    def _disconnect(self):
-        self.__client.close()
+    def get_stats(self) -> dict:
+        with self._counters_lock:
+            stats = dict(self._counters)
+        stats["queued"] = self._queue.qsize()
+        return stats
 
-    def _insert(self, data: dict):
+    def emit(self, record: logging.LogRecord):
         try:
-            self._connect()
-            return self.__db[self.LOG_TABLE].insert_one(data)
-        except Exception as e:
-            raise e
-        finally:
-            self._disconnect()
+            data = self._prepare_log(record).convert_to_dict()
+        except Exception:
+            self._add_to_counter(counter="failed")
+            self.handleError(record)
+            return
+        try:
+            if self.overflow_policy == self.BLOCK_POLICY:
+                self._queue.put(data, timeout=self.BLOCK_TIMEOUT)
+            else:
+                self._queue.put_nowait(data)
+        except queue.Full:
+            self._add_to_counter(counter="dropped")
 
-    def emit(self, record: logging.LogRecord):
+    def flush(self):
+        """
+        Wait until all the records that were emitted before the call are inserted to the db
+        :return:
+        """
+        if not self._writer.is_alive():
+            return
+        flushed_event = threading.Event()
         try:
-            data = {
-                "level": record.levelname,
-                "msg": self.format(record),
-                "created": datetime.fromtimestamp(record.created)
-            }
-            if hasattr(record, "task_id"):
-                data.update({"task_id": record.task_id})
-            if hasattr(record, "task_type"):
-                data.update({"task_type": record.task_type})
-            log = Log(**data)
-            self._insert(log.convert_to_dict())
+            self._queue.put(flushed_event, timeout=self.FLUSH_TIMEOUT)
+            flushed_event.wait(timeout=self.FLUSH_TIMEOUT)
+        except queue.Full:
+            pass
+
+    def close(self):
+        if self._writer.is_alive():
+            try:
+                self._queue.put(self._STOP, timeout=self.FLUSH_TIMEOUT)
+                self._writer.join(timeout=self.FLUSH_TIMEOUT)
+            except queue.Full:
+                pass
+        super().close()
+
+    def _run_writer(self):
+        batch: List[dict] = list()
+        batch_deadline = None
+        while True:
+            timeout = None if batch_deadline is None else max(0.0, batch_deadline - monotonic())
+            try:
+                item = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                item = None
+
+            if isinstance(item, dict):
+                batch.append(item)
+                if batch_deadline is None:
+                    batch_deadline = monotonic() + self.flush_interval
+                if len(batch) < self.batch_size:
+                    continue
+
+            # Batch is full, flush interval passed, flush was requested or the handler is closing
+            self._insert_batch(batch=batch)
+            batch = list()
+            batch_deadline = None
+            if isinstance(item, threading.Event):
+                item.set()
+            elif item is self._STOP:
+                return
+
+    def _insert_batch(self, batch: List[dict]):
+        if not batch:
+            return
+        try:
+            client = MongoClientRegistry.get_client(connection_string=get_mongodb_connection_string())
+            client[self.DB_NAME][self.LOG_TABLE].insert_many(batch, ordered=False)
+            self._add_to_counter(counter="flushed", amount=len(batch))
+            self._add_to_counter(counter="batches")
         except Exception as e:
-            print(e)
-            self.handleError(record)
+            self._add_to_counter(counter="failed", amount=len(batch))
+            if logging.raiseExceptions and sys.stderr:
+                sys.stderr.write(f"--- Logging error ---\nError inserting {len(batch)} logs to db, except: {e}\n")
+
+    def _prepare_log(self, record: logging.LogRecord) -> Log:
+        data = {
+            "level": record.levelname,
+            "msg": self.format(record),
+            "created": datetime.fromtimestamp(record.created)
+        }
+        if hasattr(record, "task_id"):
+            data.update({"task_id": record.task_id})
+        if hasattr(record, "task_type"):
+            data.update({"task_type": record.task_type})
+        return Log(**data)
+
+    def _add_to_counter(self, counter: str, amount: int = 1):
+        with self._counters_lock:
+            self._counters[counter] += amount
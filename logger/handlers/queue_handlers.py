@@ -0,0 +1,76 @@
+import copy
+import logging
+import os
+import queue
+import threading
+from logging.handlers import QueueHandler, QueueListener
+
+from logger.formatters.color_formatter import ColorFormatter
+from logger.formatters.style_formatter import StyleFormatter
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    Putting the records in a bounded in-memory queue, a `LogQueueListener` emits them to the real handlers.
+    The message is rendered with its args (brace or % style) when the record is queued, so later changes of the args
+    are not logged. The colored params of a brace style message are kept in `colored_msg` for the console.
+    When the queue is full the record is dropped and counted.
+    """
+    QUEUE_SIZE = int(os.getenv(key="LOG_QUEUE_SIZE", default=10000))
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        super().__init__(queue=queue.Queue(maxsize=queue_size))
+        self.use_color = ColorFormatter.should_use_color()
+        self._counters_lock = threading.Lock()
+        self._counters = {"queued": 0, "dropped": 0}
+
+    def get_stats(self) -> dict:
+        with self._counters_lock:
+            stats = dict(self._counters)
+        stats["waiting"] = self.queue.qsize()
+        return stats
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        if self.use_color and StyleFormatter.is_brace_format_style(record):
+            record.colored_msg = ColorFormatter.render_brace_message(record, use_color=True)
+        record.msg = ColorFormatter.render_message(record, use_color=False)
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+            self._add_to_counter(counter="queued")
+        except queue.Full:
+            self._add_to_counter(counter="dropped")
+
+    def _add_to_counter(self, counter: str, amount: int = 1):
+        with self._counters_lock:
+            self._counters[counter] += amount
+
+
+class LogQueueListener(QueueListener):
+    """
+    Draining the queue of a `BoundedQueueHandler` in a background thread.
+    `stop` waits for a free place for the sentinel, so all the records queued before it are emitted and the handlers
+    are flushed
+    """
+    STOP_TIMEOUT = float(os.getenv(key="LOG_QUEUE_STOP_TIMEOUT", default=10))
+
+    def __init__(self, queue_handler: BoundedQueueHandler, *handlers: logging.Handler):
+        super().__init__(queue_handler.queue, *handlers, respect_handler_level=True)
+        self._lock = threading.Lock()
+
+    def stop(self):
+        with self._lock:
+            if self._thread is None:
+                return
+            try:
+                self.queue.put(self._sentinel, timeout=self.STOP_TIMEOUT)
+                self._thread.join(timeout=self.STOP_TIMEOUT)
+            except queue.Full:
+                pass
+            self._thread = None
+        for handler in self.handlers:
+            handler.flush()
@@ -0,0 +1,12 @@
+from dataclasses import dataclass
+
+
+@dataclass(frozen=True)
+class TaskContext:
+    task_id: str = None
+    task_type: str = None
+
+    def convert_to_extra(self) -> dict:
+        if not self.task_id and not self.task_type:
+            return dict()
+        return {"task_id": self.task_id, "task_type": self.task_type}
@@ -1,122 +1,189 @@
+import atexit
 import logging
 import os
 import sys
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
 
 from logger.formatters.color_formatter import ColorFormatter
 from logger.formatters.consts import MainConsts
 from logger.handlers.log_db_handler import LogDBHandler
+from logger.handlers.queue_handlers import BoundedQueueHandler, LogQueueListener
+from logger.objects.task_context import TaskContext
+from logger.task_logger import TaskLogger
 from singleton_class import Singleton
 
-
-def check_last_log(func):
-    def inner(*args, **kwargs):
-        msg = get_message_from_log_args(*args, **kwargs)
-        log_data = {
-            "level": func.__name__.upper(),
-            "msg": msg,
-            "task_id": args[0].task_id,
-            "task_type": args[0].task_type
-        }
-        last_log = args[0].last_log
-
-        if last_log != log_data:
-            func(*args, **kwargs)
-            args[0].set_last_log(log_data)
-
-    return inner
-
-
-def get_message_from_log_args(*args, **kwargs) -> str:
-    if len(args) > 1:
-        msg = args[1]
-    elif kwargs.get("msg"):
-        msg = kwargs.get("msg")
-    else:
-        msg = ""
-    return msg
+# Task of the current thread / asyncio task, and its last log (to skip repeated logs)
+TASK_CONTEXT: ContextVar[TaskContext] = ContextVar("server_logger_task_context", default=TaskContext())
+LAST_LOG: ContextVar[tuple] = ContextVar("server_logger_last_log", default=tuple())
 
 
 class ServerLogger(Singleton):
     SAVE_LOG_TO_DB = bool(os.getenv(key="SAVE_LOG_TO_DB", default=False))
+    LOG_LEVEL = os.getenv(key="LOG_LEVEL", default="DEBUG").upper()
+    LOG_ASYNC = os.getenv(key="LOG_ASYNC", default="false").lower() == "true"
     __initialized = False
+    __queue_handler: BoundedQueueHandler = None
+    __queue_listener: LogQueueListener = None
+    __setup_lock = threading.Lock()
 
     def __init__(self, task_id: str = None, task_type: str = None):
-        root_logger = logging.getLogger()
-        console_handler = logging.StreamHandler(stream=sys.stdout)
-
-        if task_id and task_type:
-            console_format = MainConsts.SERVER_LOGGER_FORMAT
-        else:
-            console_format = MainConsts.LOGGER_FORMAT
-
-        colored_formatter = ColorFormatter(console_format)
-        console_handler.setFormatter(colored_formatter)
-
+        if not ServerLogger.__initialized:
+            with ServerLogger.__setup_lock:
+                if not ServerLogger.__initialized:
+                    self.__setup()
+                    ServerLogger.__initialized = True
+
+        if task_id or task_type:
+            self.set_task_context(task_id=task_id, task_type=task_type)
+
+    def __setup(self):
+        """
+        Setup the handlers and formatters, once per process.
+        When `LOG_ASYNC`, the console and db handlers are emitted by a background listener behind one bounded queue
+        :return:
+        """
         self.logger = logging.getLogger("server_logger")
-        self.logger.setLevel(level=logging.DEBUG)
+        self.logger.setLevel(level=self.LOG_LEVEL)
 
-        self.__task_id = task_id
-        if self.__task_id:  # or not hasattr(self.logger, "task_id"):
-            self.logger.__setattr__("task_id", self.__task_id)
-
-        self.__task_type = task_type
-        if self.__task_type:  # or not hasattr(self.logger, "task_type"):
-            self.logger.__setattr__("task_type", self.__task_type)
-
-        if not self.__initialized:
-            root_logger.addHandler(console_handler)
+        console_handler = logging.StreamHandler(stream=sys.stdout)
+        colored_formatter = ColorFormatter(MainConsts.LOGGER_FORMAT, task_fmt=MainConsts.SERVER_LOGGER_FORMAT)
+        console_handler.setFormatter(colored_formatter)
+        if self.LOG_ASYNC:
+            self.__start_queue_listener(console_handler, self.create_db_handler())
+        else:
+            logging.getLogger().addHandler(console_handler)
             self.add_db_handler()
-            self.__initialized = True
 
-        self.__last_log = dict()
+    def __start_queue_listener(self, console_handler: logging.Handler, db_handler: LogDBHandler = None):
+        handlers = [console_handler]
+        if db_handler:
+            # The queue handler is on the root logger, only the server logger records are saved to the db
+            db_handler.addFilter(logging.Filter(name=self.logger.name))
+            handlers.append(db_handler)
+        ServerLogger.__queue_handler = BoundedQueueHandler()
+        ServerLogger.__queue_listener = LogQueueListener(ServerLogger.__queue_handler, *handlers)
+        logging.getLogger().addHandler(ServerLogger.__queue_handler)
+        ServerLogger.__queue_listener.start()
+        atexit.register(ServerLogger.__queue_listener.stop)
+
+    @staticmethod
+    def get_queue_stats() -> dict:
+        """
+        Get the counters of the async logging queue
+        :return: {"queued": int, "dropped": int, "waiting": int}, empty dict if `LOG_ASYNC` is disabled
+        """
+        if ServerLogger.__queue_handler is None:
+            return dict()
+        return ServerLogger.__queue_handler.get_stats()
+
+    @staticmethod
+    def stop_queue_listener():
+        """
+        Emit all the queued records and stop the async logging listener, called at exit
+        :return:
+        """
+        if ServerLogger.__queue_listener is not None:
+            ServerLogger.__queue_listener.stop()
 
     @property
     def task_id(self):
-        return self.__task_id
+        return TASK_CONTEXT.get().task_id
 
     @property
     def task_type(self):
-        return self.__task_type
+        return TASK_CONTEXT.get().task_type
 
     @property
     def last_log(self):
-        return self.__last_log
-
-    def set_last_log(self, log: dict):
-        self.__last_log = log
-
-    def add_db_handler(self):
+        return LAST_LOG.get()
+
+    def set_last_log(self, log: tuple):
+        LAST_LOG.set(log)
+
+    @staticmethod
+    def set_task_context(task_id: str = None, task_type: str = None):
+        """
+        Set the task of the current thread / asyncio task, all its logs will have this task id and type
+        :param task_id:
+        :param task_type:
+        :return:
+        """
+        TASK_CONTEXT.set(TaskContext(task_id=task_id, task_type=task_type))
+
+    @contextmanager
+    def task_context(self, task_id: str = None, task_type: str = None) -> Iterator['ServerLogger']:
+        """
+        Set the task of the current thread / asyncio task only inside the context
+
+        # example of use:
+        with logger.task_context(task_id=task.task_id, task_type=task.type):
+            article_utils.insert_article(article)  # logs of the utils and the driver have the task id
+
+        :param task_id:
+        :param task_type:
+        :return:
+        """
+        token = TASK_CONTEXT.set(TaskContext(task_id=task_id, task_type=task_type))
+        try:
+            yield self
+        finally:
+            TASK_CONTEXT.reset(token)
+
+    def bind(self, task_id: str = None, task_type: str = None) -> TaskLogger:
+        """
+        Get a logger adapter that logs with the given task, without changing the shared logger
+        :param task_id:
+        :param task_type:
+        :return:
+        """
+        return TaskLogger(server_logger=self, task_context=TaskContext(task_id=task_id, task_type=task_type))
+
+    def create_db_handler(self) -> LogDBHandler:
         if self.SAVE_LOG_TO_DB:
             db_handler = LogDBHandler()
             db_handler.setLevel(self.logger.getEffectiveLevel())
-            self.logger.addHandler(db_handler)
-
-    @check_last_log
-    def debug(self, msg: str):
-        self.logger.debug(msg=msg, extra=self._prepare_msg_extra())
+            return db_handler
 
-    @check_last_log
-    def info(self, msg: str):
-        self.logger.info(msg=msg, extra=self._prepare_msg_extra())
-
-    @check_last_log
-    def warning(self, msg: str):
-        self.logger.warning(msg=msg, extra=self._prepare_msg_extra())
-
-    @check_last_log
-    def error(self, msg: str):
-        self.logger.error(msg=msg, extra=self._prepare_msg_extra())
-
-    @check_last_log
-    def exception(self, msg: str):
-        self.logger.critical(msg=msg, extra=self._prepare_msg_extra())
-
-    def _prepare_msg_extra(self):
-        extra = dict()
-        if hasattr(self.logger, "task_id") and self.__task_id:
-            extra["task_id"] = self.logger.task_id
-
-        if hasattr(self.logger, "task_type") and self.__task_type:
-            extra["task_type"] = self.logger.task_type
+    def add_db_handler(self):
+        db_handler = self.create_db_handler()
+        if db_handler:
+            self.logger.addHandler(db_handler)
 
-        return extra
+    def is_enabled_for(self, level: int) -> bool:
+        return self.logger.isEnabledFor(level)
+
+    def log(self, level: int, msg: str, *args, task_context: TaskContext = None):
+        """
+        Log the message if its level is enabled and it is not the same as the last log of the current context.
+        The message is formatted with its args only when a handler emits the record
+        :param level:
+        :param msg:
+        :param args:
+        :param task_context: task of the log, the task of the current context if None
+        :return:
+        """
+        if not self.logger.isEnabledFor(level):
+            return
+        task_context = task_context if task_context is not None else TASK_CONTEXT.get()
+        log_data = (level, msg, args, task_context)
+        if LAST_LOG.get() != log_data:
+            self.logger.log(level, msg, *args, extra=task_context.convert_to_extra())
+            LAST_LOG.set(log_data)
+
+    def debug(self, msg: str, *args):
+        self.log(logging.DEBUG, msg, *args)
+
+    def info(self, msg: str, *args):
+        self.log(logging.INFO, msg, *args)
+
+    def warning(self, msg: str, *args):
+        self.log(logging.WARNING, msg, *args)
+
+    def error(self, msg: str, *args):
+        self.log(logging.ERROR, msg, *args)
+
+    def exception(self, msg: str, *args):
+        self.log(logging.CRITICAL, msg, *args)
@@ -0,0 +1,41 @@
+import logging
+
+from logger.objects.task_context import TaskContext
+
+
+class TaskLogger:
+    """
+    Lightweight logger adapter bound to a task, created by `ServerLogger.bind`.
+    Logging through it never changes the shared logger, so concurrent tasks log with their own task id.
+    """
+    __slots__ = ("_server_logger", "_task_context")
+
+    def __init__(self, server_logger, task_context: TaskContext):
+        self._server_logger = server_logger
+        self._task_context = task_context
+
+    @property
+    def task_id(self) -> str:
+        return self._task_context.task_id
+
+    @property
+    def task_type(self) -> str:
+        return self._task_context.task_type
+
+    def is_enabled_for(self, level: int) -> bool:
+        return self._server_logger.is_enabled_for(level)
+
+    def debug(self, msg: str, *args):
+        self._server_logger.log(logging.DEBUG, msg, *args, task_context=self._task_context)
+
+    def info(self, msg: str, *args):
+        self._server_logger.log(logging.INFO, msg, *args, task_context=self._task_context)
+
+    def warning(self, msg: str, *args):
+        self._server_logger.log(logging.WARNING, msg, *args, task_context=self._task_context)
+
+    def error(self, msg: str, *args):
+        self._server_logger.log(logging.ERROR, msg, *args, task_context=self._task_context)
+
+    def exception(self, msg: str, *args):
+        self._server_logger.log(logging.CRITICAL, msg, *args, task_context=self._task_context)
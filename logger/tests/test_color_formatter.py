@@ -0,0 +1,37 @@
+import logging
+from unittest import TestCase
+
+from logger.formatters.color_formatter import ColorFormatter, compile_brace_template
+from logger.formatters.consts import ColorCodes
+
+
+def init_record(msg: str, args: tuple, level: int = logging.INFO) -> logging.LogRecord:
+    return logging.LogRecord(name="test", level=level, pathname=__file__, lineno=1, msg=msg, args=args, exc_info=None)
+
+
+class TestColorFormatter(TestCase):
+    def test_brace_style_colors(self):
+        formatter = ColorFormatter("%(message)s", use_color=True)
+        formatted = formatter.format(init_record(msg="Got {} of {}", args=(3, "cnn")))
+        self.assertIn(f"{ColorCodes.PURPLE}3{ColorCodes.RESET}", formatted)
+        self.assertIn(f"{ColorCodes.LIGHT_BLUE}cnn{ColorCodes.RESET}", formatted)
+
+    def test_without_color(self):
+        formatter = ColorFormatter("%(levelname)s | %(message)s", use_color=False)
+        self.assertEqual("INFO | Got 3 of cnn", formatter.format(init_record(msg="Got {} of {}", args=(3, "cnn"))))
+        self.assertEqual("INFO | Got 3 of cnn", formatter.format(init_record(msg="Got %s of %s", args=(3, "cnn"))))
+
+    def test_record_restored(self):
+        record = init_record(msg="Got {}", args=(3,))
+        ColorFormatter("%(message)s", use_color=True).format(record)
+        self.assertEqual("Got {}", record.msg)
+        self.assertEqual((3,), record.args)
+
+    def test_template_cached(self):
+        self.assertIs(compile_brace_template("Got {} of {}"), compile_brace_template("Got {} of {}"))
+
+    def test_task_format(self):
+        formatter = ColorFormatter("%(message)s", task_fmt="%(message)s | %(task_id)s", use_color=False)
+        record = init_record(msg="Got %s", args=(3,))
+        record.task_id = "task_id"
+        self.assertEqual("Got 3 | task_id", formatter.format(record))
@@ -0,0 +1,163 @@
+import logging
+import os
+import threading
+from collections import defaultdict
+from time import monotonic, sleep
+from unittest import TestCase
+from unittest.mock import patch
+
+from db_utils.mongo_client_registry import MongoClientRegistry
+from logger.handlers.log_db_handler import LogDBHandler
+
+
+class ListCollection:
+    def __init__(self):
+        self.documents = list()
+        self.insert_started = threading.Event()
+        self.release_insert = threading.Event()
+        self.release_insert.set()
+
+    def insert_many(self, documents: list, ordered: bool = True):
+        self.insert_started.set()
+        self.release_insert.wait(timeout=5)
+        self.documents.extend(documents)
+
+
+class ListClient:
+    def __init__(self):
+        self.collection = ListCollection()
+        self.databases = defaultdict(lambda: defaultdict(lambda: self.collection))
+
+    def __getitem__(self, db_name: str):
+        return self.databases[db_name]
+
+
+def init_record(msg: str, args: tuple = ()) -> logging.LogRecord:
+    return logging.LogRecord(name="test", level=logging.INFO, pathname=__file__, lineno=1, msg=msg, args=args,
+                             exc_info=None)
+
+
+def wait_for(condition, timeout: float = 5) -> bool:
+    deadline = monotonic() + timeout
+    while not condition():
+        if monotonic() > deadline:
+            return False
+        sleep(0.01)
+    return True
+
+
+class TestLogDBHandler(TestCase):
+    def setUp(self):
+        self.client = ListClient()
+        self.collection = self.client.collection
+        client_patcher = patch.object(MongoClientRegistry, "get_client", return_value=self.client)
+        client_patcher.start()
+        self.addCleanup(client_patcher.stop)
+        env_patcher = patch.dict(os.environ, {"CONNECTION_STRING": "mongodb://log.test:27017"})
+        env_patcher.start()
+        self.addCleanup(env_patcher.stop)
+
+    def init_handler(self, **kwargs) -> LogDBHandler:
+        handler = LogDBHandler(**kwargs)
+        self.addCleanup(handler.close)
+        self.addCleanup(self.collection.release_insert.set)
+        return handler
+
+    def get_messages(self) -> list:
+        return [document["msg"] for document in self.collection.documents]
+
+    def block_writer(self, handler: LogDBHandler):
+        """
+        Keep the writer busy inserting one log, so the next logs wait in the buffer
+        """
+        self.collection.release_insert.clear()
+        handler.handle(init_record(msg="Blocking"))
+        self.assertTrue(self.collection.insert_started.wait(timeout=5))
+
+    def test_flush_by_batch_size(self):
+        handler = self.init_handler(batch_size=3, flush_interval=60)
+        for i in range(7):
+            handler.handle(init_record(msg="Log %s", args=(i,)))
+        self.assertTrue(wait_for(lambda: len(self.collection.documents) == 6))
+        self.assertEqual([f"Log {i}" for i in range(6)], self.get_messages())
+        self.assertEqual(2, handler.get_stats()["batches"])
+
+    def test_flush_by_interval(self):
+        handler = self.init_handler(batch_size=100, flush_interval=0.05)
+        handler.handle(init_record(msg="Log"))
+        self.assertTrue(wait_for(lambda: len(self.collection.documents) == 1))
+        self.assertEqual({"flushed": 1, "dropped": 0, "failed": 0, "batches": 1, "queued": 0}, handler.get_stats())
+
+    def test_flush_and_close_drain_buffer(self):
+        handler = self.init_handler(batch_size=100, flush_interval=60)
+        for i in range(10):
+            handler.handle(init_record(msg="Log %s", args=(i,)))
+        handler.flush()
+        self.assertEqual([f"Log {i}" for i in range(10)], self.get_messages())
+
+        for i in range(10, 15):
+            handler.handle(init_record(msg="Log %s", args=(i,)))
+        handler.close()
+        self.assertEqual([f"Log {i}" for i in range(15)], self.get_messages())
+        self.assertEqual({"flushed": 15, "dropped": 0, "failed": 0, "batches": 2, "queued": 0}, handler.get_stats())
+
+    def test_drop_policy(self):
+        handler = self.init_handler(buffer_size=2, batch_size=1, flush_interval=60, overflow_policy="drop")
+        self.block_writer(handler=handler)
+        for i in range(5):
+            handler.handle(init_record(msg="Log %s", args=(i,)))
+        self.assertEqual({"flushed": 0, "dropped": 3, "failed": 0, "batches": 0, "queued": 2}, handler.get_stats())
+
+        self.collection.release_insert.set()
+        handler.flush()
+        self.assertEqual(["Blocking", "Log 0", "Log 1"], self.get_messages())
+
+    def test_block_policy(self):
+        handler = self.init_handler(buffer_size=2, batch_size=1, flush_interval=60, overflow_policy="block")
+        self.block_writer(handler=handler)
+        for i in range(2):
+            handler.handle(init_record(msg="Log %s", args=(i,)))
+        release_timer = threading.Timer(interval=0.1, function=self.collection.release_insert.set)
+        release_timer.start()
+        with patch.object(LogDBHandler, "BLOCK_TIMEOUT", 5):
+            handler.handle(init_record(msg="Log %s", args=(2,)))
+        handler.flush()
+        self.assertEqual(["Blocking", "Log 0", "Log 1", "Log 2"], self.get_messages())
+        self.assertEqual(0, handler.get_stats()["dropped"])
+
+    def test_block_policy_timeout(self):
+        handler = self.init_handler(buffer_size=1, batch_size=1, flush_interval=60, overflow_policy="block")
+        self.block_writer(handler=handler)
+        handler.handle(init_record(msg="Log %s", args=(0,)))
+        with patch.object(LogDBHandler, "BLOCK_TIMEOUT", 0.05):
+            handler.handle(init_record(msg="Log %s", args=(1,)))
+        self.assertEqual(1, handler.get_stats()["dropped"])
+
+    def test_bad_record_does_not_drop_batch(self):
+        handler = self.init_handler(batch_size=100, flush_interval=60)
+        with patch.object(LogDBHandler, "handleError") as handle_error_mock:
+            handler.handle(init_record(msg="Log %s"))
+            handler.handle(init_record(msg="Got %d logs", args=("many",)))
+            handler.handle(init_record(msg="Got {} logs of {!r}", args=(3, "cnn")))
+        handler.flush()
+        self.assertEqual(["Log %s", "Got 3 logs of 'cnn'"], self.get_messages())
+        self.assertEqual(1, handle_error_mock.call_count)
+        self.assertEqual(1, handler.get_stats()["failed"])
+
+    def test_record_args_snapshot_when_emitted(self):
+        handler = self.init_handler(batch_size=100, flush_interval=60)
+        articles = ["a"]
+        handler.handle(init_record(msg="Articles: %s", args=(articles,)))
+        articles.append("b")
+        handler.flush()
+        self.assertEqual(["Articles: ['a']"], self.get_messages())
+
+    def test_insert_error_counted(self):
+        handler = self.init_handler(batch_size=100, flush_interval=60)
+        with patch.object(ListCollection, "insert_many", side_effect=ConnectionError("No db")), \
+                patch("sys.stderr") as stderr_mock:
+            for i in range(3):
+                handler.handle(init_record(msg="Log %s", args=(i,)))
+            handler.flush()
+        self.assertEqual(3, handler.get_stats()["failed"])
+        self.assertIn("Error inserting 3 logs", stderr_mock.write.call_args[0][0])
@@ -0,0 +1,92 @@
+from unittest import TestCase
+from unittest.mock import call, patch
+
+from logger import get_function_stats, log_function
+from logger.function_stats import FunctionStats
+from logger.server_logger import ServerLogger
+
+
+class Counter:
+    def __init__(self):
+        self.count = 0
+
+    @log_function
+    def increase(self, amount: int = 1) -> int:
+        self.count += amount
+        return self.count
+
+
+class TestLogFunction(TestCase):
+    def setUp(self):
+        FunctionStats.reset_all()
+        self.addCleanup(FunctionStats.reset_all)
+
+    def test_disabled_level_skips_logging(self):
+        counter = Counter()
+        with patch.object(ServerLogger, "is_enabled_for", return_value=False), \
+                patch.object(ServerLogger, "log") as log_mock:
+            self.assertEqual(2, counter.increase(amount=2))
+        log_mock.assert_not_called()
+        self.assertEqual(2, counter.count)
+
+    def test_enabled_level_logs_start_and_end(self):
+        with patch.object(ServerLogger, "is_enabled_for", return_value=True), \
+                patch.object(ServerLogger, "debug") as debug_mock:
+            self.assertEqual(1, Counter().increase())
+        self.assertEqual([call("Counter - increase method started"), call("Counter - increase method ended")],
+                         debug_mock.call_args_list)
+
+    def test_stats_count_calls_instead_of_logging(self):
+        @log_function
+        def add(a: int, b: int) -> int:
+            return a + b
+
+        with patch.object(FunctionStats, "ENABLED", True), patch.object(FunctionStats, "SAMPLE_RATE", 1), \
+                patch.object(ServerLogger, "log") as log_mock:
+            for i in range(3):
+                self.assertEqual(i + 1, add(i, 1))
+        log_mock.assert_not_called()
+        stats = get_function_stats()[add.__qualname__]
+        self.assertEqual(3, stats["calls"])
+        self.assertEqual(3, stats["sampled_calls"])
+        self.assertEqual(3, sum(stats["histogram"].values()))
+
+    def test_stats_sampling(self):
+        @log_function
+        def noop():
+            pass
+
+        with patch.object(FunctionStats, "ENABLED", True), patch.object(FunctionStats, "SAMPLE_RATE", 0.5), \
+                patch("logger.function_stats.random.random", side_effect=[0.1, 0.9, 0.4, 0.7]):
+            for _ in range(4):
+                noop()
+        stats = get_function_stats()[noop.__qualname__]
+        self.assertEqual(4, stats["calls"])
+        self.assertEqual(2, stats["sampled_calls"])
+        self.assertEqual(2, sum(stats["histogram"].values()))
+
+        with patch.object(FunctionStats, "ENABLED", True), patch.object(FunctionStats, "SAMPLE_RATE", 0):
+            noop()
+        self.assertEqual(2, get_function_stats()[noop.__qualname__]["sampled_calls"])
+
+
+class TestFunctionStats(TestCase):
+    def test_histogram_buckets(self):
+        function_stats = FunctionStats(function_name="test")
+        for seconds in [0.00005, 0.0002, 0.001, 0.003, 0.003, 10]:
+            function_stats.add_sampled_call(seconds=seconds)
+        function_stats.add_call()
+        stats = function_stats.to_dict()
+
+        self.assertEqual(7, stats["calls"])
+        self.assertEqual(6, stats["sampled_calls"])
+        self.assertEqual(10000, stats["max_ms"])
+        self.assertAlmostEqual(sum([0.05, 0.2, 1, 3, 3, 10000]) / 6, stats["avg_ms"])
+        expected_histogram = {"<=0.1ms": 1, "<=0.5ms": 1, "<=1ms": 1, "<=5ms": 2, ">5000ms": 1}
+        self.assertEqual(expected_histogram, {bucket: count for bucket, count in stats["histogram"].items() if count})
+        self.assertEqual(len(FunctionStats.BUCKETS_MS) + 1, len(stats["histogram"]))
+
+    def test_empty_stats(self):
+        stats = FunctionStats(function_name="test").to_dict()
+        self.assertEqual(0.0, stats["avg_ms"])
+        self.assertEqual(0, sum(stats["histogram"].values()))
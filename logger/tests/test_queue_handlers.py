@@ -0,0 +1,83 @@
+import logging
+from unittest import TestCase
+from unittest.mock import patch
+
+from logger.formatters.color_formatter import ColorFormatter
+from logger.formatters.consts import ColorCodes
+from logger.handlers.queue_handlers import BoundedQueueHandler, LogQueueListener
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.messages = list()
+
+    def emit(self, record: logging.LogRecord):
+        self.messages.append(self.format(record))
+
+
+def init_record(msg: str, args: tuple) -> logging.LogRecord:
+    return logging.LogRecord(name="test", level=logging.INFO, pathname=__file__, lineno=1, msg=msg, args=args,
+                             exc_info=None)
+
+
+class TestQueueHandlers(TestCase):
+    def test_message_snapshot_when_queued(self):
+        queue_handler = BoundedQueueHandler(queue_size=10)
+        articles = ["a"]
+        queue_handler.handle(init_record(msg="Got {} articles: {}", args=(1, articles)))
+        queue_handler.handle(init_record(msg="Got %s articles: %s", args=(1, articles)))
+        articles.append("b")
+        for _ in range(2):
+            record = queue_handler.queue.get_nowait()
+            self.assertEqual("Got 1 articles: ['a']", record.msg)
+            self.assertIsNone(record.args)
+
+    def test_colors_kept_when_queued(self):
+        with patch.object(ColorFormatter, "should_use_color", return_value=True):
+            queue_handler = BoundedQueueHandler(queue_size=10)
+        list_handler = ListHandler()
+        list_handler.setFormatter(ColorFormatter("%(message)s", use_color=True))
+        plain_handler = ListHandler()
+        plain_handler.setFormatter(ColorFormatter("%(message)s", use_color=False))
+        listener = LogQueueListener(queue_handler, list_handler, plain_handler)
+        listener.start()
+        queue_handler.handle(init_record(msg="Got {} of {}", args=(3, "cnn")))
+        listener.stop()
+        self.assertIn(f"{ColorCodes.PURPLE}3{ColorCodes.RESET}", list_handler.messages[0])
+        self.assertIn(f"{ColorCodes.LIGHT_BLUE}cnn{ColorCodes.RESET}", list_handler.messages[0])
+        self.assertEqual(["Got 3 of cnn"], plain_handler.messages)
+
+    def test_bad_record_not_queued(self):
+        queue_handler = BoundedQueueHandler(queue_size=10)
+        with patch.object(BoundedQueueHandler, "handleError") as handle_error_mock:
+            queue_handler.handle(init_record(msg="Got %d", args=("many",)))
+        handle_error_mock.assert_called_once()
+        self.assertEqual({"queued": 0, "dropped": 0, "waiting": 0}, queue_handler.get_stats())
+
+    def test_overflow_dropped(self):
+        queue_handler = BoundedQueueHandler(queue_size=2)
+        for i in range(5):
+            queue_handler.handle(init_record(msg="Log %s", args=(i,)))
+        self.assertEqual({"queued": 2, "dropped": 3, "waiting": 2}, queue_handler.get_stats())
+
+    def test_stop_emits_queued_records(self):
+        queue_handler = BoundedQueueHandler(queue_size=100)
+        list_handler = ListHandler()
+        listener = LogQueueListener(queue_handler, list_handler)
+        listener.start()
+        for i in range(50):
+            queue_handler.handle(init_record(msg="Log %s", args=(i,)))
+        listener.stop()
+        listener.stop()
+        self.assertEqual([f"Log {i}" for i in range(50)], list_handler.messages)
+
+    def test_listener_respects_handler_level(self):
+        queue_handler = BoundedQueueHandler(queue_size=10)
+        list_handler = ListHandler()
+        list_handler.setLevel(logging.ERROR)
+        listener = LogQueueListener(queue_handler, list_handler)
+        listener.start()
+        queue_handler.handle(init_record(msg="Log", args=()))
+        listener.stop()
+        self.assertEqual([], list_handler.messages)
@@ -0,0 +1,97 @@
+import asyncio
+import logging
+import threading
+from unittest import TestCase
+
+from logger import get_current_logger
+from logger.objects.task_context import TaskContext
+from logger.server_logger import LAST_LOG, TASK_CONTEXT
+
+
+class RecordsHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = list()
+        self._lock = threading.Lock()
+
+    def emit(self, record: logging.LogRecord):
+        with self._lock:
+            self.records.append((record.getMessage(), getattr(record, "task_id", None)))
+
+
+class TestTaskContext(TestCase):
+    def setUp(self):
+        # Other tests may leave a task in the context of the main thread
+        task_context_token = TASK_CONTEXT.set(TaskContext())
+        self.addCleanup(TASK_CONTEXT.reset, task_context_token)
+        last_log_token = LAST_LOG.set(tuple())
+        self.addCleanup(LAST_LOG.reset, last_log_token)
+        self.logger = get_current_logger()
+        self.handler = RecordsHandler()
+        logging.getLogger("server_logger").addHandler(self.handler)
+        self.addCleanup(logging.getLogger("server_logger").removeHandler, self.handler)
+
+    def assert_own_task_ids(self, expected_count: int):
+        self.assertEqual(expected_count, len(self.handler.records))
+        for message, task_id in self.handler.records:
+            self.assertEqual(message.split(" ")[0], task_id)
+
+    def test_threads_log_own_task_id(self):
+        barrier = threading.Barrier(parties=5)
+
+        def run_task(task_id: str):
+            get_current_logger(task_id=task_id, task_type="test")
+            for i in range(10):
+                barrier.wait(timeout=5)
+                get_current_logger().info(f"{task_id} log {i}")
+
+        threads = [threading.Thread(target=run_task, args=(f"thread_{i}",)) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        self.assert_own_task_ids(expected_count=50)
+
+    def test_asyncio_tasks_log_own_task_id(self):
+        async def run_task(task_id: str):
+            with self.logger.task_context(task_id=task_id, task_type="test"):
+                for i in range(10):
+                    await asyncio.sleep(0)
+                    get_current_logger().info(f"{task_id} log {i}")
+
+        async def run_tasks():
+            await asyncio.gather(*[run_task(task_id=f"async_{i}") for i in range(5)])
+
+        asyncio.run(run_tasks())
+        self.assert_own_task_ids(expected_count=50)
+
+    def test_bound_loggers_log_own_task_id(self):
+        def run_task(task_id: str):
+            task_logger = self.logger.bind(task_id=task_id, task_type="test")
+            for i in range(10):
+                task_logger.info(f"{task_id} log {i}")
+
+        threads = [threading.Thread(target=run_task, args=(f"bound_{i}",)) for i in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=10)
+        self.assert_own_task_ids(expected_count=50)
+        self.assertIsNone(self.logger.task_id)
+
+    def test_get_logger_without_args_keeps_context(self):
+        with self.logger.task_context(task_id="context_task", task_type="test"):
+            logger = get_current_logger()
+            self.assertEqual("context_task", logger.task_id)
+            logger.info("context_task log")
+
+        def run_task():
+            get_current_logger(task_id="thread_task", task_type="test")
+            get_current_logger()
+            get_current_logger().info("thread_task log")
+
+        thread = threading.Thread(target=run_task)
+        thread.start()
+        thread.join(timeout=10)
+        self.assert_own_task_ids(expected_count=2)
+        self.assertIsNone(get_current_logger().task_id)
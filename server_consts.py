@@ -37,3 +37,9 @@ class ServerTimeConsts:
     SECONDS = 60
     MINUTES = 60
     SEC_TO_SLEEP = SECONDS * MINUTES * 6  # 6 hours
+
+
+class MongoClientConsts:
+    MAX_POOL_SIZE = int(os.getenv(key="MONGO_MAX_POOL_SIZE", default=100))
+    MIN_POOL_SIZE = int(os.getenv(key="MONGO_MIN_POOL_SIZE", default=0))
+    MAX_IDLE_TIME_MS = int(os.getenv(key="MONGO_MAX_IDLE_TIME_MS", default=60 * 1000))